@@ -0,0 +1,1352 @@
+
+
+def test_read_only():
+    import os
+    import re
+    import tempfile
+    import zipfile
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        label = xl.Constant('Name', (1, 1))
+        name = xl.Cell(1, 2)
+        array = xl.Range('A3:C4')
+        column = xl.Column(2, col_length=4)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'read_only.xlsx')
+        tbl = MyTable()
+        tbl.name = 'John'
+        tbl.array = [(1, 2, 3), (4, 5, 6)]
+        tbl.save(filename)
+
+        tbl = MyTable(filename, read_only=True)
+        assert tbl.wb.read_only
+        assert tbl.label == 'Name'
+        assert tbl.name == 'John'
+        assert tbl.array == ((1, 2, 3), (4, 5, 6))
+        assert tbl.column == ('John', None, 2, 5)
+        assert tbl.Cells(3, 3).Value == 3
+        tbl.Close()
+
+        # Files without a dimension element are scanned for the used range of open ended fields
+        class OpenTable(xl.OpenpyxlTable):
+            column = xl.Column(1)
+
+        tbl = OpenTable()
+        tbl.column = [1, 2, 3, 4, 5]
+        tbl.save(filename)
+        with zipfile.ZipFile(filename) as archive:
+            parts = {name: archive.read(name) for name in archive.namelist()}
+        parts['xl/worksheets/sheet1.xml'] = re.sub(rb'<dimension [^>]*/>', b'', parts['xl/worksheets/sheet1.xml'])
+        with zipfile.ZipFile(filename, 'w') as archive:
+            for name, data in parts.items():
+                archive.writestr(name, data)
+
+        tbl = OpenTable(filename, read_only=True)
+        assert tbl.column == (1, 2, 3, 4, 5)
+        tbl.Close()
+
+
+def test_write_only():
+    import os
+    import tempfile
+    import openpyxl
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        WRITE_ONLY_BUFFER = 4
+        header = xl.Constant(['Data 1', 'Data 2', 'Data 3'], rows=1, row_length=3)
+        array = xl.Range('A2:C3')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'write_only.xlsx')
+        tbl = MyTable(write_only=True)
+        tbl.array = [(1, 2, 3), (4, 5, 6)]
+        for i in range(4, 20):
+            tbl.Range('A{0}:C{0}'.format(i)).Value = ((i, i * 2, i * 3),)
+        assert len(tbl.get_sheet(1).sheet.pending) <= 4
+
+        try:
+            tbl.array = [(0, 0, 0)]
+            raise AssertionError('Rows that were already written should not be writable')
+        except ValueError:
+            pass
+
+        tbl.save(filename)
+        values = list(openpyxl.load_workbook(filename).active.values)
+        assert values[:3] == [('Data 1', 'Data 2', 'Data 3'), (1, 2, 3), (4, 5, 6)]
+        assert values[-1] == (19, 38, 57)
+
+
+def test_clip_open_ended():
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        column = xl.Column(2)
+        row = xl.Row(3)
+
+    tbl = MyTable()
+    tbl.Cells(5, 2).Value = 'x'
+    tbl.Cells(3, 4).Value = 'y'
+    assert tbl.column == (None, None, None, None, 'x')
+    assert tbl.row == (None, None, None, 'y')
+    assert len(tbl.wb.active._cells) < 100
+    assert MyTable.column.plan.open_ended == ((True, False),)
+    assert MyTable.row.plan.open_ended == ((False, True),)
+
+    # Lengths that are given are never clipped even if they are the default lengths
+    class Explicit(xl.OpenpyxlTable):
+        array = xl.Range('A1:B16840')
+        row = xl.Row(1, row_length=702)
+        column = xl.Column(1, col_length=16840)
+
+    tbl = Explicit()
+    tbl.Cells(1, 1).Value = 'x'
+    assert Explicit.array.plan.open_ended == ((False, False),)
+    assert len(tbl.array) == 16840
+    assert len(tbl.row) == 702
+    assert len(tbl.column) == 16840
+
+
+def test_reads_do_not_create_cells():
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        name = xl.Cell(1, 2)
+        array = xl.Range('A3:J100')
+
+    tbl = MyTable()
+    tbl.Cells(50, 5).Value = 1
+    count = len(tbl.wb.active._cells)
+    for _ in range(3):
+        assert tbl.name is None
+        assert tbl.array[47][4] == 1
+        assert tbl.Cells(2, 2).Value is None
+        assert all(cell.Value is None for cell in tbl.get_sheet(1).Range('A1:B2').Cells)
+    assert len(tbl.wb.active._cells) == count
+
+
+def test_multi_area():
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        rows = xl.Row(3, 7, 12, 40, row_length=3)
+        cells = xl.Cell((1, 1), (2, 2))
+        header = xl.Constant(['a', 'b'], (1, 3), (1, 5))
+
+    tbl = MyTable()
+    assert MyTable.rows.range_str.count(',') == 3
+    tbl.rows = [(1, 2, 3), (4, 5, 6), (7, 8, 9), (10, 11, 12)]
+    assert tbl.rows == ((1, 2, 3), (4, 5, 6), (7, 8, 9), (10, 11, 12))
+    assert tbl.Cells(40, 3).Value == 12
+    assert tbl.Cells(39, 3).Value is None
+
+    tbl.cells = ('x', 'y')
+    assert tbl.cells == ('x', 'y')
+    assert tbl.header == ('a', 'b')
+    assert tbl.Cells(1, 4).Value is None
+
+    # Flat values fill the cells of the areas in order instead of one value for each area
+    class FlatTable(xl.OpenpyxlTable):
+        cols = xl.Column(2, 5)
+        rows = xl.Row(3, 7, 12)
+
+    tbl = FlatTable()
+    tbl.cols = [1, 2]
+    assert tbl.Cells(1, 2).Value == 1 and tbl.Cells(2, 2).Value == 2 and tbl.Cells(1, 5).Value is None
+    tbl.rows = ['a', 'b', 'c']
+    assert [tbl.Cells(3, c).Value for c in range(1, 5)] == ['a', 'b', 'c', None]
+    assert tbl.Cells(7, 1).Value is None
+    assert len(tbl.wb.active._cells) < 10
+
+
+def test_bulk_write():
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        array = xl.Range('A1:C3')
+        row = xl.Row(5, row_length=3)
+
+    tbl = MyTable()
+    tbl.array = [(1, 2, 3), (4, 5, 6), (7, 8, 9), (10, 11, 12)]
+    assert tbl.array == ((1, 2, 3), (4, 5, 6), (7, 8, 9))
+    tbl.row = [1, 2, 3]
+    assert tbl.row == (1, 2, 3)
+
+    sheet = tbl.get_sheet(1)
+    assert sheet.write_rows((i, i * 2) for i in range(10, 20)) == 10
+    assert tbl.Cells(10, 2).Value == 38
+    assert sheet.Range('E2:F2').write_rows([(1, 2), (3, 4)]) == 2
+    assert tbl.Cells(3, 6).Value == 4
+
+    count = len(tbl.wb.active._cells)
+    sheet.write_rows([(None, None)], row=100)
+    assert len(tbl.wb.active._cells) == count
+
+    # Rows past the end of the sheet are added instead of dropped
+    tbl.Rows.Value = [(i,) for i in range(30)]
+    assert tbl.Cells(30, 1).Value == 29
+
+
+def test_sheet_cache():
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        ACTIVATE_SHEETS = False
+        first = xl.Cell(1, 1)
+        second = xl.Cell(1, 1, sheet='Data')
+
+    tbl = MyTable()
+    tbl.first = 1
+    tbl.second = 2
+    assert tbl.get_sheet(1) is tbl.get_sheet(1)
+    assert tbl.get_sheet('Data') is tbl.get_sheet(2)
+    assert tbl.wb.active.title == 'Sheet'
+    assert not tbl.has_sheet('Other')
+
+    # Rename
+    tbl.wb['Data'].title = 'Other'
+    assert tbl.has_sheet('Other')
+    assert tbl.get_sheet('Other').sheet.title == 'Other'
+    tbl.second = 3
+    assert tbl.get_sheet('Data') is not tbl.get_sheet('Other')
+    assert tbl.wb['Other']['A1'].value == 2
+
+    # Remove
+    tbl.wb.remove(tbl.wb['Sheet'])
+    assert tbl.get_sheet(1).sheet.title == 'Other'
+    assert tbl.first == 2
+
+
+def test_item_plan():
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        name = xl.Cell(1, 2)
+        array = xl.Range('A3:C4', 'E1')
+        column = xl.Column(2, col_length=4)
+
+    assert MyTable.array.plan.bounds == ((3, 1, 4, 3), (1, 5, 1, 5))
+    assert MyTable.array.plan.shape == ((2, 3), (1, 1))
+    assert MyTable.column.plan.bounds == ((1, 2, 4, 2),)
+    assert xl.get_area_bounds('B:C') == (None, 2, None, 3)
+
+    tbl = MyTable()
+    tbl.name = 'John'
+    item = MyTable.name.get_item(tbl)
+    assert MyTable.name.get_item(tbl) is item
+    assert MyTable.name.get_item(MyTable()) is not item
+
+    # Reassigning the range compiles a new plan
+    plan = MyTable.name.plan
+    MyTable.name.cells = (2, 2)
+    try:
+        assert MyTable.name.plan is not plan
+        assert MyTable.name.plan.bounds == ((2, 2, 2, 2),)
+        assert MyTable.name.get_item(tbl) is not item
+        assert tbl.name is None
+        tbl.name = 'Jane'
+        assert tbl.Cells(2, 2).Value == 'Jane'
+        assert tbl.Cells(1, 2).Value == 'John'
+    finally:
+        MyTable.name.cells = (1, 2)
+
+    # A sheet inserted before the field sheet changes the sheet key
+    tbl.wb.create_sheet('Other', 0)
+    assert tbl.get_sheet_key(1) is tbl.get_sheet('Other')
+    assert MyTable.name.get_item(tbl) is not item
+    assert tbl.name is None
+
+    # A new workbook resolves the items again
+    tbl.wb = None
+    assert tbl.name is None
+
+
+def test_field_registry():
+    import xl_tables as xl
+
+    class BaseTable(xl.OpenpyxlTable):
+        title = xl.Constant('Report', (1, 1))
+        name = xl.Cell(2, 1)
+        removed = xl.Cell(3, 1)
+
+    class MyTable(BaseTable):
+        header = xl.Constant(['a', 'b'], rows=1, row_length=2, sheet='Data')
+        name = xl.Cell(2, 2)
+        removed = None
+        created = xl.DateTime(4, 1)
+
+    assert list(MyTable.__fields__) == ['title', 'name', 'header', 'created']
+    assert MyTable.__fields__['name'] is MyTable.name
+    assert MyTable.__fields__.constants == (BaseTable.title, MyTable.header)
+    assert list(MyTable.__fields__.by_sheet[1]) == ['title', 'name', 'created']
+    assert list(MyTable.__fields__.by_sheet['Data']) == ['header']
+    assert list(MyTable.__fields__.by_kind[xl.DateTime]) == ['created']
+    assert list(MyTable.__fields__.of_kind(xl.ConstantItem)) == ['title', 'header']
+    assert list(BaseTable.__fields__) == ['title', 'name', 'removed']
+
+    # Constants of the base class are set as well
+    tbl = MyTable()
+    assert tbl.title == 'Report'
+    assert tbl.header == ('a', 'b')
+
+    # Fields assigned or deleted after the class is defined are collected again for the class and its subclasses
+    BaseTable.label = xl.Constant('Name', (2, 2), sheet='Labels')
+    try:
+        assert list(BaseTable.__fields__)[-1] == 'label' and 'label' in MyTable.__fields__
+        assert BaseTable().label == 'Name'
+        assert MyTable().label == 'Name'
+    finally:
+        del BaseTable.label
+    assert 'label' not in BaseTable.__fields__ and 'label' not in MyTable.__fields__
+
+
+def test_constant_template():
+    import os
+    import tempfile
+    import openpyxl
+    import xl_tables as xl
+    from xl_tables.openpyxl_support.workbook import CONSTANT_TEMPLATES
+
+    encoded = []
+
+    def encode(item, value):
+        encoded.append(value)
+        item.Value = value.upper()
+
+    class MyTable(xl.OpenpyxlTable):
+        title = xl.Constant('Report', (1, 1))
+        header = xl.Constant(['a', 'b', 'c'], rows=2, row_length=3, sheet='Data')
+        label = xl.Constant('custom', (1, 2), encoder=encode)
+
+    tbl = MyTable()
+    template = CONSTANT_TEMPLATES[MyTable]
+    tbl2 = MyTable()
+    assert CONSTANT_TEMPLATES[MyTable] is template
+    assert encoded == ['custom', 'custom']  # Custom encoders still run for every instance
+    for t in (tbl, tbl2):
+        assert t.title == 'Report'
+        assert t.header == ('a', 'b', 'c')
+        assert t.label == 'CUSTOM'
+        assert t.Cells(3, 1).Value is None
+    assert tbl.wb.sheetnames == tbl2.wb.sheetnames == ['Sheet', 'Data']
+
+    # Changing a constant renders the template again
+    MyTable.title.value = 'Summary'
+    try:
+        assert MyTable().title == 'Summary'
+        assert CONSTANT_TEMPLATES[MyTable] is not template
+    finally:
+        MyTable.title.value = 'Report'
+
+    # Changing a constant value in place renders the template again
+    template = CONSTANT_TEMPLATES[MyTable]
+    MyTable.header.value[0] = 'z'
+    try:
+        assert MyTable().header == ('z', 'b', 'c')
+        assert CONSTANT_TEMPLATES[MyTable] is not template
+    finally:
+        MyTable.header.value[0] = 'a'
+    assert MyTable().header == ('a', 'b', 'c')
+
+    # The sheet of every constant is resolved against the workbook the constants are copied to
+    class SheetTable(xl.OpenpyxlTable):
+        by_name = xl.Constant('name', (1, 1), sheet='Data')
+        by_index = xl.Constant('index', (1, 2), sheet=2)
+
+    wb = openpyxl.Workbook()
+    wb.active.title = 'Summary'
+    wb.create_sheet('Other')
+    wb.create_sheet('Data')
+    SheetTable(wb=wb)
+    assert wb['Data']['A1'].value == 'name' and wb['Data']['B1'].value is None
+    assert wb['Other']['A1'].value is None and wb['Other']['B1'].value == 'index'
+
+    # Rendering the template does not reset the state of the opened workbook
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'big.xlsx')
+        wb = openpyxl.Workbook()
+        wb.active['A1'] = 'x'
+        wb.create_sheet('Other')['A1'] = 'y'
+        wb.save(filename)
+
+        class FieldsOnly(xl.OpenpyxlTable):
+            XLSX_FIELDS_ONLY = True
+            label = xl.Constant('Name', (1, 2))
+
+        CONSTANT_TEMPLATES.pop(FieldsOnly, None)
+        tbl = FieldsOnly(filename)
+        assert tbl._skipped_sheets
+        try:
+            tbl.save(filename)
+            raise AssertionError('A workbook that was not completely loaded should not be saved')
+        except ValueError:
+            pass
+        assert openpyxl.load_workbook(filename)['Other']['A1'].value == 'y'
+
+
+def test_read_all():
+    import os
+    import tempfile
+    import datetime
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        label = xl.Constant('Name', (1, 1))
+        name = xl.Cell(1, 2)
+        array = xl.Range('A3:C4')
+        column = xl.Column(2, col_length=4)
+        open_column = xl.Column(3)
+        rows = xl.Row(3, 7, row_length=2)
+        created = xl.DateTime(1, 4)
+        other = xl.Cell(2, 2, sheet='Other')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'read_all.xlsx')
+        tbl = MyTable()
+        tbl.name = 'John'
+        tbl.array = [(1, 2, 3), (4, 5, 6)]
+        tbl.rows = [(1, 2), (7, 8)]
+        tbl.created = datetime.datetime(2020, 1, 2, 3, 4, 5)
+        tbl.other = 'x'
+
+        values = tbl.read_all()
+        assert list(values) == list(MyTable.__fields__)
+        assert values == {name: getattr(tbl, name) for name in MyTable.__fields__}
+        record = tbl.snapshot()
+        assert record.name == 'John' and record.rows == ((1, 2), (7, 8)) and record.other == 'x'
+        tbl.save(filename)
+
+        # Read only workbooks stream each sheet once
+        tbl = MyTable(filename, read_only=True)
+        for ws in tbl.wb.worksheets:
+            def iter_rows(*args, _iter_rows=ws.iter_rows, _ws=ws, **kwargs):
+                calls.append(_ws.title)
+                return _iter_rows(*args, **kwargs)
+            ws.iter_rows = iter_rows
+
+        calls = []
+        assert tbl.read_all() == values
+        assert sorted(calls) == ['Other', 'Sheet']
+        tbl.Close()
+
+
+def test_batch():
+    import datetime
+    import xl_tables as xl
+    from xl_tables.openpyxl_support.workbook import RangeObject
+
+    class MyTable(xl.OpenpyxlTable):
+        first = xl.Cell(1, 1)
+        second = xl.Cell(1, 2)
+        third = xl.Cell(2, 1)
+        fourth = xl.Cell(2, 2)
+        row = xl.Row(4, row_length=3)
+        other = xl.Cell(1, 1, sheet='Other')
+        created = xl.DateTime(6, 1)
+
+    assert xl.get_blocks({(1, 1): 1, (1, 2): 2, (2, 1): 3, (2, 2): 4, (4, 1): 5, (4, 3): 6}) == [
+        (1, 1, 2, 2, ((1, 2), (3, 4))), (4, 1, 4, 1, ((5,),)), (4, 3, 4, 3, ((6,),))]
+
+    tbl = MyTable()
+    writes = []
+    orig_value = RangeObject.Value
+
+    def set_value(self, values):
+        writes.append(self.range_str)
+        orig_value.fset(self, values)
+
+    RangeObject.Value = orig_value.setter(set_value)
+    try:
+        with tbl.batch():
+            tbl.first = 1
+            tbl.second = 2
+            tbl.third = 3
+            tbl.fourth = 4
+            tbl.other = 'x'
+            assert tbl.Cells(1, 1).Value is None
+            assert writes == []
+        assert writes == ['$A$1:$B$2', '$A$1']
+        assert (tbl.first, tbl.second, tbl.third, tbl.fourth, tbl.other) == (1, 2, 3, 4, 'x')
+
+        # Reads see pending values
+        del writes[:]
+        with tbl.batch():
+            tbl.row = [1, 2, 3]
+            assert tbl.first == 1 and writes == []
+            assert tbl.row == (1, 2, 3)
+            tbl.first = 10
+            tbl.created = datetime.datetime(2020, 1, 1)  # Custom encoders write the pending values first
+            assert tbl.Cells(1, 1).Value == 10
+        assert tbl.created == datetime.datetime(2020, 1, 1)
+
+        # Errors discard the pending values
+        try:
+            with tbl.batch():
+                tbl.first = 20
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        assert tbl.first == 10
+    finally:
+        RangeObject.Value = orig_value
+
+
+def test_changes():
+    import os
+    import tempfile
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        label = xl.Constant('Name', (1, 1))
+        name = xl.Cell(1, 2)
+        other = xl.Cell(2, 2, sheet='Other')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'changes.xlsx')
+        tbl = MyTable()
+        tbl.name = 'John'
+        assert tbl.is_dirty()
+        assert list(tbl.changes()) == [('Sheet', 1, 1, 'Name'), ('Sheet', 1, 2, 'John')]
+        tbl.save(filename)
+        assert not tbl.is_dirty() and list(tbl.changes()) == []
+
+        # Saving an unchanged workbook does nothing if it is asked for
+        mtime = os.path.getmtime(filename)
+        os.utime(filename, (mtime - 10, mtime - 10))
+        tbl.name = 'John'
+        tbl.save(skip_unchanged=True)
+        assert os.path.getmtime(filename) == mtime - 10
+
+        # Opening does not count the constants that are already set
+        tbl = MyTable(filename)
+        assert not tbl.is_dirty()
+        tbl.save(skip_unchanged=True)
+        assert os.path.getmtime(filename) == mtime - 10
+
+        tbl.other = 'x'
+        assert list(tbl.changes()) == [('Other', 2, 2, 'x')]
+        tbl.save(skip_unchanged=True)
+        assert os.path.getmtime(filename) != mtime - 10
+        assert MyTable(filename).other == 'x'
+
+        # Untracked changes are saved by default
+        tbl = MyTable(filename)
+        tbl.wb.active['C3'] = 'direct'
+        tbl.get_sheet(1).Range('A1').Borders(1).LineStyle = 1
+        assert not tbl.is_dirty()
+        tbl.save()
+        assert MyTable(filename).wb.active['C3'].value == 'direct'
+
+        # Sheet changes and pending batch values are saved
+        tbl.wb['Other'].title = 'Renamed'
+        assert tbl.is_dirty()
+        tbl.save()
+        with tbl.batch():
+            tbl.name = 'Jane'
+            tbl.save()
+        assert MyTable(filename).name == 'Jane'
+
+
+def test_value_cache():
+    import os
+    import tempfile
+    import datetime
+    import xl_tables as xl
+
+    decoded = []
+
+    class MyTable(xl.OpenpyxlTable):
+        now = xl.DateTime(1, 1, cache=True)
+        name = xl.Cell(1, 2, cache=True)
+        row = xl.Row(1, row_length=3)
+        other = xl.Cell(5, 5, decoder=lambda item: decoded.append(item.Value) or item.Value)
+
+    tbl = MyTable()
+    tbl.now = datetime.datetime(2020, 1, 1)
+    now = tbl.now
+    assert tbl.now is now
+    tbl.name = 'John'
+    assert tbl.now is now  # Other fields do not overlap
+    assert tbl.name == 'John'
+
+    # Writes that do not overlap keep the cached value
+    MyTable.other.cache = True
+    try:
+        tbl.other = 1
+        assert (tbl.other, tbl.other) == (1, 1)
+        tbl.name = 'Jim'
+        tbl.Cells(6, 5).Value = 2
+        assert tbl.other == 1
+        assert decoded == [1]
+        tbl.Cells(5, 5).Value = 3
+        assert tbl.other == 3
+        assert decoded == [1, 3]
+    finally:
+        MyTable.other.cache = None
+    del decoded[:]
+
+    # Overlapping field and direct writes
+    tbl.row = [datetime.datetime(2021, 1, 1), 'Jane']
+    assert tbl.now == datetime.datetime(2021, 1, 1)
+    assert tbl.name == 'Jane'
+    tbl.Cells(1, 2).Value = 'Bob'
+    assert tbl.name == 'Bob'
+
+    # Table policy
+    MyTable.CACHE_VALUES = True
+    try:
+        tbl.other = 1
+        assert (tbl.other, tbl.other) == (1, 1)
+        assert decoded == [1]
+    finally:
+        MyTable.CACHE_VALUES = False
+    assert (tbl.other, tbl.other) == (1, 1)
+    assert decoded == [1, 1, 1]
+
+    # Open clears the cache
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'value_cache.xlsx')
+        tbl.save(filename)
+        tbl.name = 'Other'
+        assert tbl.name == 'Other'
+        tbl.open(filename)
+        assert tbl.name == 'Bob'
+
+
+def test_to_numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        return  # NumPy is optional
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        array = xl.Range('A1:C3')
+        column = xl.Column(2)
+        rows = xl.Row(5, 7, row_length=2)
+        item = xl.RangeItem('A1:C3')
+        names = xl.Cell((1, 5), (2, 5))
+
+    tbl = MyTable()
+    tbl.array = np.array([[1, 2, 3], [4, np.nan, 6]])
+    assert tbl.array == ((1.0, 2.0, 3.0), (4.0, None, 6.0), (None, None, None))
+
+    arr = MyTable.array.to_numpy(tbl)
+    assert arr.dtype == float and arr.shape == (3, 3)
+    assert np.isnan(arr[1, 1]) and np.isnan(arr[2]).all()
+    assert MyTable.column.to_numpy(tbl).shape == (2,)  # Clipped to the used range
+
+    ints = MyTable.array.to_numpy(tbl, dtype=int)
+    assert isinstance(ints, np.ma.MaskedArray)
+    assert ints[0].tolist() == [1, 2, 3] and ints.mask[1, 1]
+    assert tbl.item.to_numpy(dtype=float).shape == (3, 3)
+
+    tbl.rows = np.ma.MaskedArray([[1, 2], [3, 4]], mask=[[False, True], [False, False]])
+    assert tbl.rows == ((1, None), (3, 4))
+    assert MyTable.rows.to_numpy(tbl, dtype=float).tolist()[1] == [3.0, 4.0]
+
+    tbl.names = np.array(['a', 'b'])
+    assert MyTable.names.to_numpy(tbl).tolist() == ['a', 'b']
+    tbl.Cells(1, 1).Value = np.float64(np.nan)
+    assert tbl.Cells(1, 1).Value is not None  # Only field writes convert NaN
+    tbl.array = np.float64(np.nan)
+    assert tbl.array == ((None, None, None),) * 3
+
+    # Nanosecond dates and times are written as datetime and timedelta values. NaT is an empty cell.
+    import datetime
+    tbl.rows = np.array([['2021-01-02T03:04:05.000001', 'NaT'], ['2021-02-01', '2021-02-02']], dtype='datetime64[ns]')
+    assert tbl.rows == ((datetime.datetime(2021, 1, 2, 3, 4, 5, 1), None),
+                        (datetime.datetime(2021, 2, 1), datetime.datetime(2021, 2, 2)))
+    tbl.rows = np.array([[1500, 'NaT'], [2, 3]], dtype='timedelta64[ms]').astype('timedelta64[ns]')
+    assert tbl.rows[0] == (datetime.timedelta(seconds=1.5), None)
+    assert xl.ndarray_to_list(np.datetime64('2021-01-02', 'ns')) == datetime.datetime(2021, 1, 2)
+    assert xl.ndarray_to_list(np.datetime64('NaT', 'ns')) is None
+    assert xl.ndarray_to_list(np.array(['2021-01-02'], dtype='datetime64[D]')) == [datetime.date(2021, 1, 2)]
+
+
+def test_dataframe():
+    try:
+        import pandas as pd
+    except ImportError:
+        return  # pandas is optional
+    import datetime
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        header = xl.Row(1, row_length=3)
+        array = xl.Range('A2:C100')
+        dates = xl.DateTime(ranges='E2:E10')
+
+    tbl = MyTable()
+    tbl.header = ['name', 'age', None]
+    tbl.array = [('John', 30, 1.5), ('Jane', None, 2.5)]
+    df = tbl.to_dataframe('array', 'header')
+    assert list(df.columns) == ['name', 'age', 2]
+    assert len(df) == 2
+    assert df['name'].tolist() == ['John', 'Jane']
+    assert df['age'].dtype == float and pd.isna(df['age'][1])
+
+    tbl.Cells(2, 5).Value = datetime.datetime(2020, 1, 2)
+    dates = tbl.to_dataframe(MyTable.dates)
+    assert str(dates[0].dtype).startswith('datetime64')
+
+    df = pd.DataFrame({'x': [1, 2, 3], 'y': [pd.Timestamp('2021-01-01'), pd.NaT, pd.Timestamp('2021-01-03')]})
+    tbl.from_dataframe(df, 'array', header_field='header')
+    assert tbl.header == ('x', 'y', None)
+    assert tbl.Cells(2, 1).Value == 1 and tbl.Cells(3, 2).Value is None
+    assert tbl.Cells(4, 2).Value == datetime.datetime(2021, 1, 3)
+    assert tbl.to_dataframe('array', 'header')['x'].tolist() == [1, 2, 3]
+
+    # Rows and columns the DataFrame does not cover are cleared and values never go past the field
+    tbl.Cells(100, 3).Value = 'stale'
+    tbl.from_dataframe(pd.DataFrame({'x': [7]}), 'array')
+    assert tbl.array[:3] == ((7, None, None), (None, None, None), (None, None, None))
+    assert tbl.Cells(100, 3).Value is None
+    for df in (pd.DataFrame({'x': range(100)}), pd.DataFrame({c: [1] for c in 'abcd'})):
+        try:
+            tbl.from_dataframe(df, 'array')
+            raise AssertionError('The DataFrame does not fit in the field!')
+        except ValueError:
+            pass
+    assert tbl.Cells(101, 1).Value is None and tbl.Cells(2, 4).Value is None
+
+
+def test_arrow_export():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return  # pyarrow is optional
+    import os
+    import tempfile
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        header = xl.Row(1, row_length=3)
+        array = xl.Range('A2:C100')
+
+    tbl = MyTable()
+    tbl.header = ['name', 'age', 'score']
+    tbl.array = [('John', 30, 1.5), ('Jane', None, 2.5), (None, None, None), ('Bob', 40, None)]
+    batches = list(tbl.to_record_batches('array', 'header', batch_size=2))
+    assert [b.num_rows for b in batches] == [2, 2]
+    assert batches[0].schema.names == ['name', 'age', 'score']
+    assert batches[1].column(0).to_pylist() == [None, 'Bob']
+
+    other = MyTable()
+    other.header = ['name', 'age', 'score']
+    other.array = [('Ann', 25, 3.5)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'table.parquet')
+        assert tbl.export(filename, 'array', 'header', batch_size=2) == 4
+        pf = pq.ParquetFile(filename)
+        assert pf.num_row_groups == 2
+        assert pf.read().column('age').to_pylist() == [30, None, None, 40]
+
+        filename = os.path.join(tmp, 'tables.arrow')
+        assert xl.export_tables(filename, [tbl, other], 'array', 'header') == 5
+        with pa.ipc.open_file(filename) as reader:
+            table = reader.read_all()
+        assert table.column('name').to_pylist() == ['John', 'Jane', None, 'Bob', 'Ann']
+        assert table.column('score').to_pylist()[-1] == 3.5
+
+        # Types that change in a later batch or table are widened instead of truncated
+        other.array = [('Ann', 25.5, 'n/a')]
+        filename = os.path.join(tmp, 'widened.parquet')
+        assert xl.export_tables(filename, [tbl, other], 'array', 'header', batch_size=2) == 5
+        table = pq.read_table(filename)
+        assert table.schema.field('age').type == pa.float64()
+        assert table.column('age').to_pylist() == [30, None, None, 40, 25.5]
+        assert table.column('score').to_pylist() == ['1.5', '2.5', None, None, 'n/a']
+
+    tbl.array = [('John', 1, 1.5), ('Jane', 2, 2.5), ('Bob', 2.5, 'n/a'), ('Ann', 3, None)]
+    batches = list(tbl.to_record_batches('array', 'header', batch_size=2))
+    assert batches[1].column(1).to_pylist() == [2.5, 3.0] and batches[0].schema == batches[1].schema
+    assert batches[1].column(2).to_pylist() == ['n/a', None]
+    schema = pa.schema([('name', pa.string()), ('age', pa.int64()), ('score', pa.string())])
+    try:
+        list(xl.iter_field_batches(tbl, 'array', 'header', batch_size=2, schema=schema))
+        raise AssertionError('A float value was truncated to an int64 column!')
+    except pa.ArrowInvalid:
+        pass
+
+
+def test_list_append():
+    import xl_tables as xl
+    from xl_tables.openpyxl_support import workbook
+
+    class MyTable(xl.OpenpyxlTable):
+        log = xl.ColumnItem(2)
+        row = xl.RowItem(3)
+
+    tbl = MyTable()
+    reads = []
+    iter_values = workbook.iter_values
+
+    def count_reads(sheet, min_row, min_col, max_row, max_col):
+        for values in iter_values(sheet, min_row, min_col, max_row, max_col):
+            reads.append(values)
+            yield values
+
+    workbook.iter_values = count_reads
+    try:
+        for i in range(200):
+            tbl.log.append(i + 1)
+        assert len(reads) <= 2 * 200 + 1  # Only the cells at the end are read for every append
+    finally:
+        workbook.iter_values = iter_values
+
+    assert tbl.log.length() == 200
+    assert tbl.Cells(200, 2).Value == 200 and tbl.Cells(201, 2).Value is None
+
+    # Extend writes one block and finds values that are already after the gap
+    tbl.Cells(204, 2).Value = 'after'
+    tbl.log.extend([201, 202, 203])
+    assert tbl.log.length() == 204
+    assert tbl.log.pop() == 'after'
+    assert tbl.log.length() == 203
+    assert tbl.log.to_list()[-3:] == [201, 202, 203]
+
+    # Writes that are not made through the list are found
+    tbl.Cells(100, 2).Value = None
+    assert tbl.log.length() == 99
+    tbl.Cells(100, 2).Value = 100
+    assert tbl.log.length() == 203
+
+    tbl.row.extend(['a', 'b'])
+    tbl.row.append('c')
+    assert tbl.row.to_list() == ['a', 'b', 'c']
+    assert tbl.row.pop() == 'c' and tbl.row.length() == 2
+
+    empty = MyTable()
+    try:
+        empty.log.pop()
+        raise AssertionError('pop from an empty list should raise an IndexError')
+    except IndexError:
+        pass
+
+
+def test_range_view():
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        array_item = xl.RangeItem('A1:B3')
+        column = xl.ColumnItem(4)
+
+    tbl = MyTable()
+    view = tbl.array_item
+    assert isinstance(view, xl.RangeView) and type(view).__dictoffset__ == 0  # No instance __dict__
+    assert view._self_xl_parent is MyTable.array_item and view._self_xl_instance is tbl
+
+    # Backend attributes are forwarded
+    view.Value = [(1, 2), (3, 4)]
+    assert view.Value == ((1, 2), (3, 4), (None, None))
+    assert view.Areas.Count == 1
+    assert view.Cells(2, 2).Value == 4
+    assert view.to_list() == [(1, 2), (3, 4), (None, None)]
+
+    tbl.column.append('a')
+    tbl.column.extend(['b', 'c'])
+    assert tbl.column.to_tuple() == ('a', 'b', 'c')
+    assert tbl.column.length() == 3
+
+    # Custom decoded objects still get the field and instance
+    class Custom(object):
+        _self_xl_parent = None
+        _self_xl_instance = None
+
+        def __init__(self, item):
+            self.item = item
+
+    class CustomTable(xl.OpenpyxlTable):
+        custom = xl.RangeItem('A1', decoder=Custom)
+
+    custom = CustomTable().custom
+    assert isinstance(custom, Custom) and custom._self_xl_parent is CustomTable.custom
+
+    # Special methods are forwarded for openpyxl and CSV grid sheets
+    import os
+    import tempfile
+    from xl_tables.openpyxl_support.workbook import RangeObject
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'view.csv')
+        with open(filename, 'w') as f:
+            f.write('1,2\n3,4\n')
+
+        for tbl in (MyTable(), MyTable(filename)):
+            tbl.array_item.Value = [(1, 2), (3, 4)]
+            view = tbl.array_item
+            assert isinstance(view, RangeObject) and isinstance(view, xl.RangeView)
+            assert len(view) == 6 and bool(view)
+            assert view[1].Value == 2 and view[-3].Value == 4
+            view[4] = 5
+            assert tbl.Cells(3, 1).Value == 5
+            assert [cell.Value for cell in view] == [1, 2, 3, 4, 5, None]
+            assert view == tbl.array_item and view == MyTable.array_item.get_item(tbl)
+            assert view != tbl.column and hash(view) == hash(MyTable.array_item.get_item(tbl))
+            try:
+                view[6]
+                raise AssertionError('Index 6 is out of the range!')
+            except IndexError:
+                pass
+
+
+def test_csv_types():
+    import os
+    import datetime
+    import tempfile
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        header = xl.Row(1, row_length=6)
+        ids = xl.Column(1)
+
+    text = 'id,price,when,zip,active,note\n' \
+           '1,1.5,2021-01-29,007,TRUE,a\n' \
+           '2,,2021-01-30,010,FALSE,3\n' \
+           '3,2,2021-01-31,020,true,\n'
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'types.csv')
+        with open(filename, 'w', newline='') as f:
+            f.write(text)
+
+        tbl = MyTable(filename)
+        assert tbl.header == ('id', 'price', 'when', 'zip', 'active', 'note')
+        assert tbl.Cells(2, 1).Value == 1 and tbl.Cells(2, 2).Value == 1.5 and tbl.Cells(4, 2).Value == 2.0
+        assert tbl.Cells(3, 2).Value is None and tbl.Cells(4, 6).Value is None  # Empty values do not make cells
+        assert tbl.Cells(2, 3).Value == datetime.date(2021, 1, 29)
+        assert tbl.Cells(2, 4).Value == '007'  # Leading zeros keep the text
+        assert tbl.Cells(2, 5).Value is True and tbl.Cells(4, 5).Value is True
+        assert tbl.Cells(2, 6).Value == 'a' and tbl.Cells(3, 6).Value == '3'  # Mixed columns keep the text
+
+        # Values after the sample that do not match the column type
+        with open(filename, 'a', newline='') as f:
+            f.write('x4,3.5,01/29/2021,030,FALSE,b\n')
+        class SampleTable(MyTable):
+            CSV_SAMPLE_SIZE = 4
+
+        tbl = SampleTable(filename)
+        assert tbl.Cells(5, 1).Value == 'x4' and tbl.Cells(5, 2).Value == 3.5
+        assert tbl.Cells(5, 3).Value == '01/29/2021'
+
+        class StrictTable(SampleTable):
+            CSV_STRICT_TYPES = True
+
+        try:
+            StrictTable(filename)
+            raise AssertionError('Strict types should raise a ValueError')
+        except ValueError as err:
+            assert 'Row 5' in str(err)
+
+        class TextTable(MyTable):
+            CSV_INFER_TYPES = False
+            CSV_DIALECT = 'excel-tab'
+            CSV_ENCODING = 'latin-1'
+
+        filename = os.path.join(tmp, 'types.tsv')
+        with open(filename, 'w', newline='', encoding='latin-1') as f:
+            f.write('id\tname\n1\tJos\xe9\n')
+        tbl = TextTable(filename)
+        assert tbl.Cells(2, 1).Value == '1' and tbl.Cells(2, 2).Value == 'Jos\xe9'
+
+        tbl.save(os.path.join(tmp, 'saved.tsv'))
+        with open(os.path.join(tmp, 'saved.tsv'), encoding='latin-1') as f:
+            assert f.read().splitlines() == ['id\tname', '1\tJos\xe9']
+
+
+def test_csv_grid():
+    import os
+    import tempfile
+    import openpyxl
+    import xl_tables as xl
+    from xl_tables.openpyxl_support.grid import GridWorkbook, GridColumn
+
+    class MyTable(xl.OpenpyxlTable):
+        CSV_BACKEND = 'grid'
+        header = xl.Row(1, row_length=3)
+        ids = xl.Column(1)
+        array = xl.Range('A2:C100')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'grid.csv')
+        with open(filename, 'w', newline='') as f:
+            f.write('id,price,name\n')
+            for i in range(1, 101):
+                f.write('{},{},name{}\n'.format(i, i / 2, i))
+
+        tbl = MyTable(filename)
+        assert isinstance(tbl.wb, GridWorkbook)
+        ws = tbl.get_sheet(1).sheet
+        assert [column.values.typecode if column.mask is not None else None for column in ws.grid] == ['q', 'd', None]
+        assert tbl.header == ('id', 'price', 'name')  # Header names are kept with the number arrays
+        assert tbl.ids[:3] == ('id', 1, 2) and len(tbl.ids) == 101
+        assert tbl.array[0] == (1, 0.5, 'name1')
+        assert not tbl.is_dirty()
+
+        # Writes go to the columns
+        tbl.Cells(2, 1).Value = 'x'
+        tbl.Cells(3, 2).Value = None
+        tbl.array = [(5, 6.5, 'a')]
+        assert tbl.array[:2] == ((5, 6.5, 'a'), (2, None, 'name2'))
+        tbl.Cells(200, 5).Value = 'far'
+        assert tbl.Cells(200, 5).Value == 'far' and tbl.Cells(150, 5).Value is None
+        assert tbl.is_dirty()
+
+        # Save to CSV and Excel
+        tbl.save(os.path.join(tmp, 'saved.csv'))
+        assert MyTable(os.path.join(tmp, 'saved.csv')).Cells(200, 5).Value == 'far'
+        tbl.save(os.path.join(tmp, 'saved.xlsx'))
+        ws = openpyxl.load_workbook(os.path.join(tmp, 'saved.xlsx')).active
+        assert ws.cell(2, 1).value == 5 and ws.cell(200, 5).value == 'far'
+
+        # CSV files are opened as openpyxl workbooks by default
+        class OpenpyxlTable(xl.OpenpyxlTable):
+            ids = xl.Column(1)
+
+        tbl = OpenpyxlTable(filename)
+        assert isinstance(tbl.wb, openpyxl.Workbook) and tbl.wb.active['A2'].value == 1
+
+    # Too many values of another type change an array column to a list
+    column = GridColumn()
+    for i in range(10):
+        column.append(i)
+    column.compact()
+    assert column.mask is not None
+    column.set(20, 'text')
+    assert column.get(20) == 'text' and column.get(15) is None and column.get(3) == 3
+    for i in range(100):
+        column.set(i, str(i))
+    assert column.mask is None and column.get(3) == '3'
+
+
+def test_csv_sheets():
+    import os
+    import tempfile
+    import xl_tables as xl
+    from xl_tables.openpyxl_support.csv_utils import iter_sheets
+
+    class MyTable(xl.OpenpyxlTable):
+        name = xl.Cell(1, 1)
+        prices = xl.Range('A1:B3', sheet='Prices')
+
+    # Separators are removed, but other empty rows are kept
+    rows = [['# a'], ['1'], [], ['2'], [], [], [], ['# b'], ['3'], [], []]
+    assert [(title, list(rows)) for title, rows in iter_sheets(rows)] == [('a', [['1'], [], ['2'], []]),
+                                                                        ('b', [['3']])]
+    assert [(title, list(rows)) for title, rows in iter_sheets([['1'], ['# a']])] == [('Sheet1', [['1'], ['# a']])]
+
+    # A '# ' value in the first row without a second sheet marker is a value
+    for rows in ([['# id'], ['1'], ['2']], [['# id'], ['1'], [], [], ['# x', 'y']]):
+        assert [(title, list(sheet)) for title, sheet in iter_sheets(rows)] == [('Sheet1', rows)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'sheets.csv')
+        tbl = MyTable()
+        tbl.name = 'hello'
+        tbl.get_sheet('Notes').Cells(2, 1).Value = 'unused'
+        tbl.prices = [('a', 1), ('b', 2.5), ('c', 3)]
+        tbl.save(filename)
+
+        for backend in ('grid', 'openpyxl'):
+            class LoadTable(MyTable):
+                CSV_BACKEND = backend
+
+            tbl = LoadTable(filename)
+            assert tbl.wb.sheetnames == ['Sheet', 'Notes', 'Prices']
+            assert tbl.name == 'hello' and tbl.prices == (('a', 1), ('b', 2.5), ('c', 3))
+            assert tbl.get_sheet('Notes').Cells(2, 1).Value == 'unused'
+
+            class SkipTable(LoadTable):
+                CSV_SKIP_UNUSED_SHEETS = True
+
+            tbl = SkipTable(filename)
+            assert tbl.wb.sheetnames == ['Sheet', 'Notes', 'Prices']  # Skipped sheets keep their position
+            assert tbl.name == 'hello' and tbl.prices[2] == ('c', 3)
+            assert tbl.get_sheet('Notes').Cells(2, 1).Value is None
+            try:
+                tbl.save(os.path.join(tmp, 'skipped.csv'))
+                raise AssertionError('Saving a workbook without every sheet should raise a ValueError')
+            except ValueError:
+                pass
+
+        filename = os.path.join(tmp, 'comment.csv')
+        with open(filename, 'w') as f:
+            f.write('# id\n1\n2\n')
+
+        class CommentTable(xl.OpenpyxlTable):
+            column = xl.Column(1)
+
+        for backend in ('grid', 'mmap', 'openpyxl'):
+            class LoadTable(CommentTable):
+                CSV_BACKEND = backend
+
+            tbl = LoadTable(filename)
+            assert len(tbl.wb.sheetnames) == 1 and tbl.column == ('# id', 1, 2)
+
+
+def test_csv_mmap():
+    import os
+    import tempfile
+    import xl_tables as xl
+    from xl_tables.openpyxl_support.mmap_csv import MmapWorkbook, MmapSheet, INDEX_EXT
+
+    class MyTable(xl.OpenpyxlTable):
+        CSV_BACKEND = 'mmap'
+        header = xl.Row(1, row_length=3)
+        top = xl.Range('A2:C3')
+        tail = xl.Range('A99:C101')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'mmap.csv')
+        with open(filename, 'w', newline='') as f:
+            f.write('id,price,note\r\n')
+            for i in range(1, 101):
+                f.write('{},{},"line\n{}, ""quoted"""\r\n'.format(i, i / 2, i) if i % 7 == 0 else
+                        '{},{},note{}\r\n'.format(i, i / 2, i))
+
+        tbl = MyTable(filename)
+        assert isinstance(tbl.wb, MmapWorkbook) and os.path.exists(filename + INDEX_EXT)
+        ws = tbl.get_sheet(1).sheet
+        assert isinstance(ws, MmapSheet) and ws.max_row == 101 and len(ws.row_cache) == 0  # Nothing was decoded
+        assert tbl.header == ('id', 'price', 'note')
+        assert tbl.top == ((1, 0.5, 'note1'), (2, 1.0, 'note2'))
+        assert tbl.tail == ((98, 49.0, 'line\n98, "quoted"'), (99, 49.5, 'note99'), (100, 50.0, 'note100'))
+        assert tbl.Cells(50, 3).Value == 'line\n49, "quoted"' and tbl.Cells(102, 1).Value is None
+        assert len(ws.row_cache) < 10
+
+        # The saved index is used again until the file changes
+        assert MyTable(filename).Cells(101, 1).Value == 100
+
+        # Written values are kept until the file is saved. Saving over the mapped file maps the new file.
+        tbl.Cells(2, 3).Value = 'changed'
+        tbl.Cells(103, 3).Value = 'last'
+        assert tbl.Cells(2, 3).Value == 'changed' and ws.max_row == 103
+        data = tbl.wb.data
+        tbl.save()
+        assert data.closed and not tbl.wb.data.closed and not tbl.is_dirty()
+        assert tbl.get_sheet(1).sheet.overlay == {} and tbl.Cells(103, 3).Value == 'last'
+        tbl.Cells(4, 3).Value = 'again'
+        tbl.save()
+        assert MyTable(filename).Cells(4, 3).Value == 'again'
+        tbl.Close()
+
+        tbl = MyTable(filename)
+        assert tbl.Cells(2, 3).Value == 'changed' and tbl.Cells(103, 3).Value == 'last'
+        assert tbl.tail[1] == (99, 49.5, 'note99')
+        tbl.Close()
+
+        # Multi-sheet files use the grid backend
+        tbl.get_sheet('Other')
+        tbl.save(os.path.join(tmp, 'sheets.csv'))
+        assert not isinstance(MyTable(os.path.join(tmp, 'sheets.csv')).wb, MmapWorkbook)
+
+
+def test_xlsx_fields_only():
+    import os
+    import datetime
+    import tempfile
+    import openpyxl
+    import xl_tables as xl
+    from xl_tables.openpyxl_support.grid import GridWorkbook
+    from xl_tables.openpyxl_support.xlsx_reader import XlsxReader
+
+    class MyTable(xl.OpenpyxlTable):
+        XLSX_FIELDS_ONLY = True
+        header = xl.Row(1, row_length=3, sheet='Data')
+        first = xl.Range('A2:C3', sheet='Data')
+        note = xl.Cell('B2', sheet=3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'fields.xlsx')
+        wb = openpyxl.Workbook()
+        wb.active.title = 'Data'
+        wb.active.append(['id', 'when', 'flag'])
+        for i in range(1, 1001):
+            wb.active.append([i, datetime.datetime(2021, 1, i % 28 + 1), i % 2 == 0, '=A{}*2'.format(i + 1)])
+        wb.create_sheet('Unused')['A1'] = 'unused'
+        wb.create_sheet('Notes')['B2'] = 'note'
+        wb.save(filename)
+
+        # Every cell is read like openpyxl reads it
+        full = openpyxl.load_workbook(filename)
+        with XlsxReader(filename) as reader:
+            assert reader.sheetnames == full.sheetnames
+            for index, ws in enumerate(full.worksheets, 1):
+                values = {(cell.row, cell.column): cell.value for row in ws.iter_rows() for cell in row
+                          if cell.value is not None}
+                assert {(row, column): value for row, column, value in reader.iter_cells(index)} == values
+            assert list(reader.iter_cells('Data', [(2, 2, 2, 4)])) == [(2, 2, datetime.datetime(2021, 1, 2)),
+                                                                        (2, 3, False), (2, 4, '=A2*2')]
+
+        # Only the cells the fields use are loaded
+        tbl = MyTable(filename)
+        assert isinstance(tbl.wb, GridWorkbook) and tbl.wb.sheetnames == ['Data', 'Unused', 'Notes']
+        assert tbl.header == ('id', 'when', 'flag')
+        assert tbl.first == ((1, datetime.datetime(2021, 1, 2), False), (2, datetime.datetime(2021, 1, 3), True))
+        assert tbl.note == 'note'
+        assert tbl.wb['Data'].max_row == 3 and tbl.wb['Unused'].max_row == 0
+        try:
+            tbl.save(os.path.join(tmp, 'saved.xlsx'))
+            raise AssertionError('Saving a workbook without every cell should raise a ValueError')
+        except ValueError:
+            pass
+
+
+def test_fast_save():
+    import os
+    import datetime
+    import tempfile
+    import zipfile
+    import openpyxl
+    from openpyxl.styles import Font
+    from openpyxl.workbook.defined_name import DefinedName
+    import xl_tables as xl
+
+    class MyTable(xl.OpenpyxlTable):
+        header = xl.Row(1, row_length=4)
+        rows = xl.Range('A2:D3')
+        price = xl.Cell('E2')
+
+    def is_fast(filename):
+        return 'docProps/app.xml' not in zipfile.ZipFile(filename).namelist()  # Only openpyxl writes docProps
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'fast.xlsx')
+        tbl = MyTable()
+        tbl.header = ['id', 'name', 'when', 'flag']
+        tbl.rows = [(1, ' padded & <quoted> ', datetime.datetime(2021, 1, 29, 16, 1), True),
+                    (2.5, '=A2*2', datetime.date(2021, 2, 1), False)]
+        tbl.price = 3.25
+        tbl.get_sheet(1).sheet['E2'].number_format = '0.00'
+        tbl.get_sheet('Other').Cells(1, 1).Value = 'other'
+        tbl.save(filename)
+        assert is_fast(filename)
+
+        ws = openpyxl.load_workbook(filename)['Sheet']
+        assert [c.value for c in ws[1]] == ['id', 'name', 'when', 'flag', None]
+        assert [c.value for c in ws[2]] == [1, ' padded & <quoted> ', datetime.datetime(2021, 1, 29, 16, 1), True, 3.25]
+        assert [c.value for c in ws[3]][:4] == [2.5, '=A2*2', datetime.datetime(2021, 2, 1), False]
+        assert ws['C2'].number_format == 'yyyy-mm-dd h:mm:ss' and ws['C3'].number_format == 'yyyy-mm-dd'
+        assert ws['E2'].number_format == '0.00'
+        assert MyTable(filename).header == ('id', 'name', 'when', 'flag')
+
+        # Styles and other features use the openpyxl serializer
+        tbl.get_sheet(1).sheet['A1'].font = Font(bold=True)
+        tbl.save(filename)
+        assert not is_fast(filename) and openpyxl.load_workbook(filename)['Sheet']['A1'].font.bold
+
+        class NoFastTable(MyTable):
+            FAST_SAVE = False
+
+        NoFastTable().save(os.path.join(tmp, 'slow.xlsx'))
+        assert not is_fast(os.path.join(tmp, 'slow.xlsx'))
+
+        # Error values are written as error cells
+        errors = MyTable()
+        errors.price = '#N/A'
+        errors.save(os.path.join(tmp, 'errors.xlsx'))
+        assert is_fast(os.path.join(tmp, 'errors.xlsx'))
+        ws = openpyxl.load_workbook(os.path.join(tmp, 'errors.xlsx'))['Sheet']
+        assert ws['E2'].value == '#N/A' and ws['E2'].data_type == 'e'
+
+        # Opened Excel files keep their properties, views, page setup and calculation settings
+        features = os.path.join(tmp, 'features.xlsx')
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws['A1'] = 'id'
+        ws['F1'] = '#N/A'
+        wb.properties.title = 'Prices'
+        wb.properties.creator = 'Someone'
+        ws.sheet_view.showGridLines = False
+        ws.sheet_view.zoomScale = 85
+        ws.page_setup.orientation = 'landscape'
+        ws.oddHeader.center.text = 'Header'
+        ws.oddFooter.center.text = 'Footer'
+        ws.sheet_properties.pageSetUpPr.fitToPage = True
+        wb.calculation.calcMode = 'manual'
+        wb.save(features)
+
+        tbl = MyTable(features)
+        tbl.price = 4.5
+        tbl.save(features)
+        assert not is_fast(features)
+        wb = openpyxl.load_workbook(features)
+        ws = wb['Sheet']
+        assert wb.properties.title == 'Prices' and wb.properties.creator == 'Someone'
+        assert ws.sheet_view.showGridLines is False and ws.sheet_view.zoomScale == 85
+        assert ws.page_setup.orientation == 'landscape' and ws.sheet_properties.pageSetUpPr.fitToPage
+        assert ws.oddHeader.center.text == 'Header' and ws.oddFooter.center.text == 'Footer'
+        assert wb.calculation.calcMode == 'manual'
+        assert ws['A1'].value == 'id' and ws['E2'].value == 4.5
+        assert ws['F1'].value == '#N/A' and ws['F1'].data_type == 'e'
+
+        # The whitelist rejects the same features on a new workbook
+        tbl = MyTable()
+        tbl.get_sheet(1).sheet.sheet_view.zoomScale = 85
+        tbl.save(os.path.join(tmp, 'zoom.xlsx'))
+        assert not is_fast(os.path.join(tmp, 'zoom.xlsx'))
+        assert openpyxl.load_workbook(os.path.join(tmp, 'zoom.xlsx'))['Sheet'].sheet_view.zoomScale == 85
+
+        # Sheet scoped defined names use the openpyxl serializer
+        tbl = MyTable()
+        tbl.get_sheet(1).sheet.defined_names.add(DefinedName('price', attr_text='Sheet!$E$2'))
+        tbl.save(os.path.join(tmp, 'names.xlsx'))
+        assert not is_fast(os.path.join(tmp, 'names.xlsx'))
+        assert 'price' in openpyxl.load_workbook(os.path.join(tmp, 'names.xlsx'))['Sheet'].defined_names
+
+        # The used range is written, so read only workbooks can size open ended fields
+        class OpenTable(xl.OpenpyxlTable):
+            column = xl.Column(1)
+
+        tbl = OpenTable()
+        tbl.column = [1, 2, 3]
+        tbl.save(os.path.join(tmp, 'open.xlsx'))
+        assert is_fast(os.path.join(tmp, 'open.xlsx'))
+        assert openpyxl.load_workbook(os.path.join(tmp, 'open.xlsx'), read_only=True).active.max_row == 3
+        assert OpenTable(os.path.join(tmp, 'open.xlsx'), read_only=True).column == (1, 2, 3)
+
+        # CSV grids are written directly
+        csv_name = os.path.join(tmp, 'grid.csv')
+        with open(csv_name, 'w', newline='') as f:
+            f.write('id,price\n1,0.5\n2,1.5\n')
+        class GridTable(MyTable):
+            CSV_BACKEND = 'grid'
+
+        GridTable(csv_name).save(os.path.join(tmp, 'grid.xlsx'))
+        assert is_fast(os.path.join(tmp, 'grid.xlsx'))
+        assert [[c.value for c in row] for row in openpyxl.load_workbook(os.path.join(tmp, 'grid.xlsx')).active] == \
+            [['id', 'price'], [1, 0.5], [2, 1.5]]
+
+
+if __name__ == '__main__':
+    test_read_only()
+    test_write_only()
+    test_clip_open_ended()
+    test_reads_do_not_create_cells()
+    test_multi_area()
+    test_bulk_write()
+    test_sheet_cache()
+    test_item_plan()
+    test_field_registry()
+    test_constant_template()
+    test_read_all()
+    test_batch()
+    test_changes()
+    test_value_cache()
+    test_to_numpy()
+    test_dataframe()
+    test_arrow_export()
+    test_list_append()
+    test_range_view()
+    test_csv_types()
+    test_csv_grid()
+    test_csv_sheets()
+    test_csv_mmap()
+    test_xlsx_fields_only()
+    test_fast_save()
+
+    print('All tests finished successfully!')
@@ -12,6 +12,22 @@ from .dtypes import (
     DATETIME_FORMATS,
 )
 
+from .array_utils import (
+    import_numpy,
+    is_ndarray,
+    ndarray_to_list,
+    value_to_grid,
+    get_grids,
+    grid_to_numpy,
+    import_pandas,
+    grid_to_dataframe,
+    dataframe_to_rows,
+    import_pyarrow,
+    infer_schema,
+    iter_record_batches,
+    write_record_batches,
+)
+
 from .fields import (
     CustomProperty,
     extract_single,
@@ -19,6 +35,11 @@ from .fields import (
     decode_value,
     encode_value,
     excel_column_name,
+    excel_column_index,
+    get_area_bounds,
+    ItemPlan,
+    RangeView,
+    DecodedObject,
     Field,
     Item,
     RangeItem,
@@ -36,6 +57,20 @@ from .fields import (
     DateTime,
     Date,
     Time,
+    FieldRegistry,
+    collect_fields,
+    FieldsMeta,
+    GridItem,
+    read_fields,
+    BatchItem,
+    Batch,
+    get_blocks,
+    overlaps,
+    invalidate_values,
+    to_dataframe,
+    from_dataframe,
+    iter_field_batches,
+    export_tables,
     get_row_text,
     get_table_text,
     save_table,
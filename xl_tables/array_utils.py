@@ -0,0 +1,427 @@
+"""Optional array library support. NumPy, pandas and pyarrow are only imported when a feature that uses them is used.
+"""
+import os
+
+
+__all__ = ['import_numpy', 'is_ndarray', 'ndarray_to_list', 'value_to_grid', 'get_grids', 'grid_to_numpy',
+           'import_pandas', 'grid_to_dataframe', 'dataframe_to_rows',
+           'import_pyarrow', 'infer_schema', 'iter_record_batches', 'write_record_batches']
+
+
+def import_numpy():
+    """Import and return numpy or raise an ImportError that says how to install it."""
+    try:
+        import numpy
+    except ImportError as err:
+        raise ImportError('NumPy is required to use arrays! Install it with "pip install numpy".') from err
+    return numpy
+
+
+def import_pandas():
+    """Import and return pandas or raise an ImportError that says how to install it."""
+    try:
+        import pandas
+    except ImportError as err:
+        raise ImportError('pandas is required to use DataFrames! Install it with "pip install pandas".') from err
+    return pandas
+
+
+def import_pyarrow():
+    """Import and return pyarrow or raise an ImportError that says how to install it."""
+    try:
+        import pyarrow
+    except ImportError as err:
+        raise ImportError('pyarrow is required to export Arrow and Parquet files! '
+                          'Install it with "pip install pyarrow".') from err
+    return pyarrow
+
+
+def is_ndarray(value):
+    """Return if the value is a NumPy array or scalar without importing NumPy."""
+    return type(value).__module__.split('.', 1)[0] == 'numpy' and hasattr(value, 'ndim') and \
+        hasattr(value, 'tolist')
+
+
+FINE_TIME_UNITS = ('ns', 'ps', 'fs', 'as')  # datetime64 and timedelta64 units that tolist() returns as integers
+
+
+def ndarray_to_list(value):
+    """Convert a NumPy array into nested lists of Python values. NaN, NaT and masked values are converted to None.
+
+    datetime64 and timedelta64 values finer than microseconds are converted to microseconds first, so they become
+    datetime and timedelta objects instead of integers.
+    """
+    np = import_numpy()
+    if value.dtype.kind in 'mM' and np.datetime_data(value.dtype)[0] in FINE_TIME_UNITS:
+        value = value.astype('{}64[us]'.format('datetime' if value.dtype.kind == 'M' else 'timedelta'))
+
+    if value.ndim == 0:
+        value = value.item()
+        return None if isinstance(value, float) and value != value else value
+
+    if isinstance(value, np.ma.MaskedArray):
+        mask = np.ma.getmaskarray(value)
+        value = ndarray_to_list(value.data)
+        if mask.any():
+            value = np.array(value, dtype=object)
+            value[mask] = None
+            value = value.tolist()
+        return value
+    elif value.dtype.kind in 'fc':
+        mask = np.isnan(value)
+        if mask.any():
+            value = value.astype(object)
+            value[mask] = None
+    elif value.dtype.kind in 'mM':
+        mask = np.isnat(value)
+        value = value.astype(object)
+        value[mask] = None
+    return value.tolist()
+
+
+def value_to_grid(value):
+    """Return the ((rows, columns), rows) grid for a Range.Value."""
+    if not isinstance(value, (list, tuple)):
+        value = ((value,),)  # Single cell
+    elif len(value) > 0 and not isinstance(value[0], (list, tuple)):
+        value = (value,)  # Flat row
+    width = max((len(row) for row in value), default=0)
+    return (len(value), width), iter(value)
+
+
+def get_grids(item):
+    """Return the list of ((rows, columns), rows) grids for every area of a backend item.
+
+    Backends can give an iter_grids() method that streams the rows of every area. Otherwise one Value is read for every
+    area.
+    """
+    iter_grids = getattr(item, 'iter_grids', None)
+    if iter_grids is not None:
+        return list(iter_grids())
+    return [value_to_grid(area.Value) for area in item.Areas]
+
+
+def fill_array(shape, rows, dtype=None):
+    """Fill a preallocated array of the given shape with the rows. None values are NaN for float arrays, None for
+    object arrays and masked for every other dtype.
+    """
+    np = import_numpy()
+    dtype = np.dtype(object if dtype is None else dtype)
+    if dtype.kind == 'O':
+        arr = np.empty(shape, dtype=dtype)
+        for i, row in enumerate(rows):
+            arr[i, :len(row)] = row
+        return arr
+
+    elif dtype.kind in 'fc':
+        nan = float('nan')
+        arr = np.full(shape, nan, dtype=dtype)
+        for i, row in enumerate(rows):
+            arr[i, :len(row)] = [nan if v is None else v for v in row]
+        return arr
+
+    arr = np.zeros(shape, dtype=dtype)
+    mask = np.ones(shape, dtype=bool)
+    for i, row in enumerate(rows):
+        for j, v in enumerate(row):
+            if v is not None:
+                arr[i, j] = v
+                mask[i, j] = False
+    if mask.any():
+        arr = np.ma.MaskedArray(arr, mask=mask)
+    return arr
+
+
+def infer_dtype(arr):
+    """Return float if every value of the object array is a number or None, else object."""
+    for value in arr.flat:
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            return object
+    return float
+
+
+def grid_to_numpy(grids, dtype=None):
+    """Return a NumPy array for the ((rows, columns), rows) grids of every area.
+
+    Areas are stacked as rows, so every area must have the same number of columns. A single row or column is returned
+    as a 1-D array like decode_value returns a flat tuple.
+
+    Args:
+        grids (list): List of ((rows, columns), rows) for every area (see get_grids).
+        dtype (object)[None]: NumPy dtype. If None numbers are float (None is NaN) and everything else is object.
+
+    Returns:
+        arr (np.ndarray/np.ma.MaskedArray): Values in the given dtype. None values are NaN for float arrays and masked
+            for other non object dtypes.
+    """
+    np = import_numpy()
+    widths = {shape[1] for shape, _ in grids}
+    if len(widths) > 1:
+        raise ValueError('Every area must have the same number of columns to make an array!')
+
+    arrays = [fill_array(shape, rows, dtype) for shape, rows in grids]
+    if len(arrays) == 1:
+        arr = arrays[0]
+    elif any(isinstance(a, np.ma.MaskedArray) for a in arrays):
+        arr = np.ma.concatenate(arrays, axis=0)
+    else:
+        arr = np.concatenate(arrays, axis=0)
+
+    if dtype is None:
+        arr = fill_array(arr.shape, arr, infer_dtype(arr))
+
+    if arr.ndim == 2 and (arr.shape[0] == 1 or arr.shape[1] == 1):
+        arr = arr.reshape(-1)
+    return arr
+
+
+def grid_to_dataframe(grids, columns=None, parse_dates=False):
+    """Return a pandas DataFrame for the ((rows, columns), rows) grids of every area.
+
+    The column lists are built in one pass over the rows. Areas are stacked as rows and trailing empty rows are
+    removed.
+
+    Args:
+        grids (list): List of ((rows, columns), rows) for every area (see get_grids).
+        columns (list)[None]: Column names. Missing or empty names use the column number.
+        parse_dates (bool)[False]: Convert every column to datetime64.
+
+    Returns:
+        df (pd.DataFrame): DataFrame with a column for every column of the range.
+    """
+    pd = import_pandas()
+    width = max((shape[1] for shape, _ in grids), default=0)
+    data = [[] for _ in range(width)]
+    filled = 0  # Number of rows up to the last row with a value
+    for _, rows in grids:
+        for row in rows:
+            has_value = False
+            for col, value in zip(data, row):
+                col.append(value)
+                has_value = has_value or value is not None
+            for col in data[len(row):]:
+                col.append(None)
+            if has_value:
+                filled = len(data[0])
+
+    names = get_column_names(columns, width)
+    df = pd.DataFrame({i: col[:filled] for i, col in enumerate(data)})
+    df.columns = names
+    if parse_dates:
+        for name in df.columns:
+            df[name] = pd.to_datetime(df[name], errors='coerce')
+    return df
+
+
+def to_python(value):
+    """Convert a pandas or NumPy value into a Python value. Missing values are None."""
+    if value is None:
+        return None
+    elif is_ndarray(value):
+        return ndarray_to_list(value)
+
+    to_pydatetime = getattr(value, 'to_pydatetime', None)
+    if to_pydatetime is not None:
+        value = to_pydatetime()  # Timestamp
+
+    try:
+        if value != value:
+            return None  # NaN, NaT or NA
+    except (ValueError, TypeError):
+        return None  # pd.NA cannot be compared
+    return value
+
+
+def dataframe_to_rows(df, index=False):
+    """Yield a tuple of Python values for every row of the DataFrame. Missing values are None."""
+    for row in df.itertuples(index=index, name=None):
+        yield tuple(to_python(value) for value in row)
+
+
+def get_column_names(columns, width):
+    """Return the column names for the width. Missing or empty names use the column number."""
+    names = list(columns or [])[:width]
+    names = [i if name is None or name == '' else name for i, name in enumerate(names)]
+    names.extend(range(len(names), width))
+    return names
+
+
+def widen_type(pa, dtype, other):
+    """Return the Arrow type that holds the values of both types. Integers and floats are float64 and every other
+    mix is a string.
+    """
+    if dtype is None or dtype == pa.null() or dtype == other:
+        return other
+    elif other is None or other == pa.null():
+        return dtype
+    elif (pa.types.is_integer(dtype) or pa.types.is_floating(dtype)) and \
+            (pa.types.is_integer(other) or pa.types.is_floating(other)):
+        return pa.float64()
+    return pa.string()
+
+
+def infer_schema(grids, columns=None):
+    """Return the pyarrow Schema for the values of every row of the grids.
+
+    One value of every Python type is kept for each column, so the rows are streamed without keeping them. The types of
+    a column are widened (see widen_type) and empty columns are strings.
+
+    Args:
+        grids (iterable): ((rows, columns), rows) for every area (see get_grids).
+        columns (list)[None]: Column names. Missing or empty names use the column number.
+
+    Returns:
+        schema (pa.Schema): Schema with a field for every column.
+    """
+    pa = import_pyarrow()
+    samples = []  # [{Python type: first value}] for every column
+    width = 0
+    for shape, rows in grids:
+        width = max(width, shape[1])
+        for row in rows:
+            if len(row) > len(samples):
+                samples.extend({} for _ in range(len(row) - len(samples)))
+            for i, value in enumerate(row):
+                if value is not None:
+                    samples[i].setdefault(type(value), value)
+    width = max(width, len(samples))
+    samples.extend({} for _ in range(width - len(samples)))
+
+    types = []
+    for values in samples:
+        dtype = None
+        for value in values.values():
+            try:
+                other = pa.array([value]).type
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                other = pa.string()
+            dtype = widen_type(pa, dtype, other)
+        types.append(pa.string() if dtype is None or dtype == pa.null() else dtype)
+
+    names = [str(name) for name in get_column_names(columns, width)]
+    return pa.schema([pa.field(name, dtype) for name, dtype in zip(names, types)])
+
+
+def to_arrow_array(pa, values, dtype):
+    """Return a pyarrow Array of the values with the type. Values are cast safely, so a value that does not fit the type
+    raises an ArrowInvalid error instead of being truncated. Values of string columns are converted with str().
+    """
+    try:
+        arr = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if dtype != pa.string():
+            raise
+        arr = None
+
+    if arr is not None and arr.type == dtype:
+        return arr
+    elif dtype == pa.string() and (arr is None or arr.type != pa.null()):
+        return pa.array([None if v is None else str(v) for v in values], type=dtype)
+    return arr.cast(dtype, safe=True)
+
+
+def iter_record_batches(grids, columns=None, batch_size=65536, schema=None):
+    """Yield pyarrow RecordBatches for the ((rows, columns), rows) grids of every area streaming the rows.
+
+    Only batch_size rows are kept in memory. Areas are stacked as rows and trailing empty rows are removed.
+
+    Args:
+        grids (list/callable): List of ((rows, columns), rows) for every area (see get_grids) or a function that returns
+            a new list. If the schema is inferred a function is called twice to stream the rows twice. The rows of a
+            list are kept in memory to read them twice.
+        columns (list)[None]: Column names. Missing or empty names use the column number.
+        batch_size (int)[65536]: Number of rows in every RecordBatch.
+        schema (pa.Schema)[None]: Schema of the batches. If None the schema is inferred from every row (see
+            infer_schema). Values that do not fit the schema raise an ArrowInvalid error instead of being truncated.
+
+    Returns:
+        batches (generator): pyarrow RecordBatch generator.
+    """
+    pa = import_pyarrow()
+    if schema is None:
+        if callable(grids):
+            schema = infer_schema(grids(), columns)
+        else:
+            grids = [(shape, list(rows)) for shape, rows in grids]
+            schema = infer_schema(grids, columns)
+    if callable(grids):
+        grids = grids()
+
+    width = max((shape[1] for shape, _ in grids), default=0)
+    types = schema.types
+
+    def make_batch(data):
+        arrays = [to_arrow_array(pa, col, dtype) for col, dtype in zip(data, types)]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    data = [[] for _ in range(width)]
+    size = 0
+    empty_row = (None,) * width
+    empty = 0  # Empty rows that are only added if a row with a value comes after them
+    for _, rows in grids:
+        for row in rows:
+            if all(value is None for value in row):
+                empty += 1
+                continue
+
+            for values in [empty_row] * empty + [row]:
+                for i, col in enumerate(data):
+                    col.append(values[i] if i < len(values) else None)
+                size += 1
+                if size >= batch_size:
+                    yield make_batch(data)
+                    data = [[] for _ in range(width)]
+                    size = 0
+            empty = 0
+
+    if size > 0:
+        yield make_batch(data)
+
+
+def write_record_batches(filename, batches, file_format=None, schema=None):
+    """Write RecordBatches to a Parquet or Arrow IPC file. Every batch is written as it is made (one Parquet row
+    group for every batch).
+
+    Args:
+        filename (str): Filename to write.
+        batches (iterable): RecordBatches to write.
+        file_format (str)[None]: 'parquet' or 'ipc'. If None use the file extension (.parquet, .pq or .arrow, .feather,
+            .ipc).
+        schema (pa.Schema)[None]: Schema used if there are no batches.
+
+    Returns:
+        count (int): Number of rows written.
+    """
+    pa = import_pyarrow()
+    if file_format is None:
+        ext = os.path.splitext(filename)[-1].lower()
+        if ext in ('.parquet', '.pq'):
+            file_format = 'parquet'
+        elif ext in ('.arrow', '.feather', '.ipc'):
+            file_format = 'ipc'
+        else:
+            raise ValueError('Unknown file format for {}! Give file_format="parquet" or "ipc".'.format(filename))
+
+    def make_writer(schema):
+        if file_format == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(filename, schema)
+        elif file_format == 'ipc':
+            return pa.ipc.new_file(filename, schema)
+        raise ValueError('Invalid file_format {}!'.format(file_format))
+
+    writer = None
+    count = 0
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = make_writer(batch.schema)
+            writer.write_batch(batch)
+            count += batch.num_rows
+
+        if writer is None:
+            writer = make_writer(schema or pa.schema([]))
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
@@ -1,18 +1,28 @@
+import re
 import string
-import wrapt
+from collections import namedtuple
 from itertools import takewhile
 from .dtypes import datetime, date, time
+from .array_utils import is_ndarray, ndarray_to_list, get_grids, grid_to_numpy, grid_to_dataframe, dataframe_to_rows, \
+    infer_schema, iter_record_batches, write_record_batches
 
 
 __all__ = ['CustomProperty', 'extract_single', 'is_iterable', 'decode_value', 'encode_value', 'excel_column_name',
-           'Field', 'Item',
+           'excel_column_index', 'get_area_bounds', 'ItemPlan', 'iter_line', 'get_line_length', 'get_tail_length',
+           'set_tail_length', 'RangeView', 'DecodedObject', 'Field', 'Item',
            'RangeItem', 'RowItem', 'ColumnItem', 'CellItem', 'ConstantItem',
            'Range', 'Row', 'Column', 'Cell', 'Constant', 'BuiltinDocumentPropertyItem', 'BuiltinDocumentProperty',
-           'DateTime', 'Date', 'Time',
+           'DateTime', 'Date', 'Time', 'FieldRegistry', 'collect_fields', 'FieldsMeta', 'GridItem', 'read_fields',
+           'BatchItem', 'Batch', 'get_blocks', 'overlaps', 'invalidate_values', 'to_dataframe', 'from_dataframe',
+           'iter_field_batches', 'export_tables',
            'get_row_text', 'get_table_text', 'save_table', 'text_to_table', 'parse_table'
            ]
 
 
+DEFAULT_COL_LENGTH = 16840  # Default column size in excel
+DEFAULT_ROW_LENGTH = 702  # Default row size in excel ($ZZ)
+
+
 class CustomProperty(object):
     def __init__(self, fget=None, fset=None, fdel=None, doc=None):
         super().__init__()
@@ -113,10 +123,13 @@ def is_iterable(value, allow_str=False):
 
 
 def is_contiguous(items):
-    """Return if the given items are contiguous."""
-    for i in range(len(items)-1):
-        if (items[i] - items[i+1]) > 1:
-            return False
+    """Return if the given items are contiguous (every item is one more than the previous item)."""
+    try:
+        for i in range(len(items)-1):
+            if (items[i+1] - items[i]) != 1:
+                return False
+    except TypeError:
+        return False  # Column names
     return True
 
 
@@ -131,28 +144,247 @@ def excel_column_name(col):
     return col
 
 
-class DecodedObject(wrapt.ObjectProxy):
+def excel_column_index(name):
+    """Take in an excel column name and return the column number."""
+    num = 0
+    for char in name.upper():
+        num = num * 26 + (ord(char) - 64)
+    return num
+
+
+AREA_PATTERN = re.compile(r'^\$?([A-Za-z]*)\$?(\d*)(?::\$?([A-Za-z]*)\$?(\d*))?$')
+
+
+def get_area_bounds(area):
+    """Return the numeric (min_row, min_col, max_row, max_col) bounds for an A1 area string.
+
+    Whole row and whole column areas ("3:3", "A:A") have None for the open ended bounds.
+    """
+    match = AREA_PATTERN.match(area.strip())
+    if match is None or not any(match.groups()):
+        raise ValueError('Invalid range {}!'.format(area))
+
+    min_col, min_row, max_col, max_row = match.groups()
+    if max_col is None:
+        max_col, max_row = min_col, min_row  # Single cell
+    min_col = excel_column_index(min_col) if min_col else None
+    max_col = excel_column_index(max_col) if max_col else None
+    min_row = int(min_row) if min_row else None
+    max_row = int(max_row) if max_row else None
+    return min_row, min_col, max_row, max_col
+
+
+class ItemPlan(namedtuple('ItemPlan', 'sheet range_str areas bounds shape open_ended')):
+    """Precomputed access plan for an Item.
+
+    Args:
+        sheet (int/str): Sheet index or name.
+        range_str (str): String to make the Range with.
+        areas (tuple): A1 string for every area.
+        bounds (tuple): Numeric (min_row, min_col, max_row, max_col) for every area. Open ended bounds are None.
+        shape (tuple): Expected (rows, columns) for every area. Open ended sizes are None.
+        open_ended (tuple): (rows, columns) flags for every area. A flag is True if the Column or Row length was not
+            given and the default length was used, so backends can clip it to the used range.
+    """
+    @classmethod
+    def compile(cls, sheet, range_str, open_areas=None):
+        """Parse the range string once and return the plan.
+
+        Args:
+            sheet (int/str): Sheet index or name.
+            range_str (str): String to make the Range with.
+            open_areas (dict)[None]: {A1 area string: (rows, columns)} flags of the open ended areas.
+        """
+        areas = tuple(area.strip() for area in (range_str or '').split(',') if area.strip())
+        try:
+            bounds = tuple(get_area_bounds(area) for area in areas)
+        except ValueError:
+            bounds = tuple((None, None, None, None) for _ in areas)  # Named ranges are resolved by the backend
+
+        shape = tuple((None if min_row is None or max_row is None else max_row - min_row + 1,
+                       None if min_col is None or max_col is None else max_col - min_col + 1)
+                      for min_row, min_col, max_row, max_col in bounds)
+        open_areas = open_areas or {}
+        open_ended = tuple(open_areas.get(area, (False, False)) for area in areas)
+        return cls(sheet, range_str, areas, bounds, shape, open_ended)
+
+
+def iter_line(item, start=1, cols=True):
+    """Yield the values of the first column (or row) of an item starting at the 1-based start position.
+
+    Backends can give an iter_line() method. Otherwise the values are read in growing chunks, so a scan that stops at
+    the first empty cell only reads a few cells past it.
+
+    Args:
+        item (Excel Item/object): Excel Item object (Row, Column, Range)
+        start (int)[1]: Position of the first value to yield.
+        cols (bool)[True]: Yield the first column. If False yield the first row.
+    """
+    if hasattr(type(item), 'iter_line'):
+        yield from item.iter_line(start, cols)
+        return
+
+    if item.Areas.Count > 1:
+        item = item.Areas(1)
+    end = item.Rows.Count if cols else item.Columns.Count
+    size = 16
+    while start <= end:
+        count = min(size, end - start + 1)
+        if cols:
+            value = item.Cells(start, 1).Resize(count, 1).Value
+        else:
+            value = item.Cells(1, start).Resize(1, count).Value
+
+        if not is_iterable(value, allow_str=False):
+            yield value
+        elif cols:
+            yield from (row[0] for row in value)
+        else:
+            yield from value[0]
+        start += count
+        size = min(size * 2, 4096)
+
+
+def get_line_length(item, start=1, cols=True):
+    """Return the position of the last value before the first empty cell at or after the 1-based start position.
+
+    Returns start - 1 if the cell at the start position is empty.
+    """
+    length = start - 1
+    for value in iter_line(item, start, cols):
+        if value is None:
+            break
+        length += 1
+    return length
+
+
+def get_tail_length(instance, field):
+    """Return the contiguous length that was kept for the field and instance or None if it is not known.
+
+    The length is kept until the plan changes, the sheet key changes (see get_sheet_key of the Table) or the backend
+    reports a write that overlaps the range (see was_written).
+    """
+    plan = getattr(field, 'plan', None)
+    lengths = getattr(instance, '_tail_lengths', None)
+    if plan is None or not lengths:
+        return None
+
+    entry = lengths.get(field, None)
+    if entry is None or entry[0] is not plan or entry[1] != instance.get_sheet_key(plan.sheet):
+        return None
+    elif entry[2] != instance.get_write_version(plan.sheet) and \
+            instance.was_written(plan.sheet, plan.bounds, entry[2]):
+        return None
+    return entry[3]
+
+
+def set_tail_length(instance, field, length):
+    """Keep the contiguous length for the field and instance. Call this after writing, so the write is included."""
+    plan = getattr(field, 'plan', None)
+    if instance is None or plan is None:
+        return
+    try:
+        lengths = instance._tail_lengths
+    except AttributeError:
+        lengths = instance._tail_lengths = {}
+    lengths[field] = (plan, instance.get_sheet_key(plan.sheet), instance.get_write_version(plan.sheet), length)
+
+
+class RangeView(object):
     """Custom Excel Item object that has array and list methods.
 
+    The view only keeps the field and the Table instance. The backend item is looked up when it is first used and every
+    other attribute is forwarded to it. The contiguous length is kept for the field and Table instance, so append,
+    extend and pop only read the cells at the end of the values.
+
     Args:
-        item (Excel Item/object): Excel Item object (Row, Column, Range, Cell)
+        item (Excel Item/object)[None]: Excel Item object (Row, Column, Range, Cell). If None use the field item.
+        parent (Item)[None]: Field that made the view.
+        instance (Table)[None]: Table instance that made the view.
 
     Returns:
-        value (DecodedObject): Python item/object/value that was read
+        value (RangeView): Python item/object/value that was read
     """
-    def __init__(self, wrapped):
-        self._self_xl_parent = None
-        super().__init__(wrapped)
+    __slots__ = ('_self_xl_item', '_self_xl_parent', '_self_xl_instance')
+
+    def __init__(self, wrapped=None, parent=None, instance=None):
+        # Set the slots directly. __setattr__ forwards every other attribute to the backend item
+        SET_VIEW_ITEM(self, wrapped)
+        SET_VIEW_PARENT(self, parent)
+        SET_VIEW_INSTANCE(self, instance)
+
+    @property
+    def __wrapped__(self):
+        """Return the backend item."""
+        item = self._self_xl_item
+        if item is None:
+            item = self._self_xl_parent.get_item(self._self_xl_instance)
+            SET_VIEW_ITEM(self, item)
+        return item
+
+    def __getattr__(self, name):
+        if name in VIEW_SLOTS:
+            raise AttributeError(name)  # Not initialized
+        return getattr(self.__wrapped__, name)
+
+    def __setattr__(self, name, value):
+        if name in VIEW_SLOTS:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.__wrapped__, name, value)
+
+    def __delattr__(self, name):
+        delattr(self.__wrapped__, name)
+
+    # Special methods are looked up on the type, so __getattr__ does not forward them
+    @property
+    def __class__(self):
+        """Return the class of the backend item, so isinstance() checks see the item class as well."""
+        return self.__wrapped__.__class__
+
+    def __call__(self, *args, **kwargs):
+        return self.__wrapped__(*args, **kwargs)
+
+    def __len__(self):
+        return len(self.__wrapped__)
+
+    def __getitem__(self, key):
+        return self.__wrapped__[key]
+
+    def __setitem__(self, key, value):
+        self.__wrapped__[key] = value
+
+    def __iter__(self):
+        return iter(self.__wrapped__)
+
+    def __eq__(self, other):
+        if isinstance(other, RangeView):
+            other = other.__wrapped__
+        return self.__wrapped__ == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.__wrapped__)
+
+    def __bool__(self):
+        return bool(self.__wrapped__)
+
+    def __str__(self):
+        return str(self.__wrapped__)
+
+    def __repr__(self):
+        return '<{} at 0x{:x} for {!r}>'.format(type(self).__name__, id(self), self.__wrapped__)
 
     def to_tuple(self):
         """Return a tuple of contiguous values."""
-        parent = self._self_xl_parent
-
-        if self.Areas.Count > 1:
+        item = self.__wrapped__
+        if item.Areas.Count > 1:
             # Could have multiple areas where .Value will only return the first Area (Range) value.
-            value = tuple(area.Value for area in self.Areas)
+            value = tuple(area.Value for area in item.Areas)
         else:
-            value = self.Value
+            value = item.Value
 
         if is_iterable(value, allow_str=False):
             value = extract_single(value)
@@ -166,46 +398,97 @@ class DecodedObject(wrapt.ObjectProxy):
         """Return a list of contiguous values."""
         return list(self.to_tuple())
 
+    def to_numpy(self, dtype=None):
+        """Return the values of every area as a NumPy array (see grid_to_numpy)."""
+        return grid_to_numpy(get_grids(self.__wrapped__), dtype=dtype)
+
     def length(self):
-        """Return the length of contiguous values."""
-        return len(self.to_tuple())
+        """Return the length of contiguous values.
+
+        A kept length is checked by reading the last value and the cells after it. Otherwise the values are scanned
+        until the first empty cell.
+        """
+        instance = self._self_xl_instance
+        cols = bool(self._self_xl_parent.cols)
+        length = get_tail_length(instance, self._self_xl_parent)
+        if length and next(iter_line(self.__wrapped__, length, cols), None) is not None:
+            length = get_line_length(self.__wrapped__, length + 1, cols)  # Values may have been added after it
+        else:
+            length = get_line_length(self.__wrapped__, 1, cols)
+        set_tail_length(instance, self._self_xl_parent, length)
+        return length
+
+    def _apply_batch(self):
+        """Write the pending batch values to keep the write order."""
+        batch = getattr(self._self_xl_instance, '_batch', None)
+        if batch is not None:
+            batch.apply()
+        invalidate_values(self._self_xl_instance, self._self_xl_parent)
 
     def pop(self, idx=None):
         """Pop off an item at the end."""
         parent = self._self_xl_parent
+        self._apply_batch()
+        length = self.length()
         if idx is None:
-            idx = self.length() + 1  # Excel has an index 1 offset
-
+            idx = length + 1  # Excel has an index 1 offset
         idx -= 1
+        if idx < 1:
+            raise IndexError('pop index out of range')
+
+        cells = self.__wrapped__.Cells
         if parent.cols:
-            val = self.Cells(idx, 1).Value
-            self.Cells(idx, 1).Value = None
+            val = cells(idx, 1).Value
+            cells(idx, 1).Value = None
         else:
-            val = self.Cells(1, idx).Value
-            self.Cells(1, idx).Value = None
+            val = cells(1, idx).Value
+            cells(1, idx).Value = None
+
+        # Removing a value ends the contiguous values before it
+        set_tail_length(self._self_xl_instance, parent, min(length, idx - 1))
         return val
 
     def append(self, value):
         """Append an item to the end of the list."""
-        parent = self._self_xl_parent
-        last_idx = self.length() + 1  # Excel has an index 1 offset
-        if parent.cols:
-            self.Cells(last_idx, 1).Value = value
-        else:
-            self.Cells(1, last_idx).Value = value
+        self.extend((value,))
 
     def extend(self, value):
-        """Extend an item with the given list."""
+        """Extend an item with the given list. The values are written as one block."""
         parent = self._self_xl_parent
-        last_idx = self.length() + 1  # Excel has an index 1 offset
+        self._apply_batch()
+        if is_ndarray(value):
+            value = ndarray_to_list(value)
+        value = list(value)
+        if len(value) == 0:
+            return
+
+        start = self.length() + 1  # Excel has an index 1 offset
+        item = self.__wrapped__
         if parent.cols:
-            for v in value:
-                self.Cells(last_idx, 1).Value = v
-                last_idx += 1
+            rows, row, col = [(v,) for v in value], start, 1
         else:
-            for v in value:
-                self.Cells(1, last_idx).Value = v
-                last_idx += 1
+            rows, row, col = [value], 1, start
+        if hasattr(type(item), 'write_rows'):
+            item.write_rows(rows, row=row, column=col)
+        else:
+            item.Cells(row, col).Resize(len(rows), len(rows[0])).Value = tuple(rows)  # One Excel call
+
+        # Values after the last new value may make the contiguous values longer
+        length = start - 1
+        for v in value:
+            if v is None:
+                break
+            length += 1
+        else:
+            length = get_line_length(item, length + 1, bool(parent.cols))
+        set_tail_length(self._self_xl_instance, parent, length)
+
+
+VIEW_SLOTS = frozenset(RangeView.__slots__)
+SET_VIEW_ITEM = RangeView.__dict__['_self_xl_item'].__set__
+SET_VIEW_PARENT = RangeView.__dict__['_self_xl_parent'].__set__
+SET_VIEW_INSTANCE = RangeView.__dict__['_self_xl_instance'].__set__
+DecodedObject = RangeView  # Old name of the view
 
 
 def decode_value(item):
@@ -231,6 +514,11 @@ def decode_value(item):
     return value
 
 
+def is_area_values(value, count):
+    """Return if the value has an iterable value for each of the count areas (see decode_value)."""
+    return len(value) == count and all(is_iterable(val, allow_str=False) for val in value)
+
+
 def encode_value(item, value):
     """Set the given excel item object with the given value.
 
@@ -238,8 +526,25 @@ def encode_value(item, value):
         item (Excel Item/object): Excel Item object (Row, Column, Range, Cell)
         value (object/str/float/int): Value to set
     """
+    if is_ndarray(value):
+        value = ndarray_to_list(value)  # NaN and masked values are written as empty cells
+
     if not is_iterable(value, allow_str=False):
         item.Value = value
+        return
+
+    if hasattr(item, 'Areas') and item.Areas.Count > 1:
+        value = value if hasattr(value, '__len__') else list(value)
+        if is_area_values(value, item.Areas.Count):
+            # Set each area with its own value like decode_value returns a value for each area
+            for area, val in zip(item.Areas, value):
+                encode_value(area, val)
+            return
+
+    # Other values fill the cells in order
+    if hasattr(type(item), 'fill_values'):
+        # Backend bulk write that places the values by offset without a proxy for every cell
+        item.fill_values(value)
     else:
         # Create Item Cell index iterator
         cell = iter(item.Cells)
@@ -252,8 +557,9 @@ def encode_value(item, value):
 
 
 class Field(CustomProperty):
-    def __init__(self, sheet=1, dtype=None, decoder=None, encoder=None):
+    def __init__(self, sheet=1, dtype=None, decoder=None, encoder=None, cache=None):
         self.sheet = sheet
+        self.cache = cache  # Cache the decoded value for every instance. If None use the Table CACHE_VALUES policy
         self._dtype = None
         self.orig_decode = self.decode
         self.orig_encode = self.encode
@@ -294,7 +600,7 @@ class Field(CustomProperty):
 
     dtype = property(get_dtype, set_dtype)
 
-    decode = staticmethod(DecodedObject)
+    decode = staticmethod(RangeView)
     encode = staticmethod(encode_value)
 
     def decoder(self, func):
@@ -324,18 +630,20 @@ def create_range_property(name):
 
     def set(self, value):
         try:
-            self.range_str = self.get_range_str(**{name: value})
+            range_str = self.get_range_str(**{name: value})
         except Exception as err:
             raise ValueError('Invalid value given {} for {}!'.format(value, name)) from err
         setattr(self, attr, value)
+        self.range_str = range_str  # The plan is compiled with the new value
 
     return property(get, set)
 
 
 class Item(Field):
     def __init__(self, cells=None, rows=None, row_length=None, cols=None, col_length=None, ranges=None,
-                 sheet=1, dtype=None, decoder=None, encoder=None):
-        self.range_str = None
+                 sheet=1, dtype=None, decoder=None, encoder=None, cache=None):
+        self._range_str = None
+        self.plan = None
         self._cells = cells
         self._rows = rows
         self._row_length = row_length
@@ -343,7 +651,8 @@ class Item(Field):
         self._col_length = col_length
         self._ranges = ranges
 
-        super().__init__(sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder)
+        super().__init__(sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder,
+                         cache=cache)
         self.range_str = self.get_range_str()
 
     cells = create_range_property('cells')
@@ -353,6 +662,46 @@ class Item(Field):
     col_length = create_range_property('col_length')
     ranges = create_range_property('ranges')
 
+    def get_range_str_value(self):
+        """Return the string to make the Range with."""
+        return self._range_str
+
+    def set_range_str_value(self, value):
+        """Set the string to make the Range with and compile a new access plan."""
+        self._range_str = value
+        self.compile_plan()
+
+    range_str = property(get_range_str_value, set_range_str_value)
+
+    def get_sheet_value(self):
+        """Return the sheet index or name."""
+        return self._sheet
+
+    def set_sheet_value(self, value):
+        """Set the sheet index or name and compile a new access plan."""
+        self._sheet = value
+        if getattr(self, 'plan', None) is not None:
+            self.compile_plan()
+
+    sheet = property(get_sheet_value, set_sheet_value)
+
+    def compile_plan(self):
+        """Compile the sheet and range string into an ItemPlan.
+
+        Every instance caches the item it resolved for a plan, so a new plan makes every instance resolve the item
+        again. Column and Row areas that use the default length are marked open ended unless the range string was set
+        directly.
+        """
+        open_areas = None
+        try:
+            areas = self.get_areas()
+            if ', '.join(addr for addr, _ in areas) == self._range_str:
+                open_areas = {addr: open_ended for addr, open_ended in areas if any(open_ended)}
+        except (ValueError, TypeError, AttributeError, Exception):
+            pass
+        self.plan = ItemPlan.compile(getattr(self, '_sheet', 1), self._range_str, open_areas)
+        return self.plan
+
     @staticmethod
     def is_cell(item):
         try:
@@ -389,6 +738,22 @@ class Item(Field):
         Returns:
             range_str (str): String to make the Range with.
         """
+        return ', '.join(addr for addr, _ in self.get_areas(**kwargs))
+
+    def get_areas(self, **kwargs):
+        """Return the (A1 area string, (rows, columns) open ended flags) for every area of the Range.
+
+        Args:
+            cells (tuple/Cell)[None]: Single Cell position (int, (int,st)) or list of Cells (or single cell position).
+            rows (tuple/str/int)[None]: Rows for these items.
+            row_length (int)[None]: Length of the rows.
+            cols (tuple/str/int/)[None]: Cols for these items.
+            col_length (int)[None]: Length of the columns.
+            ranges (tuple/str/int)[None]: Range for these items.
+
+        Returns:
+            areas (list): (area, (rows, columns)) for every area. The flags are True if the default length was used.
+        """
         # Get Args
         cells = kwargs.get('cells', self.cells)
         rows = kwargs.get('rows', self.rows)
@@ -397,8 +762,8 @@ class Item(Field):
         col_length = kwargs.get('col_length', self.col_length)
         ranges = kwargs.get('ranges', self.ranges)
 
-        # Create the initial ranges string
-        range_str = []
+        # Create the initial areas
+        areas = []
         if ranges is not None:
             if isinstance(ranges, str):
                 ranges = ranges.split(',')
@@ -408,90 +773,223 @@ class Item(Field):
             # Check if two cells given for range
             if is_iterable(ranges) and len(ranges) == 2 and self.is_cell(ranges[0]) and self.is_cell(ranges[1]):
                 addr = '{}:{}'.format(self.get_cell_str(ranges[0]), self.get_cell_str(ranges[1]))
-                range_str.append(addr)
+                areas.append((addr, (False, False)))
             else:
                 for r in ranges:
                     if isinstance(r, str):
-                        range_str.append(r)
+                        areas.append((r, (False, False)))
                     elif hasattr(r, 'Address'):
-                        range_str.append(r.Address)
+                        areas.append((r.Address, (False, False)))
                     elif is_iterable(r) and len(r) == 2 and self.is_cell(ranges[0]) and self.is_cell(ranges[1]):
                         addr = '{}:{}'.format(self.get_cell_str(ranges[0]), self.get_cell_str(ranges[1]))
-                        range_str.append(addr)
+                        areas.append((addr, (False, False)))
 
         # Add columns to the ranges
         if cols is not None:
+            open_ended = (col_length is None, False)
             if col_length is None:
-                col_length = 16840  # Default column size in excel
+                col_length = DEFAULT_COL_LENGTH  # Open ended. Some backends clip this to the used range.
 
             if not is_iterable(cols):
                 cols = [cols]
 
             if is_contiguous(cols):
                 addr = '${0}$1:${1}${2}'.format(excel_column_name(cols[0]), excel_column_name(cols[-1]), col_length)
-                range_str.append(addr)
+                areas.append((addr, open_ended))
             else:
                 for c in cols:
                     if hasattr(c, 'Address'):
-                        addr = str(c.Address)
+                        areas.append((str(c.Address), (False, False)))
                     else:
-                        addr = '${0}$1:${0}${1}'.format(excel_column_name(c), col_length)
-                    range_str.append(addr)
+                        areas.append(('${0}$1:${0}${1}'.format(excel_column_name(c), col_length), open_ended))
 
         if rows is not None:
+            open_ended = (False, row_length is None)
             if row_length is None:
-                row_length = 702  # Default row size in excel ($ZZ)
+                row_length = DEFAULT_ROW_LENGTH  # Open ended. Some backends clip this to the used range.
 
             if not is_iterable(rows):
                 rows = [rows]
 
             if is_contiguous(rows):
                 addr = '$A${0}:${2}${1}'.format(rows[0], rows[-1], excel_column_name(row_length))
-                range_str.append(addr)
+                areas.append((addr, open_ended))
             else:
                 for r in rows:
                     if hasattr(r, 'Address'):
-                        addr = str(r.Address)
+                        areas.append((str(r.Address), (False, False)))
                     else:
-                        addr = '$A${0}:${1}${0}'.format(r, excel_column_name(row_length))
-                    range_str.append(addr)
+                        areas.append(('$A${0}:${1}${0}'.format(r, excel_column_name(row_length)), open_ended))
 
         if cells is not None:
             if self.is_cell(cells) or not is_iterable(cells):
                 cells = [cells]
-            range_str.extend([self.get_cell_str(cell) for cell in cells])
+            areas.extend((self.get_cell_str(cell), (False, False)) for cell in cells)
 
-        return ', '.join(range_str)
+        return areas
 
     def get_item(self, instance):
-        """Return the item for the instance and settings."""
-        sheet = instance.get_sheet(self.sheet)
-        items = sheet.Range(self.range_str)
+        """Return the item for the instance and settings.
+
+        The item is cached for the instance until the plan is compiled again or the sheet key changes (see
+        get_sheet_key of the Table).
+        """
+        plan = self.plan
+        key = instance.get_sheet_key(plan.sheet)
+        try:
+            handles = instance._field_handles
+        except AttributeError:
+            handles = instance._field_handles = {}
+
+        handle = handles.get(self, None)
+        if handle is not None and handle[0] is plan and handle[1] == key:
+            return handle[2]
+
+        sheet = instance.get_sheet(plan.sheet)
+        if hasattr(type(sheet), 'plan_range'):
+            items = sheet.plan_range(plan)  # Backend Range that knows the open ended areas
+        else:
+            items = sheet.Range(plan.range_str)
+        handles[self] = (plan, key, items)
         return items
 
     def fget(self, instance):
         """Return the Range Item Object"""
-        item = self.get_item(instance)
-        item = self.decode(item)
+        batch = getattr(instance, '_batch', None)
+        if batch is not None and batch.overlaps(self):
+            batch.apply()  # Read the pending values
+
+        cache = self.cache
+        if cache is None:
+            cache = getattr(instance, 'CACHE_VALUES', False)
+        if cache:
+            return self.get_cached_value(instance)
+
+        if self.decode is RangeView:
+            return RangeView(None, self, instance)  # The backend item is looked up when it is used
+        return self.decode_item(instance, self.get_item(instance))
+
+    def decode_item(self, instance, item):
+        """Decode the backend item for the instance.
+
+        The default RangeView is made with the field and instance. Other decoded objects that have a _self_xl_parent
+        attribute get the field and instance set.
+        """
+        decode = self.decode
+        if decode is RangeView:
+            return RangeView(item, self, instance)
+
+        item = decode(item)
         if hasattr(item, '_self_xl_parent'):
             setattr(item, '_self_xl_parent', self)
+            setattr(item, '_self_xl_instance', instance)
+        return item
+
+    def to_numpy(self, instance, dtype=None):
+        """Return the values of the instance as a NumPy array read straight from the backend rows.
+
+        Args:
+            instance (Table): Table instance to read.
+            dtype (object)[None]: NumPy dtype. If None numbers are float (None is NaN) and everything else is object.
+        """
+        batch = getattr(instance, '_batch', None)
+        if batch is not None and batch.overlaps(self):
+            batch.apply()
+        return grid_to_numpy(get_grids(self.get_item(instance)), dtype=dtype)
+
+    def get_cached_value(self, instance):
+        """Return the decoded value from the instance value cache or read and cache it.
+
+        A cached value is used until the plan changes, the sheet key changes (see get_sheet_key of the Table) or the
+        backend reports a write that overlaps the range (see was_written). Writes to this field or an overlapping field
+        remove the value (see invalidate_values).
+        """
+        plan = self.plan
+        key = instance.get_sheet_key(plan.sheet)
+        try:
+            values = instance._value_cache
+        except AttributeError:
+            values = instance._value_cache = {}
+
+        entry = values.get(self, None)
+        if entry is not None and entry[0] is plan and entry[1] == key:
+            version = instance.get_write_version(plan.sheet)
+            if entry[2] == version:
+                return entry[3]
+            elif not instance.was_written(plan.sheet, plan.bounds, entry[2]):
+                values[self] = (plan, key, version, entry[3])
+                return entry[3]
+
+        item = self.decode_item(instance, self.get_item(instance))
+
+        # The version is read after decoding, because a decoder may write to the sheet
+        values[self] = (plan, key, instance.get_write_version(plan.sheet), item)
         return item
 
     def fset(self, instance, value):
         """Set the Range value."""
+        invalidate_values(instance, self)
+        batch = getattr(instance, '_batch', None)
+        if batch is not None:
+            if batch.can_buffer(self):
+                batch.set(self, value)
+                return
+            batch.apply()  # Keep the write order
+
         item = self.get_item(instance)
         self.encode(item, value)
 
     def fdel(self, instance):
         """Delete the range."""
+        invalidate_values(instance, self)
+        batch = getattr(instance, '_batch', None)
+        if batch is not None:
+            batch.apply()
+
         item = self.get_item(instance)
         item.Delete()
 
 
+def overlaps(bounds, other):
+    """Return if any area of the (min_row, min_col, max_row, max_col) bounds overlaps an area of the other bounds.
+
+    Open ended (None) bounds overlap everything in that direction.
+    """
+    for r0, c0, r1, c1 in bounds:
+        for o_r0, o_c0, o_r1, o_c1 in other:
+            if (r1 is None or o_r0 is None or o_r0 <= r1) and (o_r1 is None or r0 is None or r0 <= o_r1) and \
+                    (c1 is None or o_c0 is None or o_c0 <= c1) and (o_c1 is None or c0 is None or c0 <= o_c1):
+                return True
+    return False
+
+
+def invalidate_values(instance, field=None):
+    """Remove the cached values of the field and every field that overlaps it on the same sheet.
+
+    Args:
+        instance (Table): Table instance with the value cache.
+        field (Item)[None]: Field that was written. If None remove every cached value.
+    """
+    values = getattr(instance, '_value_cache', None)
+    if not values:
+        return
+    if field is None or getattr(field, 'plan', None) is None:
+        values.clear()
+        return
+
+    plan = field.plan
+    for other in list(values):
+        other_plan = getattr(other, 'plan', None)
+        if other is field or other_plan is None or (other_plan.sheet == plan.sheet and
+                                                    overlaps(plan.bounds, other_plan.bounds)):
+            values.pop(other, None)
+
+
 class RangeItem(Item):
     """Everything in excel is essentially a Range."""
-    def __init__(self, *ranges, sheet=1, dtype=None, decoder=None, encoder=None):
-        super().__init__(ranges=ranges, sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder)
+    def __init__(self, *ranges, sheet=1, dtype=None, decoder=None, encoder=None, cache=None):
+        super().__init__(ranges=ranges, sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder,
+                         cache=cache)
 
     def get_item(self, instance):
         """Return the item for the instance and settings."""
@@ -509,8 +1007,9 @@ class Range(RangeItem):
 
 
 class RowItem(Item):
-    def __init__(self, *rows, row_length=None, sheet=1, dtype=None, decoder=None, encoder=None):
-        super().__init__(rows=rows, row_length=row_length, sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder)
+    def __init__(self, *rows, row_length=None, sheet=1, dtype=None, decoder=None, encoder=None, cache=None):
+        super().__init__(rows=rows, row_length=row_length, sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder,
+                         cache=cache)
 
     def get_item(self, instance):
         """Return the item for the instance and settings."""
@@ -529,8 +1028,9 @@ class Row(RowItem):
 
 
 class ColumnItem(Item):
-    def __init__(self, *cols, col_length=None, sheet=1, dtype=None, decoder=None, encoder=None):
-        super().__init__(cols=cols, col_length=col_length, sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder)
+    def __init__(self, *cols, col_length=None, sheet=1, dtype=None, decoder=None, encoder=None, cache=None):
+        super().__init__(cols=cols, col_length=col_length, sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder,
+                         cache=cache)
 
     def get_item(self, instance):
         """Return the item for the instance and settings."""
@@ -549,8 +1049,9 @@ class Column(ColumnItem):
 
 
 class CellItem(Item):
-    def __init__(self, *cells, sheet=1, dtype=None, decoder=None, encoder=None):
-        super().__init__(cells=cells, sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder)
+    def __init__(self, *cells, sheet=1, dtype=None, decoder=None, encoder=None, cache=None):
+        super().__init__(cells=cells, sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder,
+                         cache=cache)
 
     def get_item(self, instance):
         """Return the item for the instance and settings."""
@@ -570,10 +1071,11 @@ class Cell(CellItem):
 class ConstantItem(Item):
     """Constant Value that is set when the table is initialized"""
     def __init__(self, value, *cells, rows=None, row_length=None, cols=None, col_length=None, ranges=None,
-                 sheet=1, dtype=None, decoder=None, encoder=None):
+                 sheet=1, dtype=None, decoder=None, encoder=None, cache=None):
         self.value = value
         super().__init__(cells=cells, rows=rows, row_length=row_length, cols=cols, col_length=col_length, ranges=ranges,
-                         sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder)
+                         sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder,
+                         cache=cache)
 
     def init_table(self, instance):
         """Set the table value with this value on table initialization."""
@@ -587,9 +1089,10 @@ class Constant(ConstantItem):
 
 
 class BuiltinDocumentPropertyItem(Item):
-    def __init__(self, name, sheet=1, dtype=None, decoder=None, encoder=None):
+    def __init__(self, name, sheet=1, dtype=None, decoder=None, encoder=None, cache=None):
         self.name = name
-        super().__init__(sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder)
+        super().__init__(sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder,
+                         cache=cache)
 
     def get_item(self, instance):
         """Return the item for the instance and settings."""
@@ -620,35 +1123,523 @@ class BuiltinDocumentProperty(BuiltinDocumentPropertyItem):
 
 class DateTime(Item):
     def __init__(self, *cells, rows=None, row_length=None, cols=None, col_length=None, ranges=None,
-                 sheet=1, dtype=None, decoder=None, encoder=None, str_format=None, formats=None):
+                 sheet=1, dtype=None, decoder=None, encoder=None, cache=None, str_format=None, formats=None):
 
         if dtype is None and decoder is None and encoder is None:
             dtype = datetime(str_format=str_format, formats=formats)
 
         super().__init__(cells=cells, rows=rows, row_length=row_length, cols=cols, col_length=col_length, ranges=ranges,
-                         sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder)
+                         sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder,
+                         cache=cache)
 
 
 class Date(Item):
     def __init__(self, *cells, rows=None, row_length=None, cols=None, col_length=None, ranges=None,
-                 sheet=1, dtype=None, decoder=None, encoder=None, str_format=None, formats=None):
+                 sheet=1, dtype=None, decoder=None, encoder=None, cache=None, str_format=None, formats=None):
 
         if dtype is None and decoder is None and encoder is None:
             dtype = date(str_format=str_format, formats=formats)
 
         super().__init__(cells=cells, rows=rows, row_length=row_length, cols=cols, col_length=col_length, ranges=ranges,
-                         sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder)
+                         sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder,
+                         cache=cache)
 
 
 class Time(Item):
     def __init__(self, *cells, rows=None, row_length=None, cols=None, col_length=None, ranges=None,
-                 sheet=1, dtype=None, decoder=None, encoder=None, str_format=None, formats=None):
+                 sheet=1, dtype=None, decoder=None, encoder=None, cache=None, str_format=None, formats=None):
 
         if dtype is None and decoder is None and encoder is None:
             dtype = time(str_format=str_format, formats=formats)
 
         super().__init__(cells=cells, rows=rows, row_length=row_length, cols=cols, col_length=col_length, ranges=ranges,
-                         sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder)
+                         sheet=sheet, dtype=dtype, decoder=decoder, encoder=encoder,
+                         cache=cache)
+
+
+class FieldRegistry(object):
+    """Ordered registry of the fields for a Table class.
+
+    Fields are collected once across the MRO when the class is defined. Base class fields come first and a subclass
+    attribute with the same name replaces (or removes) the base class field.
+
+    Args:
+        fields (dict)[None]: Ordered {name: field} dictionary.
+    """
+    def __init__(self, fields=None):
+        self.fields = dict(fields or {})
+        self.names = {field: name for name, field in self.fields.items()}
+        self.by_sheet = {}
+        self.by_kind = {}
+        for name, field in self.fields.items():
+            self.by_sheet.setdefault(getattr(field, 'sheet', None), {})[name] = field
+            self.by_kind.setdefault(type(field), {})[name] = field
+        self.constants = tuple(field for field in self.fields.values() if isinstance(field, ConstantItem))
+        self.items = tuple(field for field in self.fields.values() if isinstance(field, Item))
+        self._record = None
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def __getitem__(self, name):
+        return self.fields[name]
+
+    def get(self, name, default=None):
+        return self.fields.get(name, default)
+
+    def keys(self):
+        return self.fields.keys()
+
+    def values(self):
+        return self.fields.values()
+
+    def of_kind(self, *kinds):
+        """Return the {name: field} dictionary for the fields that are an instance of the given classes."""
+        return {name: field for name, field in self.fields.items() if isinstance(field, kinds)}
+
+    @property
+    def record(self):
+        """Return the frozen namedtuple class with a value for every field (see Table.snapshot).
+
+        Fields without a getter are None.
+        """
+        if self._record is None:
+            self._record = namedtuple('Snapshot', list(self.fields), rename=True)
+        return self._record
+
+    def grid_fields(self):
+        """Return the {sheet: {name: field}} fields that can be decoded from values that were already read.
+
+        Fields are grouped by the sheet of their current plan. Items that decode into a live object (RangeView) or
+        that do not have a range are not included.
+        """
+        groups = {}
+        for name, field in self.fields.items():
+            if isinstance(field, Item) and not isinstance(field, BuiltinDocumentPropertyItem) and \
+                    field.decode is not RangeView and field.plan is not None and field.plan.areas:
+                groups.setdefault(field.plan.sheet, {})[name] = field
+        return groups
+
+    def __repr__(self):
+        return '<{}({})>'.format(self.__class__.__name__, ', '.join(self.fields))
+
+
+def collect_fields(cls):
+    """Return a FieldRegistry with the fields of the class and every base class in MRO order."""
+    fields = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, Field):
+                fields[name] = value
+            elif name in fields:
+                del fields[name]  # Overridden by a normal attribute
+    return FieldRegistry(fields)
+
+
+class FieldsMeta(type):
+    """Metaclass that collects the fields of a Table class and its subclasses again when a field is assigned to or
+    deleted from the class after it was defined.
+    """
+    def __setattr__(cls, name, value):
+        changed = isinstance(value, Field) or isinstance(cls.__dict__.get(name, None), Field)
+        super().__setattr__(name, value)
+        if changed:
+            cls.refresh_fields()
+
+    def __delattr__(cls, name):
+        changed = isinstance(cls.__dict__.get(name, None), Field)
+        super().__delattr__(name)
+        if changed:
+            cls.refresh_fields()
+
+    def refresh_fields(cls):
+        """Collect the fields of this class and every subclass again (see collect_fields)."""
+        classes = [cls]
+        while classes:
+            klass = classes.pop()
+            type.__setattr__(klass, '__fields__', collect_fields(klass))
+            classes.extend(type.__subclasses__(klass))
+
+
+class GridItem(object):
+    """Read only item for area values that were already read from a sheet.
+
+    This has the Value and Areas of an Excel Range, so field decoders can decode the values without the backend.
+
+    Args:
+        values (list): Value of every area in the same shape the backend Range.Value returns.
+    """
+    def __init__(self, values):
+        self.values = values
+
+    @property
+    def Value(self):
+        """Return the value of the first area like Excel does."""
+        return self.values[0]
+
+    @property
+    def Count(self):
+        return len(self.values)
+
+    @property
+    def Areas(self):
+        return self
+
+    def __iter__(self):
+        for value in self.values:
+            yield GridItem([value])
+
+    def __call__(self, index):
+        return GridItem([self.values[index-1]])
+
+
+def read_fields(instance, read_areas):
+    """Return the {name: value} for every field of the instance reading each sheet once.
+
+    Args:
+        instance (Table): Table instance with a __fields__ registry.
+        read_areas (callable): Function read_areas(sheet, areas, open_ended) that reads the list of A1 area strings
+            from the sheet in one pass and returns the value of every area. open_ended has the (rows, columns) flags of
+            every area (see ItemPlan).
+
+    Returns:
+        values (dict): {name: value} in field order.
+    """
+    registry = instance.__fields__
+    values = {}
+    for sheet, fields in registry.grid_fields().items():
+        areas = [area for field in fields.values() for area in field.plan.areas]
+        open_ended = [flags for field in fields.values() for flags in field.plan.open_ended]
+        try:
+            area_values = iter(read_areas(sheet, areas, open_ended))
+        except (ValueError, TypeError, Exception):
+            continue  # Read the fields one by one
+
+        for name, field in fields.items():
+            item = GridItem([next(area_values) for _ in field.plan.areas])
+            try:
+                values[name] = field.decode(item)
+            except (ValueError, TypeError, AttributeError, Exception):
+                pass  # The decoder needs the backend item
+
+    # Read the remaining fields one by one in field order. Fields without a getter are not included.
+    return {name: values[name] if name in values else getattr(instance, name)
+            for name, field in registry.fields.items()
+            if name in values or getattr(field.fget, '__func__', None) is not CustomProperty.fget}
+
+
+def get_field(instance, field):
+    """Return the field object for a field name or field."""
+    if isinstance(field, str):
+        return instance.__fields__[field]
+    return field
+
+
+def is_date_field(field):
+    """Return if the field decodes date, time or datetime values."""
+    return isinstance(field, (DateTime, Date, Time)) or isinstance(field.dtype, (datetime, date, time)) or \
+        (isinstance(field.dtype, type) and issubclass(field.dtype, (datetime, date, time)))
+
+
+def get_column_values(instance, header_field=None):
+    """Apply any pending batch and return the column names of the header field or None."""
+    batch = getattr(instance, '_batch', None)
+    if batch is not None:
+        batch.apply()
+
+    if header_field is None:
+        return None
+    columns = getattr(instance, instance.__fields__.names[get_field(instance, header_field)])
+    if not is_iterable(columns):
+        columns = [columns]
+    return columns
+
+
+def to_dataframe(instance, field, header_field=None):
+    """Return a pandas DataFrame for the values of a range field read straight from the backend rows.
+
+    Args:
+        instance (Table): Table instance to read.
+        field (str/Item): Range field name or field with the table values.
+        header_field (str/Item)[None]: Field name or field with the column names.
+
+    Returns:
+        df (pd.DataFrame): DataFrame of the values without trailing empty rows. DateTime, Date and Time fields have
+            datetime64 columns.
+    """
+    field = get_field(instance, field)
+    columns = get_column_values(instance, header_field)
+    return grid_to_dataframe(get_grids(field.get_item(instance)), columns=columns, parse_dates=is_date_field(field))
+
+
+def from_dataframe(instance, df, field, header_field=None):
+    """Write a pandas DataFrame to a range field with the bulk row path.
+
+    The rows are written starting at the top left cell of the first area of the field. Missing values are written as
+    empty cells and the cells of the area that the DataFrame does not cover are cleared. Open ended Column and Row
+    lengths (see ItemPlan) grow with the DataFrame.
+
+    Args:
+        instance (Table): Table instance to write.
+        df (pd.DataFrame): DataFrame to write.
+        field (str/Item): Range field name or field to write the values to.
+        header_field (str/Item)[None]: Field name or field to write the column names to.
+
+    Raises:
+        ValueError: If the DataFrame has more rows or columns than the area.
+    """
+    field = get_field(instance, field)
+    plan = getattr(field, 'plan', None)
+    height, width = plan.shape[0] if plan is not None and plan.shape else (None, None)
+    open_rows, open_cols = plan.open_ended[0] if plan is not None and plan.open_ended else (False, False)
+    if height is not None and not open_rows and len(df) > height:
+        raise ValueError('The DataFrame has {} rows, but the field only has {}!'.format(len(df), height))
+    elif width is not None and not open_cols and len(df.columns) > width:
+        raise ValueError('The DataFrame has {} columns, but the field only has {}!'.format(len(df.columns), width))
+
+    batch = getattr(instance, '_batch', None)
+    if batch is not None:
+        batch.apply()
+
+    if header_field is not None:
+        setattr(instance, instance.__fields__.names[get_field(instance, header_field)], [str(c) for c in df.columns])
+
+    # Pad the rows to the area, so the values that were in the area before are cleared
+    height = max(height or 0, len(df))
+    width = max(width or 0, len(df.columns))
+
+    def iter_rows():
+        for row in dataframe_to_rows(df):
+            yield row + (None,) * (width - len(row))
+        empty = (None,) * width
+        for _ in range(len(df), height):
+            yield empty
+
+    item = field.get_item(instance)
+    if hasattr(type(item), 'write_rows'):
+        item.write_rows(iter_rows())
+    elif height > 0 and width > 0:
+        item.Cells(1, 1).Resize(height, width).Value = tuple(iter_rows())  # One Excel call
+    invalidate_values(instance)
+
+
+def iter_field_batches(instance, field, header_field=None, batch_size=65536, schema=None):
+    """Yield pyarrow RecordBatches for the values of a range field streaming the backend rows.
+
+    Args:
+        instance (Table): Table instance to read.
+        field (str/Item): Range field name or field with the table values.
+        header_field (str/Item)[None]: Field name or field with the column names.
+        batch_size (int)[65536]: Number of rows in every RecordBatch.
+        schema (pa.Schema)[None]: Schema of the batches. If None the schema is inferred from every row, which streams
+            the rows twice (see infer_schema).
+
+    Returns:
+        batches (generator): pyarrow RecordBatch generator without trailing empty rows.
+    """
+    field = get_field(instance, field)
+    columns = get_column_values(instance, header_field)
+    return iter_record_batches(lambda: get_grids(field.get_item(instance)), columns=columns, batch_size=batch_size,
+                               schema=schema)
+
+
+def export_tables(filename, tables, field, header_field=None, batch_size=65536, file_format=None, schema=None):
+    """Export the range field of one or more tables to a single Parquet or Arrow IPC file.
+
+    The rows are written batch by batch, so the whole range is never held in memory. If no schema is given it is
+    inferred from the rows of every table first (see infer_schema), so a column type that changes in a later table is
+    widened.
+
+    Args:
+        filename (str): Filename to write.
+        tables (Table/list): Table instance or list of Table instances to export.
+        field (str/Item): Range field name or field with the table values.
+        header_field (str/Item)[None]: Field name or field with the column names.
+        batch_size (int)[65536]: Number of rows in every RecordBatch (Parquet row group).
+        file_format (str)[None]: 'parquet' or 'ipc'. If None use the file extension.
+        schema (pa.Schema)[None]: Schema of the batches. If None the schema is inferred from every table.
+
+    Returns:
+        count (int): Number of rows written.
+    """
+    if not isinstance(tables, (list, tuple)):
+        tables = [tables]
+    if schema is None and len(tables) > 0:
+        grids = (grid for table in tables for grid in get_grids(get_field(table, field).get_item(table)))
+        schema = infer_schema(grids, get_column_values(tables[0], header_field))
+
+    def iter_batches():
+        for table in tables:
+            yield from iter_field_batches(table, field, header_field, batch_size=batch_size, schema=schema)
+
+    return write_record_batches(filename, iter_batches(), file_format=file_format, schema=schema)
+
+
+def get_blocks(cells):
+    """Merge a {(row, column): value} dictionary into rectangular blocks of adjacent cells.
+
+    Returns:
+        blocks (list): List of (min_row, min_col, max_row, max_col, rows) in row order.
+    """
+    blocks = []
+    open_blocks = {}  # {(min_col, max_col): block} that can be extended by the next row
+    run = None
+    for (row, col) in sorted(cells) + [(None, None)]:
+        if run is not None and (row, col) == (run[0], run[2] + 1):
+            run[2] = col
+            run[3].append(cells[row, col])
+            continue
+
+        if run is not None:
+            # Add the run of columns to a block with the same columns that ended on the previous row
+            block = open_blocks.get((run[1], run[2]), None)
+            if block is not None and block[2] == run[0] - 1:
+                block[2] = run[0]
+                block[4].append(tuple(run[3]))
+            else:
+                block = [run[0], run[1], run[0], run[2], [tuple(run[3])]]
+                open_blocks[run[1], run[2]] = block
+                blocks.append(block)
+
+        if row is not None:
+            run = [row, col, col, [cells[row, col]]]
+    return [(r0, c0, r1, c1, tuple(rows)) for r0, c0, r1, c1, rows in blocks]
+
+
+class BatchItem(object):
+    """Item that records the values encode_value sets into a {(row, column): value} dictionary.
+
+    Args:
+        pending (dict): {(row, column): value} dictionary to write to.
+        bounds (tuple): Numeric (min_row, min_col, max_row, max_col) for every area.
+    """
+    def __init__(self, pending, bounds):
+        self.pending = pending
+        self.bounds = bounds
+
+    @property
+    def Value(self):
+        """Return the pending value of the first cell."""
+        return self.pending.get(self.bounds[0][:2], None)
+
+    @Value.setter
+    def Value(self, value):
+        """Set every cell of every area to the value."""
+        if is_iterable(value, allow_str=False):
+            self.fill_values(value)
+            return
+
+        for min_row, min_col, max_row, max_col in self.bounds:
+            for row in range(min_row, max_row + 1):
+                for col in range(min_col, max_col + 1):
+                    self.pending[row, col] = value
+
+    @property
+    def Count(self):
+        return len(self.bounds)
+
+    @property
+    def Areas(self):
+        return self
+
+    def __iter__(self):
+        for bounds in self.bounds:
+            yield BatchItem(self.pending, (bounds,))
+
+    def fill_values(self, values):
+        """Fill the first area one row after another with the flattened values like the backends do."""
+        min_row, min_col, max_row, max_col = self.bounds[0]
+        width = max_col - min_col + 1
+        size = width * (max_row - min_row + 1)
+        idx = 0
+        for obj in values:
+            for value in (obj if is_iterable(obj, allow_str=False) else (obj,)):
+                if idx >= size:
+                    return idx
+                row, col = divmod(idx, width)
+                self.pending[min_row + row, min_col + col] = value
+                idx += 1
+        return idx
+
+
+class Batch(object):
+    """Buffer field assignments and write them as rectangular blocks when the batch exits.
+
+    Only fields that use encode_value and have a bounded range are buffered. Other writes and reads of a field that
+    overlaps a pending value write the pending values first, so the order of the writes is kept. Pending values are
+    discarded if the block raises an error.
+
+    Args:
+        instance (Table): Table instance to write to.
+    """
+    def __init__(self, instance):
+        self.instance = instance
+        self.pending = {}  # {sheet: {(row, column): value}}
+        self.depth = 0
+
+    def __enter__(self):
+        if self.depth == 0:
+            self.instance._batch = self
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.depth -= 1
+        if self.depth > 0:
+            return
+
+        self.instance._batch = None
+        if exc_type is None:
+            self.apply()
+        else:
+            self.pending.clear()
+
+    @staticmethod
+    def can_buffer(field):
+        """Return if the field values can be buffered."""
+        return field.encode is encode_value and field.plan is not None and len(field.plan.bounds) > 0 and \
+            all(b is not None for bounds in field.plan.bounds for b in bounds)
+
+    def set(self, field, value):
+        """Buffer the value for the field."""
+        encode_value(BatchItem(self.pending.setdefault(field.plan.sheet, {}), field.plan.bounds), value)
+
+    def overlaps(self, field):
+        """Return if the field range contains a pending value."""
+        cells = self.pending.get(getattr(field.plan, 'sheet', None), None)
+        if not cells:
+            return False
+
+        for bounds in field.plan.bounds:
+            if any(b is None for b in bounds):
+                return True
+            min_row, min_col, max_row, max_col = bounds
+            if (max_row - min_row + 1) * (max_col - min_col + 1) <= len(cells):
+                if any((row, col) in cells for row in range(min_row, max_row + 1)
+                       for col in range(min_col, max_col + 1)):
+                    return True
+            elif any(min_row <= row <= max_row and min_col <= col <= max_col for row, col in cells):
+                return True
+        return False
+
+    def apply(self):
+        """Write the pending values with one Range write per block in sheet and row order."""
+        pending, self.pending = self.pending, {}
+        for sheet, cells in pending.items():
+            obj = self.instance.get_sheet(sheet)
+            for min_row, min_col, max_row, max_col, rows in get_blocks(cells):
+                if min_row == max_row and min_col == max_col:
+                    obj.Range('${}${}'.format(excel_column_name(min_col), min_row)).Value = rows[0][0]
+                else:
+                    addr = '${}${}:${}${}'.format(excel_column_name(min_col), min_row,
+                                                  excel_column_name(max_col), max_row)
+                    obj.Range(addr).Value = rows
 
 
 # Tabel Utils
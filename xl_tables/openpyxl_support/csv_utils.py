@@ -1,43 +1,382 @@
+import os
 import csv
+import re
+import datetime
+from itertools import chain, islice
 import openpyxl
+from openpyxl.cell.cell import Cell
 
+from ..dtypes import DATE_FORMATS, TIME_FORMATS, DATETIME_FORMATS
 
-def csv_to_openpyxl(csv_path):
+
+CSV_SAMPLE_SIZE = 1000  # Number of rows used to infer the column types
+SHEET_MARKER = '# '  # Start of the '# <title>' row that starts every sheet of a multi-sheet CSV file
+INT_PATTERN = re.compile(r'[-+]?(0|[1-9][0-9]*)$')  # Leading zeros ('007') are kept as text
+FLOAT_PATTERN = re.compile(r'[-+]?((0|[1-9][0-9]*)(\.[0-9]*)?|\.[0-9]+)([eE][-+]?[0-9]+)?$')
+BOOL_VALUES = {'TRUE': True, 'True': True, 'true': True, 'FALSE': False, 'False': False, 'false': False}
+
+
+def to_int(value):
+    """Convert an integer string. Raise a ValueError for any other text."""
+    if INT_PATTERN.match(value) is None:
+        raise ValueError('Invalid integer {}'.format(repr(value)))
+    return int(value)
+
+
+def to_float(value):
+    """Convert a decimal number string. Raise a ValueError for any other text."""
+    if FLOAT_PATTERN.match(value) is None:
+        raise ValueError('Invalid number {}'.format(repr(value)))
+    return float(value)
+
+
+def to_bool(value):
+    """Convert a TRUE or FALSE string. Raise a ValueError for any other text."""
+    try:
+        return BOOL_VALUES[value]
+    except KeyError:
+        raise ValueError('Invalid boolean {}'.format(repr(value))) from None
+
+
+def to_isoformat(value):
+    """Convert an ISO date or datetime string ('2021-01-29', '2021-01-29 16:01:39')."""
+    if len(value) < 10 or value[4] != '-':
+        raise ValueError('Invalid ISO date {}'.format(repr(value)))
+    dt = datetime.datetime.fromisoformat(value)
+    if len(value) == 10:
+        return dt.date()
+    return dt
+
+
+def make_datetime_converter(fmt):
+    """Return a converter for a datetime format. Date formats return a date and time formats return a time."""
+    strptime = datetime.datetime.strptime
+    if fmt in DATE_FORMATS:
+        def convert(value):
+            return strptime(value, fmt).date()
+    elif fmt in TIME_FORMATS:
+        def convert(value):
+            return strptime(value, fmt).time()
+    else:
+        def convert(value):
+            return strptime(value, fmt)
+    convert.__name__ = 'to_datetime({})'.format(fmt)
+    return convert
+
+
+def convert_value(value):
+    """Return the int or float for a number string or the string itself."""
+    if INT_PATTERN.match(value) is not None:
+        return int(value)
+    elif FLOAT_PATTERN.match(value) is not None:
+        return float(value)
+    return value
+
+
+def can_convert(converter, values):
+    """Return if the converter converts every value."""
+    try:
+        for value in values:
+            converter(value)
+    except (ValueError, TypeError):
+        return False
+    return True
+
+
+def infer_converter(values):
+    """Return the converter for a column of sampled string values or None to keep the text.
+
+    The types are tried from the narrowest to the widest: bool, int, float, ISO date, every datetime format. A column
+    with values of more than one type keeps the text.
     """
-    Load a CSV file into a new openpyxl Workbook and save it as an Excel file.
-    
+    values = [value for value in values if value != '']
+    if len(values) == 0:
+        return None
+
+    for converter in (to_bool, to_int, to_float, to_isoformat):
+        if can_convert(converter, values):
+            return converter
+
+    first = values[0]
+    for fmt in DATETIME_FORMATS:
+        converter = make_datetime_converter(fmt)
+        if can_convert(converter, (first,)) and can_convert(converter, values):
+            return converter
+    return None
+
+
+def infer_converters(rows):
+    """Return a converter (or None) for every column of the sampled rows (see infer_converter)."""
+    width = max((len(row) for row in rows), default=0)
+    return [infer_converter([row[i] for row in rows if i < len(row)]) for i in range(width)]
+
+
+def make_row_converter(converters, strict=False):
+    """Return a convert_row(row) function that converts a whole row of strings with the column converters.
+
+    Empty strings are None. Values that do not match the column type are converted like convert_value, or raise a
+    ValueError if strict is True.
+    """
+    count = len(converters)
+
+    def convert_row(row):
+        values = []
+        append = values.append
+        for i, value in enumerate(row):
+            if value == '':
+                append(None)
+                continue
+
+            converter = converters[i] if i < count else None
+            if converter is None:
+                append(value)
+                continue
+            try:
+                append(converter(value))
+            except ValueError:
+                if strict:
+                    raise ValueError('Column {} value {} is not {}!'.format(i + 1, repr(value), converter.__name__)) \
+                        from None
+                append(convert_value(value))
+        return values
+    return convert_row
+
+
+def iter_typed_rows(rows, infer_types=True, strict=False, sample_size=CSV_SAMPLE_SIZE):
+    """Yield every row of strings as a list of typed values streaming the rows.
+
+    The column types are inferred from the first sample_size rows. The first row is not used to infer the types and is
+    never strict, so a header row keeps its names.
+
+    Args:
+        rows (iterable): Rows of strings like a csv.reader.
+        infer_types (bool)[True]: Convert the values to the inferred column types. If False only empty strings are
+            converted to None.
+        strict (bool)[False]: Raise a ValueError for a value that does not match the inferred column type.
+        sample_size (int)[CSV_SAMPLE_SIZE]: Number of rows used to infer the column types.
+    """
+    if not infer_types:
+        for row in rows:
+            yield [None if value == '' else value for value in row]
+        return
+
+    rows = iter(rows)
+    sample = list(islice(rows, sample_size))
+    converters = infer_converters(sample[1:] or sample)
+    convert_header = make_row_converter(converters)
+    convert_row = make_row_converter(converters, strict=strict)
+    for i, row in enumerate(chain(sample, rows), 1):
+        try:
+            yield convert_header(row) if i == 1 else convert_row(row)
+        except ValueError as err:
+            raise ValueError('Row {}: {}'.format(i, err)) from None
+
+
+def append_rows(ws, rows):
+    """Append every row of values after the last row of the worksheet like ws.append.
+
+    Cells are only created for values that are not None. Numbers, booleans and dates skip the openpyxl type checks and
+    dates share the number format style of the first date of the same type.
+
+    Returns:
+        count (int): Number of rows appended.
+    """
+    cells = ws._cells
+    date_styles = {}  # {type: style array with the date number format}
+    row_idx = start = ws._current_row
+    for values in rows:
+        row_idx += 1
+        for col_idx, value in enumerate(values, 1):
+            t = type(value)
+            if value is None:
+                continue
+            elif t is int or t is float or t is bool:
+                cell = Cell(ws, row=row_idx, column=col_idx)
+                cell._value = value
+                if t is bool:
+                    cell.data_type = 'b'
+            elif t in date_styles:
+                cell = Cell(ws, row=row_idx, column=col_idx, style_array=date_styles[t])
+                cell._value = value
+                cell.data_type = 'd'
+            else:
+                cell = Cell(ws, row=row_idx, column=col_idx, value=value)  # Strings use the openpyxl checks
+                if cell.data_type == 'd':
+                    date_styles[t] = cell._style
+            cells[(row_idx, col_idx)] = cell
+    ws._current_row = row_idx
+    return row_idx - start
+
+
+def get_dialect(csvfile, dialect='excel'):
+    """Return the csv dialect. 'sniff' or None detects the dialect from the start of the file."""
+    if dialect is None or dialect == 'sniff':
+        sample = csvfile.read(65536)
+        csvfile.seek(0)
+        try:
+            return csv.Sniffer().sniff(sample)
+        except csv.Error:
+            return 'excel'
+    return dialect
+
+
+def get_sheet_title(row):
+    """Return the title of a '# <title>' sheet marker row or None."""
+    if len(row) == 1 and row[0].startswith(SHEET_MARKER):
+        return row[0][len(SHEET_MARKER):]
+    return None
+
+
+def iter_sheets(rows):
+    """Yield the (title, rows) of every sheet in the rows of a CSV file in one pass.
+
+    Multi-sheet files start every sheet with a '# <title>' marker row and separate the sheets with two empty rows (see
+    openpyxl_to_csv). A file is only read as multi-sheet if a second marker follows two empty rows, so the rows of the
+    first sheet are kept until then. Other files are one 'Sheet1'. The rows of a sheet must be read before the next
+    sheet. Rows that were not read are skipped.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    title = None if first is None else get_sheet_title(first)
+    if title is None:
+        yield 'Sheet1', (rows if first is None else chain((first,), rows))
+        return
+
+    # Find the second sheet marker before the first row is used as a title
+    head = []
+    blank = 0
+    for row in rows:
+        if len(row) == 0:
+            blank += 1
+        elif blank >= 2 and get_sheet_title(row) is not None:
+            break
+        else:
+            blank = 0
+        head.append(row)
+    else:
+        yield 'Sheet1', chain((first,), head)  # A single '# ...' value in the first row is a value
+        return
+
+    yield title, iter(head[:len(head) - 2])
+    titles = [get_sheet_title(row)]
+
+    def read_sheet():
+        blank = 0  # Empty rows are only added if they are not the separator before the next sheet
+        for row in rows:
+            if len(row) == 0:
+                blank += 1
+                continue
+            elif blank >= 2:
+                next_title = get_sheet_title(row)
+                if next_title is not None:
+                    titles.append(next_title)
+                    yield from ([] for _ in range(blank - 2))
+                    return
+            yield from ([] for _ in range(blank))
+            blank = 0
+            yield row
+
+    while titles:
+        title = titles.pop()
+        sheet_rows = read_sheet()
+        yield title, sheet_rows
+        for _ in sheet_rows:
+            pass  # Skip the rows that were not read
+
+
+def should_load_sheet(sheets, title, index):
+    """Return if the sheet title or 1-based index is in sheets. If sheets is None every sheet is loaded."""
+    return sheets is None or title in sheets or index in sheets
+
+
+def read_csv_sheets(csvfile, infer_types=True, strict=False, dialect='excel', sample_size=CSV_SAMPLE_SIZE,
+                    sheets=None):
+    """Yield the (title, typed rows) of every sheet in an open CSV file in one pass (see iter_sheets).
+
+    Sheets that are not in sheets yield None for the rows and their rows are skipped without converting them.
+    """
+    reader = csv.reader(csvfile, get_dialect(csvfile, dialect))
+    for index, (title, rows) in enumerate(iter_sheets(reader), 1):
+        if not should_load_sheet(sheets, title, index):
+            yield title, None
+        else:
+            yield title, iter_typed_rows(rows, infer_types=infer_types, strict=strict, sample_size=sample_size)
+
+
+def csv_to_openpyxl(csv_path, infer_types=True, strict=False, dialect='excel', encoding='utf-8',
+                    sample_size=CSV_SAMPLE_SIZE, sheets=None, skipped=None):
+    """
+    Load a CSV file into a new openpyxl Workbook streaming the rows.
+
+    Every row is converted with the column types inferred from the first rows (see iter_typed_rows) and appended at
+    once. Empty values do not create cells. Multi-sheet files (see openpyxl_to_csv) are loaded into a worksheet for
+    every sheet in one pass.
+
     Args:
         csv_path (str): Path to the input CSV file.
+        infer_types (bool)[True]: Convert numbers, booleans and dates to the inferred column types.
+        strict (bool)[False]: Raise a ValueError for a value that does not match the inferred column type.
+        dialect (str/csv.Dialect)['excel']: csv dialect. 'sniff' or None detects the dialect.
+        encoding (str)['utf-8']: File encoding.
+        sample_size (int)[CSV_SAMPLE_SIZE]: Number of rows used to infer the column types.
+        sheets (set)[None]: Sheet titles and 1-based indexes to load. Other sheets are empty. If None load every sheet.
+        skipped (list)[None]: List that gets the title of every sheet that was not loaded.
 
     Returns:
         Workbook
     """
     # Create a new workbook
     wb = openpyxl.Workbook()
-    ws = wb.active  # Use the default active sheet
-    ws.title = "Sheet1"
-
-    # Open and read the CSV file
-    with open(csv_path, newline='', encoding='utf-8') as csvfile:
-        reader = csv.reader(csvfile)
-        # Iterate over each row in the CSV
-        for row_idx, row in enumerate(reader, 1):  # 1-based indexing for openpyxl
-            for col_idx, value in enumerate(row, 1):
-                # Write each value to the corresponding cell
-                ws.cell(row=row_idx, column=col_idx, value=value)
+    wb.remove(wb.active)
+
+    with open(csv_path, newline='', encoding=encoding) as csvfile:
+        for title, rows in read_csv_sheets(csvfile, infer_types=infer_types, strict=strict, dialect=dialect,
+                                           sample_size=sample_size, sheets=sheets):
+            ws = wb.create_sheet(title)
+            if rows is not None:
+                append_rows(ws, rows)
+            elif skipped is not None:
+                skipped.append(title)
 
+    if len(wb.worksheets) == 0:
+        wb.create_sheet('Sheet1')
+    wb.active = 0
     return wb
 
 
-def openpyxl_to_csv(csv_path, wb):
-    with open(csv_path, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        for i, ws in enumerate(wb.worksheets):
-            if len(wb.worksheets) > 1:
-                if i > 0:
-                    writer.writerow([])
-                    writer.writerow([])
-                writer.writerow([f"# {ws.title}"])
+def openpyxl_to_csv(csv_path, wb, dialect='excel', encoding='utf-8', release=None):
+    """Write every sheet of the workbook to a CSV file. Multi-sheet workbooks start every sheet with a '# <title>' row.
+
+    The rows are written to a temporary file that replaces the file at the end, so the workbook can still read the
+    rows of a memory-mapped file while it is written.
+
+    Args:
+        csv_path (str): Path to the output CSV file.
+        wb (Workbook): openpyxl Workbook or GridWorkbook.
+        dialect (str/csv.Dialect)['excel']: csv dialect.
+        encoding (str)['utf-8']: File encoding.
+        release (callable)[None]: Called after the rows are written and before the file is replaced to close a memory
+            map of the file. Windows cannot replace a file that is open.
+    """
+    if dialect is None or dialect == 'sniff':
+        dialect = 'excel'
+    tmp_path = csv_path + '.tmp'
+    try:
+        with open(tmp_path, 'w', newline='', encoding=encoding) as csvfile:
+            writer = csv.writer(csvfile, dialect)
+            for i, ws in enumerate(wb.worksheets):
+                if len(wb.worksheets) > 1:
+                    if i > 0:
+                        writer.writerow([])
+                        writer.writerow([])
+                    writer.writerow([f"{SHEET_MARKER}{ws.title}"])
 
-            for row in ws.iter_rows(values_only=True):
-                writer.writerow(row)
\ No newline at end of file
+                for row in ws.iter_rows(values_only=True):
+                    writer.writerow(row)
+        if release is not None:
+            release()
+        os.replace(tmp_path, csv_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
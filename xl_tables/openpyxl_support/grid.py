@@ -0,0 +1,385 @@
+"""Array backed worksheets for delimited text files.
+
+CSV and TSV files do not need the openpyxl Cell objects. A GridSheet keeps a GridColumn for every column and has the
+part of the openpyxl Worksheet interface that the Sheet, RangeObject and CellsCollection wrappers use. Columns of
+integers or floats are kept in an array with an empty mask.
+"""
+from array import array
+
+import openpyxl
+
+from .csv_utils import CSV_SAMPLE_SIZE, read_csv_sheets, append_rows
+from .xlsx_writer import save_workbook
+
+
+__all__ = ['GridColumn', 'GridCell', 'GridSheet', 'GridWorkbook', 'csv_to_grid']
+
+
+ARRAY_TYPES = {int: 'q', float: 'd'}  # Python type: array typecode
+MIN_EXTRA = 64  # Number of values of another type an array column keeps before it is changed to a list
+
+
+class GridColumn(object):
+    """Column of values by 0-based index.
+
+    A column is a list of values or an array of int or float values. Array columns keep a mask of empty values and a
+    {index: value} dictionary for the few values of another type (like a header name). Too many values of another type
+    change the column to a list.
+    """
+    __slots__ = ('values', 'mask', 'extra')
+
+    def __init__(self, values=None):
+        self.values = [] if values is None else values
+        self.mask = None  # bytearray with 1 for every empty value of an array column
+        self.extra = None  # {index: value} values of an array column that do not have the array type
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, index):
+        """Return the value at the index or None."""
+        try:
+            if self.mask is None:
+                return self.values[index]
+            elif self.mask[index]:
+                return self.extra.get(index, None) if self.extra else None
+            return self.values[index]
+        except IndexError:
+            return None
+
+    def set(self, index, value):
+        """Set the value at the index. Return if the value changed."""
+        old = self.get(index)
+        if old is value or (type(old) is type(value) and old == value):
+            return False
+
+        if index >= len(self.values):
+            self.grow(index + 1)
+
+        values = self.values
+        mask = self.mask
+        if mask is None:
+            values[index] = value
+            return True
+
+        extra = self.extra
+        if extra:
+            extra.pop(index, None)
+        if value is None:
+            mask[index] = 1
+            return True
+        elif ARRAY_TYPES.get(type(value), None) == values.typecode:
+            try:
+                values[index] = value
+                mask[index] = 0
+                return True
+            except OverflowError:
+                pass
+
+        # Value of another type
+        mask[index] = 1
+        if extra is None:
+            extra = self.extra = {}
+        extra[index] = value
+        if len(extra) > max(MIN_EXTRA, len(values) // 8):
+            self.to_list()
+        return True
+
+    def append(self, value):
+        """Add a value to the end of the column."""
+        values = self.values
+        if self.mask is None:
+            values.append(value)
+        elif value is not None and ARRAY_TYPES.get(type(value), None) == values.typecode:
+            values.append(value)
+            self.mask.append(0)
+        else:
+            self.grow(len(values) + 1)
+            if value is not None:
+                self.set(len(values) - 1, value)
+
+    def grow(self, size):
+        """Add empty values to the end of the column until it has the size."""
+        count = size - len(self.values)
+        if count <= 0:
+            return
+        elif self.mask is None:
+            self.values.extend([None] * count)
+        else:
+            self.values.frombytes(bytes(count * self.values.itemsize))
+            self.mask.extend(b'\x01' * count)
+
+    def slice(self, start, stop):
+        """Return the list of values from the start index to the stop index. Missing values are None."""
+        values = self.values[start:stop]
+        if self.mask is not None:
+            values = [None if empty else value for value, empty in zip(values, self.mask[start:stop])]
+            if self.extra:
+                for index, value in self.extra.items():
+                    if start <= index < stop:
+                        values[index - start] = value
+        elif not isinstance(values, list):
+            values = list(values)
+
+        if len(values) < stop - start:
+            values.extend([None] * (stop - start - len(values)))
+        return values
+
+    def to_list(self):
+        """Change the column to a list of values."""
+        if self.mask is not None:
+            self.values = self.slice(0, len(self.values))
+            self.mask = None
+            self.extra = None
+
+    def compact(self):
+        """Change a list column to an array if almost every value is an int or every value is a float."""
+        if self.mask is not None:
+            return
+
+        counts = {}
+        for value in self.values:
+            if value is not None:
+                t = type(value)
+                counts[t] = counts.get(t, 0) + 1
+        if len(counts) == 0:
+            return
+
+        typ = max(counts, key=counts.get)
+        typecode = ARRAY_TYPES.get(typ, None)
+        if typecode is None or sum(counts.values()) - counts[typ] > max(MIN_EXTRA, len(self.values) // 8) // 2:
+            return
+
+        values = array(typecode)
+        mask = bytearray(len(self.values))
+        extra = {}
+        zero = typ()
+        try:
+            for i, value in enumerate(self.values):
+                if type(value) is typ:
+                    values.append(value)
+                else:
+                    values.append(zero)
+                    mask[i] = 1
+                    if value is not None:
+                        extra[i] = value
+        except OverflowError:
+            return  # Integers that do not fit in 64 bits
+        self.values, self.mask, self.extra = values, mask, extra or None
+
+
+class GridCell(object):
+    """Cell handle for a GridSheet position like an openpyxl Cell."""
+    __slots__ = ('parent', 'row', 'column')
+
+    def __init__(self, parent, row, column):
+        self.parent = parent
+        self.row = row
+        self.column = column
+
+    @property
+    def value(self):
+        return self.parent.get_value(self.row, self.column)
+
+    @value.setter
+    def value(self, value):
+        self.parent.set_value(self.row, self.column, value)
+
+
+class GridSheet(object):
+    """Worksheet-like grid of values stored by column.
+
+    Args:
+        parent (GridWorkbook)[None]: Workbook that owns the sheet.
+        title (str)['Sheet1']: Name of the sheet.
+    """
+    def __init__(self, parent=None, title='Sheet1'):
+        self.parent = parent
+        self.title = title
+        self.grid = []  # [GridColumn] for every column
+        self.max_row = 0
+        self.max_column = 0
+
+    def __repr__(self):
+        return '<GridSheet "{}">'.format(self.title)
+
+    def get_value(self, row, column):
+        """Return the value of the 1-based row and column or None."""
+        if row < 1 or column < 1:
+            return None
+        try:
+            return self.grid[column - 1].get(row - 1)
+        except IndexError:
+            return None
+
+    def set_value(self, row, column, value):
+        """Set the value of the 1-based row and column. Return if the value changed."""
+        grid = self.grid
+        if column > len(grid):
+            if value is None:
+                return False
+            grid.extend(GridColumn() for _ in range(column - len(grid)))
+
+        changed = grid[column - 1].set(row - 1, value)
+        if changed and value is not None:
+            self.max_row = max(self.max_row, row)
+            self.max_column = max(self.max_column, column)
+        return changed
+
+    def cell(self, row, column, value=None):
+        cell = GridCell(self, row, column)
+        if value is not None:
+            cell.value = value
+        return cell
+
+    def append(self, values):
+        """Add a row of values after the last row."""
+        if not isinstance(values, (list, tuple)):
+            values = list(values)
+        grid = self.grid
+        if len(values) > len(grid):
+            grid.extend(GridColumn() for _ in range(len(values) - len(grid)))
+            self.max_column = len(grid)
+
+        index = self.max_row  # 0-based index of the new row
+        for column, value in zip(grid, values):
+            if len(column.values) < index:
+                column.grow(index)
+            column.append(value)
+        self.max_row = index + 1
+
+    def compact(self):
+        """Change list columns of numbers to arrays (see GridColumn.compact)."""
+        for column in self.grid:
+            column.compact()
+
+    def iter_rows(self, min_row=None, max_row=None, min_col=None, max_col=None, values_only=False):
+        """Yield a tuple for every row in the bounds. The bounds default to the used range."""
+        min_row = min_row or 1
+        min_col = min_col or 1
+        max_row = max_row or self.max_row
+        max_col = max_col or self.max_column
+        if values_only:
+            empty = GridColumn()
+            columns = [self.grid[c - 1] if c <= len(self.grid) else empty for c in range(min_col, max_col + 1)]
+            yield from zip(*(column.slice(min_row - 1, max_row) for column in columns))
+        else:
+            for row in range(min_row, max_row + 1):
+                yield tuple(GridCell(self, row, column) for column in range(min_col, max_col + 1))
+
+    @property
+    def rows(self):
+        return self.iter_rows()
+
+    @property
+    def columns(self):
+        for column in range(1, self.max_column + 1):
+            yield tuple(GridCell(self, row, column) for row in range(1, self.max_row + 1))
+
+
+class GridWorkbook(object):
+    """Workbook-like collection of GridSheets for delimited text files.
+
+    Saving to an Excel file copies the values to a new openpyxl Workbook.
+    """
+    read_only = False
+    write_only = False
+
+    def __init__(self):
+        self._sheets = []
+        self._active = 0
+
+    @property
+    def worksheets(self):
+        return list(self._sheets)
+
+    @property
+    def sheetnames(self):
+        return [ws.title for ws in self._sheets]
+
+    @property
+    def active(self):
+        try:
+            return self._sheets[self._active]
+        except IndexError:
+            return None
+
+    @active.setter
+    def active(self, value):
+        if isinstance(value, GridSheet):
+            value = self._sheets.index(value)
+        self._active = value
+
+    def __getitem__(self, name):
+        for ws in self._sheets:
+            if ws.title == name:
+                return ws
+        raise KeyError('Worksheet {} does not exist.'.format(name))
+
+    def __contains__(self, name):
+        return name in self.sheetnames
+
+    def index(self, ws):
+        return self._sheets.index(ws)
+
+    def create_sheet(self, title=None, index=None):
+        """Create and return a new GridSheet."""
+        if title is None:
+            title = 'Sheet{}'.format(len(self._sheets) + 1)
+        ws = GridSheet(self, title)
+        if index is None:
+            self._sheets.append(ws)
+        else:
+            self._sheets.insert(index, ws)
+        return ws
+
+    def remove(self, ws):
+        self._sheets.remove(ws)
+
+    def close(self):
+        pass
+
+    def to_openpyxl(self):
+        """Return a new openpyxl Workbook with the values of every sheet."""
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active)
+        for ws in self._sheets:
+            append_rows(wb.create_sheet(ws.title), ws.iter_rows(values_only=True))
+        if self._sheets:
+            wb.active = min(self._active, len(self._sheets) - 1)
+        return wb
+
+    def save(self, filename):
+        """Save the values to an Excel file (see save_workbook)."""
+        save_workbook(self, filename)
+
+
+def csv_to_grid(csv_path, infer_types=True, strict=False, dialect='excel', encoding='utf-8',
+                sample_size=CSV_SAMPLE_SIZE, sheets=None, skipped=None):
+    """Load a CSV file into a new GridWorkbook streaming the rows (see csv_to_openpyxl for the arguments).
+
+    Number columns are changed to arrays after the sample rows, so the rest of the rows are added to the arrays.
+    Multi-sheet files are loaded into a GridSheet for every sheet in one pass.
+
+    Returns:
+        GridWorkbook
+    """
+    wb = GridWorkbook()
+    with open(csv_path, newline='', encoding=encoding) as csvfile:
+        for title, rows in read_csv_sheets(csvfile, infer_types=infer_types, strict=strict, dialect=dialect,
+                                           sample_size=sample_size, sheets=sheets):
+            ws = wb.create_sheet(title)
+            if rows is None:
+                if skipped is not None:
+                    skipped.append(title)
+                continue
+
+            for i, row in enumerate(rows, 1):
+                ws.append(row)
+                if i == sample_size:
+                    ws.compact()
+            ws.compact()
+
+    if len(wb.worksheets) == 0:
+        wb.create_sheet('Sheet1')
+    return wb
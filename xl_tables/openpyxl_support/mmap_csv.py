@@ -0,0 +1,360 @@
+"""Memory-mapped CSV worksheets that only decode the rows that are read.
+
+Opening a CSV file with csv_to_mmap maps the file and builds a sparse index with the byte offset of every
+ROW_INDEX_STEP-th row. The index is saved next to the file (<file>.xlidx) and is used again while the file size and
+modification time do not change. Reading a cell or a bounded range decodes the rows from the nearest indexed row, so the
+memory used only grows with the rows that are read. Written values are kept in memory until the workbook is saved.
+"""
+import io
+import os
+import csv
+import mmap
+import struct
+from array import array
+from collections import OrderedDict
+from itertools import accumulate, islice
+
+from .csv_utils import CSV_SAMPLE_SIZE, get_dialect, get_sheet_title, infer_converters, make_row_converter
+from .grid import GridSheet, GridWorkbook, csv_to_grid
+
+
+__all__ = ['ROW_INDEX_STEP', 'INDEX_EXT', 'build_row_index', 'load_row_index', 'save_row_index', 'get_row_index',
+           'MmapSheet', 'MmapWorkbook', 'csv_to_mmap']
+
+
+ROW_INDEX_STEP = 16  # Number of rows between the byte offsets kept in the row index
+ROW_CACHE_SIZE = 1024  # Number of decoded rows a MmapSheet keeps for single cell reads
+READ_BLOCK_SIZE = 4096  # Number of rows decoded at once when streaming rows
+INDEX_CHUNK_SIZE = 1 << 20  # Number of bytes scanned at once when building the row index
+INDEX_EXT = '.xlidx'  # Extension added to the CSV filename for the saved row index
+INDEX_MAGIC = b'XLIDX\x01' + (b'L' if array('q', [1]).tobytes()[0] == 1 else b'B') + b'\x00'
+INDEX_HEADER = struct.Struct('<8sqqqq1s')  # magic, file size, mtime_ns, rows, step, quotechar
+
+
+def build_row_index(data, quotechar=b'"', step=ROW_INDEX_STEP):
+    """Return the (offsets, rows) index of the bytes of a CSV file.
+
+    Quoted values can have new lines, so a new line only ends a row if an even number of quote characters came before
+    it in the row. Rows must end with '\\n' or '\\r\\n'.
+
+    Args:
+        data (bytes/mmap): Contents of the file.
+        quotechar (bytes)[b'"']: Quote character of the csv dialect.
+        step (int)[ROW_INDEX_STEP]: Number of rows between the offsets.
+
+    Returns:
+        offsets (array): Byte offset of the rows 1, 1 + step, 1 + 2*step, ...
+        rows (int): Number of rows.
+    """
+    offsets = array('q', [0])
+    size = len(data)
+    count = 0  # Number of rows that ended
+    in_quotes = False
+    for start in range(0, size, INDEX_CHUNK_SIZE):
+        pos = start
+        for piece in data[start:start + INDEX_CHUNK_SIZE].split(quotechar):
+            if not in_quotes:
+                # New lines outside of the quotes end a row
+                lengths = list(accumulate(map(len, piece.split(b'\n')[:-1])))
+                first = (-count - 1) % step  # Index of the first row end that starts an indexed row
+                offsets.extend(pos + lengths[i] + i + 1 for i in range(first, len(lengths), step))
+                count += len(lengths)
+            pos += len(piece) + 1
+            in_quotes = not in_quotes
+        in_quotes = not in_quotes  # The last piece does not end with a quote character
+
+    if size > 0 and data[size - 1:size] != b'\n':
+        count += 1  # Last row without a new line
+    elif len(offsets) > 1 and offsets[-1] >= size:
+        offsets.pop()  # The file ends with a new line
+    return offsets, count
+
+
+def get_index_filename(csv_path):
+    return csv_path + INDEX_EXT
+
+
+def load_row_index(csv_path, quotechar=b'"', step=ROW_INDEX_STEP):
+    """Return the saved (offsets, rows) index of the file or None if it is missing or the file changed."""
+    try:
+        stat = os.stat(csv_path)
+        with open(get_index_filename(csv_path), 'rb') as f:
+            magic, size, mtime, rows, index_step, index_quote = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            if magic != INDEX_MAGIC or size != stat.st_size or mtime != stat.st_mtime_ns or index_step != step or \
+                    index_quote != quotechar[:1]:
+                return None
+            offsets = array('q')
+            offsets.frombytes(f.read())
+    except (OSError, struct.error, ValueError):
+        return None
+    return offsets, rows
+
+
+def save_row_index(csv_path, offsets, rows, quotechar=b'"', step=ROW_INDEX_STEP):
+    """Save the (offsets, rows) index next to the file. Return if the index was saved."""
+    filename = get_index_filename(csv_path)
+    tmp = filename + '.tmp'
+    try:
+        stat = os.stat(csv_path)
+        with open(tmp, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, rows, step, quotechar[:1]))
+            offsets.tofile(f)
+        os.replace(tmp, filename)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def get_row_index(csv_path, data, quotechar=b'"', step=ROW_INDEX_STEP, persist=True):
+    """Return the (offsets, rows) index of the mapped file. The index is loaded from or saved to <file>.xlidx if
+    persist is True.
+    """
+    index = load_row_index(csv_path, quotechar, step) if persist else None
+    if index is None:
+        index = build_row_index(data, quotechar, step)
+        if persist:
+            save_row_index(csv_path, *index, quotechar=quotechar, step=step)
+    return index
+
+
+class MmapSheet(GridSheet):
+    """Worksheet-like view of a memory-mapped CSV file that decodes rows when they are read.
+
+    Written values are kept in an overlay of {row: {column: value}} over the file values.
+
+    Args:
+        parent (MmapWorkbook): Workbook that owns the sheet.
+        title (str): Name of the sheet.
+        data (mmap): Mapped contents of the file.
+        offsets (array): Byte offset of every step-th row (see build_row_index).
+        rows (int): Number of rows in the file.
+        step (int)[ROW_INDEX_STEP]: Number of rows between the offsets.
+        encoding (str)['utf-8']: File encoding.
+        dialect (str/csv.Dialect)['excel']: csv dialect.
+        convert_header (callable)[None]: convert_row(row) function for the first row.
+        convert_row (callable)[None]: convert_row(row) function for the other rows. If None empty strings are None.
+        columns (int)[0]: Number of columns in the first rows.
+    """
+    def __init__(self, parent, title, data, offsets, rows, step=ROW_INDEX_STEP, encoding='utf-8', dialect='excel',
+                 convert_header=None, convert_row=None, columns=0):
+        super().__init__(parent, title)
+        self.data = data
+        self.offsets = offsets
+        self.step = step
+        self.encoding = encoding
+        self.dialect = dialect
+        self.convert_header = convert_header
+        self.convert_row = convert_row
+        self.overlay = {}  # {row: {column: value}} written values
+        self.row_cache = OrderedDict()  # {row: decoded values} of the last rows that were read
+        self.file_rows = rows
+        self.max_row = rows
+        self.max_column = columns
+
+    def __repr__(self):
+        return '<MmapSheet "{}">'.format(self.title)
+
+    def decode_rows(self, min_row, max_row):
+        """Return the list of decoded rows from min_row to max_row that are in the file."""
+        max_row = min(max_row, self.file_rows)
+        if min_row > max_row:
+            return []
+
+        step = self.step
+        offsets = self.offsets
+        block = (min_row - 1) // step
+        end_block = (max_row - 1) // step + 1
+        start = offsets[block]
+        end = offsets[end_block] if end_block < len(offsets) else len(self.data)
+        text = io.StringIO(self.data[start:end].decode(self.encoding), newline='')
+        rows = islice(csv.reader(text, self.dialect), min_row - 1 - block * step, max_row - block * step)
+
+        convert_header, convert_row = self.convert_header, self.convert_row
+        values = []
+        for i, row in enumerate(rows, min_row):
+            try:
+                if convert_row is None:
+                    row = [None if value == '' else value for value in row]
+                elif i == 1:
+                    row = convert_header(row)
+                else:
+                    row = convert_row(row)
+            except ValueError as err:
+                raise ValueError('Row {}: {}'.format(i, err)) from None
+            values.append(row)
+        return values
+
+    def get_row(self, row):
+        """Return the decoded file values of the 1-based row. Recently read rows are cached."""
+        cache = self.row_cache
+        try:
+            cache.move_to_end(row)
+            return cache[row]
+        except KeyError:
+            pass
+
+        values = self.decode_rows(row, row)
+        values = values[0] if values else []
+        cache[row] = values
+        if len(cache) > ROW_CACHE_SIZE:
+            cache.popitem(last=False)
+        return values
+
+    def get_value(self, row, column):
+        """Return the value of the 1-based row and column or None."""
+        if row < 1 or column < 1:
+            return None
+        written = self.overlay.get(row, None)
+        if written is not None and column in written:
+            return written[column]
+        elif row > self.file_rows:
+            return None
+
+        values = self.get_row(row)
+        return values[column - 1] if column <= len(values) else None
+
+    def set_value(self, row, column, value):
+        """Set the value of the 1-based row and column. Return if the value changed."""
+        old = self.get_value(row, column)
+        if old is value or (type(old) is type(value) and old == value):
+            return False
+
+        self.overlay.setdefault(row, {})[column] = value
+        if value is not None:
+            self.max_row = max(self.max_row, row)
+            self.max_column = max(self.max_column, column)
+        return True
+
+    def append(self, values):
+        """Add a row of values after the last row."""
+        row = self.max_row + 1
+        for column, value in enumerate(values, 1):
+            if value is not None:
+                self.set_value(row, column, value)
+        self.max_row = row
+
+    def compact(self):
+        pass
+
+    def iter_rows(self, min_row=None, max_row=None, min_col=None, max_col=None, values_only=False):
+        """Yield a tuple for every row in the bounds. The bounds default to the used range.
+
+        Rows are decoded in blocks of READ_BLOCK_SIZE rows. If max_col is None every row keeps its own width.
+        """
+        min_row = min_row or 1
+        min_col = min_col or 1
+        max_row = max_row or self.max_row
+        if not values_only:
+            yield from super().iter_rows(min_row, max_row, min_col, max_col or self.max_column)
+            return
+
+        overlay = self.overlay
+        for block in range(min_row, max_row + 1, READ_BLOCK_SIZE):
+            block_end = min(block + READ_BLOCK_SIZE - 1, max_row)
+            rows = self.decode_rows(block, block_end)
+            rows.extend([] for _ in range(block_end - block + 1 - len(rows)))
+            for row, values in enumerate(rows, block):
+                written = overlay.get(row, None)
+                if written:
+                    width = max(len(values), max(written))
+                    values = values + [None] * (width - len(values))
+                    for column, value in written.items():
+                        values[column - 1] = value
+
+                stop = max_col if max_col is not None else max(len(values), self.max_column)
+                values = values[min_col - 1:stop]
+                if len(values) < stop - min_col + 1:
+                    values.extend([None] * (stop - min_col + 1 - len(values)))
+                yield tuple(values)
+
+
+class MmapWorkbook(GridWorkbook):
+    """Workbook-like collection with the MmapSheet of a memory-mapped CSV file.
+
+    Args:
+        csv_path (str): Path to the CSV file.
+        encoding (str)['utf-8']: File encoding.
+    """
+    def __init__(self, csv_path, encoding='utf-8'):
+        super().__init__()
+        self.filename = csv_path
+        self.encoding = encoding
+        self.file = open(csv_path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.file.close()
+            raise
+
+    def is_mapped(self, path):
+        """Return if the path is the mapped file."""
+        try:
+            return os.path.samefile(path, self.filename)
+        except OSError:
+            return False
+
+    def close(self):
+        """Close the mapped file. Values cannot be read after closing. Closing again does nothing."""
+        for ws in self._sheets:
+            if isinstance(ws, MmapSheet):
+                ws.data = b''
+                ws.file_rows = 0
+        self.data.close()
+        self.file.close()
+
+
+def can_map(csv_path, encoding='utf-8'):
+    """Return if the file can be mapped. The file must not be empty and the encoding must keep ASCII bytes."""
+    try:
+        if '\n"'.encode(encoding) != b'\n"' or os.path.getsize(csv_path) == 0:
+            return False
+    except (LookupError, UnicodeError, OSError):
+        return False
+
+    with open(csv_path, 'r', newline='', encoding=encoding) as f:
+        first = next(csv.reader(f), None)
+    return first is None or get_sheet_title(first) is None  # Possible multi-sheet files use the grid backend
+
+
+def csv_to_mmap(csv_path, infer_types=True, strict=False, dialect='excel', encoding='utf-8',
+                sample_size=CSV_SAMPLE_SIZE, sheets=None, skipped=None, step=ROW_INDEX_STEP, persist_index=True):
+    """Map a CSV file into a new MmapWorkbook without reading every row (see csv_to_openpyxl for the arguments).
+
+    Only the sample rows are read to infer the column types. Multi-sheet files, empty files and encodings that do not
+    keep ASCII bytes are loaded with csv_to_grid.
+
+    Args:
+        step (int)[ROW_INDEX_STEP]: Number of rows between the byte offsets of the row index.
+        persist_index (bool)[True]: Load and save the row index next to the file (<file>.xlidx).
+
+    Returns:
+        MmapWorkbook
+    """
+    if not can_map(csv_path, encoding):
+        return csv_to_grid(csv_path, infer_types=infer_types, strict=strict, dialect=dialect, encoding=encoding,
+                           sample_size=sample_size, sheets=sheets, skipped=skipped)
+
+    with open(csv_path, 'r', newline='', encoding=encoding) as f:
+        dialect = get_dialect(f, dialect)
+        sample = list(islice(csv.reader(f, dialect), sample_size))
+
+    wb = MmapWorkbook(csv_path, encoding)
+    quotechar = (csv.get_dialect(dialect) if isinstance(dialect, str) else dialect).quotechar or '"'
+    quotechar = quotechar.encode(encoding)
+    offsets, rows = get_row_index(csv_path, wb.data, quotechar, step, persist=persist_index)
+
+    convert_header = convert_row = None
+    if infer_types:
+        converters = infer_converters(sample[1:] or sample)
+        convert_header = make_row_converter(converters)
+        convert_row = make_row_converter(converters, strict=strict)
+
+    ws = MmapSheet(wb, 'Sheet1', wb.data, offsets, rows, step=step, encoding=encoding, dialect=dialect,
+                   convert_header=convert_header, convert_row=convert_row,
+                   columns=max((len(row) for row in sample), default=0))
+    wb._sheets.append(ws)
+    return wb
@@ -1,13 +1,23 @@
 import os
+import copy
 import signal
+import weakref
+from functools import lru_cache
+from itertools import islice
 from unittest import mock
 import openpyxl
-from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.utils import get_column_letter, column_index_from_string, range_boundaries
 
 from ..prop_utils import HashDict, ItemStorage
-from ..fields import ConstantItem
+from ..fields import FieldRegistry, collect_fields, FieldsMeta, read_fields, Batch, to_dataframe, from_dataframe, \
+    ConstantItem, encode_value, is_iterable, overlaps, iter_field_batches, export_tables, Item, \
+    BuiltinDocumentPropertyItem
 from .fake_excel import Excel, fake_proxy_method, fake_proxy_property
-from .csv_utils import csv_to_openpyxl, openpyxl_to_csv
+from .csv_utils import CSV_SAMPLE_SIZE, csv_to_openpyxl, openpyxl_to_csv
+from .grid import GridSheet, csv_to_grid
+from .mmap_csv import MmapWorkbook, csv_to_mmap
+from .xlsx_reader import xlsx_to_grid
+from .xlsx_writer import save_workbook
 
 
 def mock_borders():
@@ -20,6 +30,310 @@ def mock_borders():
     return property(get)
 
 
+EXTENTS = weakref.WeakKeyDictionary()
+CHANGES = weakref.WeakKeyDictionary()  # {worksheet: {(row, column)}} cells written through this library
+WRITES = weakref.WeakKeyDictionary()  # {worksheet: [generation, [written boxes]]} see record_write
+MAX_WRITE_LOG = 1000  # Number of written boxes to keep before every cached value of the sheet is invalid
+CONSTANT_TEMPLATES = weakref.WeakKeyDictionary()  # {Table class: (signature, ((field, ((row, column), value)), ...))}
+CSV_LOADERS = {'grid': csv_to_grid, 'mmap': csv_to_mmap, 'openpyxl': csv_to_openpyxl}  # Workbook.CSV_BACKEND
+
+
+def snapshot_value(value):
+    """Return a deep copy of a constant value to compare with later. Values that cannot be copied are returned."""
+    try:
+        return copy.deepcopy(value)
+    except (TypeError, ValueError, copy.Error, Exception):
+        return value
+
+
+@lru_cache(maxsize=4096)
+def parse_range(range_str):
+    """Return the cached openpyxl (min_col, min_row, max_col, max_row) boundaries for an A1 range string."""
+    return range_boundaries(range_str)
+
+
+def get_extent(sheet):
+    """Return the (max_row, max_column) used by the sheet.
+
+    Normal worksheets keep an index of the used extent that is only updated with the cells added since the last call,
+    so this does not scan every cell like `max_row` and `max_column` do. Read only worksheets of files without a
+    dimension element are scanned once to find their extent.
+    """
+    cells = getattr(sheet, '_cells', None)
+    if cells is None:
+        if (sheet.max_row is None or sheet.max_column is None) and hasattr(sheet, 'reset_dimensions'):
+            sheet.calculate_dimension(force=True)  # Read only worksheet without a dimension
+        return sheet.max_row or 1, sheet.max_column or 1
+
+    count, last, max_row, max_col = EXTENTS.get(sheet, (0, None, 1, 1))
+    if len(cells) < count or (len(cells) == count and count and last != next(reversed(cells))):
+        count, max_row, max_col = 0, 1, 1  # Cells were deleted or moved. Rebuild the index
+
+    for row, col in islice(reversed(cells), len(cells) - count):
+        max_row = max(max_row, row)
+        max_col = max(max_col, col)
+
+    last = next(reversed(cells)) if cells else None
+    EXTENTS[sheet] = (len(cells), last, max_row, max_col)
+    return max_row, max_col
+
+
+def get_bounds(sheet, range_str, open_ended=None):
+    """Return the numeric (min_row, min_col, max_row, max_col) bounds for an A1 range string.
+
+    Whole row and whole column ranges ("3:3", "A:A") are bounded by the used range of the sheet.
+
+    Args:
+        sheet (Worksheet): openpyxl worksheet.
+        range_str (str): A1 range string.
+        open_ended (tuple)[None]: (rows, columns) flags of an open ended Column or Row field (see ItemPlan). The
+            flagged bounds are clipped to the used range of the sheet. This should only be used for reading.
+    """
+    min_col, min_row, max_col, max_row = parse_range(range_str)
+    if min_row is None:
+        min_row, max_row = 1, get_extent(sheet)[0]
+    if min_col is None:
+        min_col, max_col = 1, get_extent(sheet)[1]
+
+    if open_ended is not None and any(open_ended):
+        used_row, used_col = get_extent(sheet)
+        if open_ended[0]:
+            max_row = max(min_row, min(max_row, used_row))
+        if open_ended[1]:
+            max_col = max(min_col, min(max_col, used_col))
+    return min_row, min_col, max_row, max_col
+
+
+def split_areas(range_str):
+    """Return the list of areas in a ', ' separated multi-area range string."""
+    return [area.strip() for area in range_str.split(',') if area.strip()]
+
+
+def get_value(sheet, row, column):
+    """Return the value of a cell without creating the cell. Missing cells return None."""
+    cells = getattr(sheet, '_cells', None)
+    if cells is None:
+        get = getattr(sheet, 'get_value', None)  # RowBuffer or GridSheet
+        if get is not None:
+            return get(row, column)
+        return sheet.cell(row=row, column=column).value
+
+    cell = cells.get((row, column), None)
+    if cell is None:
+        return None
+    return cell.value
+
+
+def iter_values(sheet, min_row, min_col, max_row, max_col):
+    """Yield a tuple of values for every row in the bounding box.
+
+    Normal worksheets look up the values without creating a Cell for every empty coordinate.
+    Read only worksheets stream the rows with `iter_rows(values_only=True)` and stop after the last needed row.
+    Rows missing from the worksheet source are filled with None, so the shape always matches the bounding box.
+    """
+    width = max_col - min_col + 1
+    cells = getattr(sheet, '_cells', None)
+    if cells is not None:
+        get = cells.get
+        columns = range(min_col, max_col + 1)
+        for row in range(min_row, max_row + 1):
+            yield tuple(getattr(get((row, col)), 'value', None) for col in columns)
+        return
+
+    count = 0
+    for row in sheet.iter_rows(min_row=min_row, min_col=min_col, max_row=max_row, max_col=max_col,
+                               values_only=True):
+        if len(row) < width:
+            row = tuple(row) + (None,) * (width - len(row))
+        yield row
+        count += 1
+
+    empty_row = (None,) * width
+    for _ in range(count, max_row - min_row + 1):
+        yield empty_row
+
+
+def read_blocks(sheet, bounds):
+    """Return the rows for every (min_row, min_col, max_row, max_col) bounding box.
+
+    Normal worksheets look up every box directly. Read only worksheets are streamed once over the union of the boxes
+    and only the rows of each box are kept.
+    """
+    if getattr(sheet, '_cells', None) is not None:
+        return [tuple(iter_values(sheet, *box)) for box in bounds]
+
+    min_row = min(box[0] for box in bounds)
+    min_col = min(box[1] for box in bounds)
+    max_row = max(box[2] for box in bounds)
+    max_col = max(box[3] for box in bounds)
+    blocks = [[] for _ in bounds]
+    for row, values in enumerate(iter_values(sheet, min_row, min_col, max_row, max_col), min_row):
+        for block, (r0, c0, r1, c1) in zip(blocks, bounds):
+            if r0 <= row <= r1:
+                block.append(values[c0 - min_col:c1 - min_col + 1])
+    return [tuple(block) for block in blocks]
+
+
+def get_changes(sheet):
+    """Return the set of (row, column) cells that were changed in the sheet since the workbook was opened or saved."""
+    changes = CHANGES.get(sheet, None)
+    if changes is None:
+        changes = CHANGES[sheet] = set()
+    return changes
+
+
+def record_write(sheet, box):
+    """Add the (min_row, min_col, max_row, max_col) box that was written to the write log of the sheet.
+
+    Use None bounds if the written box is not known. The log is cleared with a new generation when it is full.
+    """
+    log = WRITES.get(sheet, None)
+    if log is None:
+        log = WRITES[sheet] = [0, []]
+    if len(log[1]) >= MAX_WRITE_LOG:
+        log[0] += 1
+        log[1] = []
+    log[1].append(box)
+
+
+def get_write_version(sheet):
+    """Return the (generation, count) position in the write log of the sheet."""
+    log = WRITES.get(sheet, None)
+    if log is None:
+        return 0, 0
+    return log[0], len(log[1])
+
+
+def was_written(sheet, bounds, version):
+    """Return if a box that overlaps the bounds was written to the sheet after the write log version."""
+    log = WRITES.get(sheet, None)
+    if log is None:
+        return version != (0, 0)
+    generation, count = version
+    return generation != log[0] or overlaps(bounds, log[1][count:])
+
+
+def get_setter(sheet):
+    """Return a set_value(row, column, value) function that writes without a Cell proxy for every value.
+
+    Setting None on a cell that does not exist does not create the cell. Cells that get a different value are added
+    to the changes of the sheet (see get_changes).
+    """
+    cells = getattr(sheet, '_cells', None)
+    if isinstance(sheet, GridSheet):
+        set_grid_value = sheet.set_value
+        changes = get_changes(sheet)
+
+        def set_value(row, column, value):
+            if set_grid_value(row, column, value):
+                changes.add((row, column))
+        return set_value
+
+    elif cells is None:
+        set_value = getattr(sheet, 'set_value', None)  # RowBuffer
+        if set_value is None:
+            def set_value(row, column, value):
+                sheet.cell(row=row, column=column).value = value
+        return set_value
+
+    get_cell = sheet._get_cell
+    changes = get_changes(sheet)
+
+    def set_value(row, column, value):
+        cell = cells.get((row, column), None)
+        if cell is None:
+            if value is None:
+                return  # Missing cells are already empty
+            cell = get_cell(row, column)
+        else:
+            old = cell.value
+            if old is value or (type(old) is type(value) and old == value):
+                return  # Unchanged
+        cell.value = value
+        changes.add((row, column))
+    return set_value
+
+
+def write_rows(sheet, rows, min_row=1, min_col=1, max_row=None, max_col=None):
+    """Write a 2-D iterable of values by offset starting at (min_row, min_col).
+
+    Args:
+        sheet (Worksheet): openpyxl worksheet or RowBuffer.
+        rows (iterable): Any 2-D iterable, generator or buffer. A row that is not iterable is written as one value.
+        min_row (int)[1]: Row to write the first row to.
+        min_col (int)[1]: Column to write the first value of every row to.
+        max_row (int)[None]: Ignore rows after this row. If None the sheet grows with the data.
+        max_col (int)[None]: Ignore values after this column. If None the sheet grows with the data.
+
+    Returns:
+        count (int): Number of rows written.
+    """
+    set_value = get_setter(sheet)
+    count = 0
+    last_col = min_col
+    for row, values in enumerate(rows, min_row):
+        if max_row is not None and row > max_row:
+            break
+        if not is_iterable(values):
+            values = (values,)
+        for col, value in enumerate(values, min_col):
+            if max_col is not None and col > max_col:
+                break
+            set_value(row, col, value)
+            last_col = max(last_col, col)
+        count += 1
+
+    if count:
+        record_write(sheet, (min_row, min_col, min_row + count - 1, last_col))
+    return count
+
+
+def fill_values(sheet, values, min_row, min_col, max_row, max_col):
+    """Fill the bounding box one row after another with the flattened values like encode_value does.
+
+    Values are placed by computed offset and values that do not fit in the bounding box are ignored.
+
+    Returns:
+        count (int): Number of values written.
+    """
+    set_value = get_setter(sheet)
+    record_write(sheet, (min_row, min_col, max_row, max_col))
+    width = max_col - min_col + 1
+    size = width * (max_row - min_row + 1)
+    idx = 0
+    for obj in values:
+        for value in (obj if is_iterable(obj) else (obj,)):
+            if idx >= size:
+                return idx
+            row, col = divmod(idx, width)
+            set_value(min_row + row, min_col + col, value)
+            idx += 1
+    return idx
+
+
+def read_values(sheet, range_str, open_ended=None):
+    """Return the values for an A1 range string by only reading the range's bounding box (see get_bounds)."""
+    rows = tuple(iter_values(sheet, *get_bounds(sheet, range_str, open_ended)))
+    return shape_rows(range_str, rows)
+
+
+def shape_rows(range_str, rows):
+    """Return the given rows for the bounding box of range_str in the same shape as `sheet[range_str]`.
+
+    A single cell returns the item, whole columns are returned column-wise, a single whole row or column returns a
+    flat tuple and everything else returns a tuple of row tuples.
+    """
+    min_col, min_row, max_col, max_row = parse_range(range_str)
+    if min_row is None:
+        cols = tuple(zip(*rows))
+        return cols[0] if min_col == max_col else cols
+    elif min_col is None:
+        return rows[0] if min_row == max_row else rows
+    elif ':' not in range_str:
+        return rows[0][0]
+    return rows
+
+
 class CellProxy:
     Borders = mock_borders()
     
@@ -35,64 +349,80 @@ class CellProxy:
         self._cell.value = value
 
 
+class CellPosition(CellProxy):
+    """Cell proxy for a position. The openpyxl Cell is only created when a value is set."""
+    def __init__(self, sheet, row, column):
+        self.sheet = sheet
+        self.row = row
+        self.column = column
+
+    @property
+    def _cell(self):
+        return self.sheet.cell(row=self.row, column=self.column)
+
+    @property
+    def Value(self):
+        return get_value(self.sheet, self.row, self.column)
+
+    @Value.setter
+    def Value(self, value):
+        get_setter(self.sheet)(self.row, self.column, value)
+        record_write(self.sheet, (self.row, self.column, self.row, self.column))
+
+
 class CellsCollection:
     Borders = mock_borders()
 
-    def __init__(self, sheet, range_str):
+    def __init__(self, sheet, range_str, areas=None, open_ended=None):
         self.sheet = sheet
         self.range_str = range_str
+        if areas is None:
+            areas = split_areas(range_str)
+        self.areas = areas
+        self.open_ended = open_ended or ((False, False),) * len(areas)  # (rows, columns) flags for every area
 
     @property
     def Value(self):
-        cells = self.sheet[self.range_str]
-        try:
-            len(cells)
-            try:
-                len(cells[0])
-                return tuple(tuple(cell.value for cell in row) for row in cells)
-            except TypeError:
-                return tuple(cell.value for cell in cells)
-        except TypeError:
-            return cells.value
-        
+        """Return the value of the first area like Excel does. Use Areas to read every area."""
+        # Only read the bounding box of this range. Open ended rows and columns are clipped to the used range.
+        return read_values(self.sheet, self.areas[0], self.open_ended[0])
+
     @Value.setter
     def Value(self, values):
-        cells = self.sheet[self.range_str]
-        try:
-            len(cells)
-            try:
-                len(cells[0])
-                for i, row in enumerate(cells):
-                    for j, cell in enumerate(row):
-                        try:
-                            cell.value = values[i][j]
-                        except IndexError:
-                            break
-            except TypeError:
-                for i, cell in enumerate(cells):
-                    try:
-                        cell.value = values[i]
-                    except IndexError:
-                        break
-        except TypeError:
-            cells.value = values
+        """Set the values for every area. Values that do not fit in an area are ignored."""
+        if is_iterable(values) and not isinstance(values, (list, tuple)):
+            values = tuple(values)  # Generators can only be read once
+
+        for area in self.areas:
+            min_row, min_col, max_row, max_col = get_bounds(self.sheet, area)
+            rows = values
+            if not is_iterable(values):
+                # Excel sets every cell to a single value
+                rows = [(values,) * (max_col - min_col + 1)] * (max_row - min_row + 1)
+            elif min_row == max_row and len(values) > 0 and not is_iterable(values[0]):
+                rows = (values,)  # Single row given as a flat list
+            write_rows(self.sheet, rows, min_row, min_col, max_row, max_col)
 
     def __repr__(self):
-        return f"<Cells({self.range_str}, value={self.value})>"
+        return f"<Cells({self.range_str}, value={self.Value})>"
 
     def __str__(self):
-        return str(self.value)
+        return str(self.Value)
 
     def __call__(self, row, column):
         """Access a cell by row and column (1-based indices)."""
-        if self.range_str:
-            return CellProxy(self.sheet[self.range_str][row-1][column-1])
-        else:
-            return CellProxy(self.sheet.cell(row=row, column=column))
+        if self.areas:
+            min_row, min_col, _, _ = get_bounds(self.sheet, self.areas[0])
+            row, column = min_row + row - 1, min_col + column - 1
+        return CellPosition(self.sheet, row, column)
 
     def __iter__(self):
-        """Iterate over all cells."""
-        return (CellProxy(cell) for row in self.sheet[self.range_str] for cell in row)
+        """Iterate over all cells of every area. Cells are only created when a value is set."""
+        for area in self.areas:
+            min_row, min_col, max_row, max_col = get_bounds(self.sheet, area)
+            for row in range(min_row, max_row + 1):
+                for col in range(min_col, max_col + 1):
+                    yield CellPosition(self.sheet, row, col)
 
 
 class RowsCollection:
@@ -113,17 +443,12 @@ class RowsCollection:
     @property
     def Value(self):
         """Get values of all rows."""
-        return tuple(tuple(cell.value for cell in row) for row in self.sheet.rows)
+        return tuple(iter_values(self.sheet, 1, 1, *get_extent(self.sheet)))
 
     @Value.setter
     def Value(self, values):
-        """Set values for all rows (assumes a 2D iterable)."""
-        for i, row in enumerate(self.sheet.rows, 1):
-            for j, cell in enumerate(row, 1):
-                try:
-                    cell.value = values[i-1][j-1]
-                except IndexError:
-                    break
+        """Set values for all rows (assumes a 2D iterable). Rows past the end of the sheet are added."""
+        write_rows(self.sheet, values)
 
 
 class ColumnsCollection:
@@ -144,31 +469,30 @@ class ColumnsCollection:
     @property
     def Value(self):
         """Get values of all columns (transposed view)."""
-        return tuple(tuple(cell.value for cell in col) for col in self.sheet.columns)
+        return tuple(zip(*iter_values(self.sheet, 1, 1, *get_extent(self.sheet))))
 
     @Value.setter
     def Value(self, values):
-        """Set values for all columns (assumes a 2D iterable, column-wise)."""
-        for j, col in enumerate(self.sheet.columns, 1):
-            for i, cell in enumerate(col, 1):
-                try:
-                    cell.value = values[i-1][j-1]
-                except IndexError:
-                    break
+        """Set values for all columns (assumes a 2D iterable indexed [row][column])."""
+        write_rows(self.sheet, values)
 
 
 class RangeObject:
     Borders = mock_borders()
 
-    def __init__(self, sheet, range_str):
+    def __init__(self, sheet, range_str, open_ended=None):
         self.sheet = sheet
         self.range_str = range_str
-        self._areas = [area.strip() for area in self.range_str.split(',')]
+        self._areas = split_areas(self.range_str)
+        self._open_ended = open_ended or ((False, False),) * len(self._areas)  # (rows, columns) flags for every area
+        self._cells = None
 
     @property
     def Cells(self):
         """Return cells in the range as a tuple of tuples."""
-        return CellsCollection(self.sheet, self.range_str)
+        if self._cells is None:
+            self._cells = CellsCollection(self.sheet, self.range_str, self._areas, self._open_ended)
+        return self._cells
 
     @property
     def Value(self):
@@ -184,6 +508,89 @@ class RangeObject:
     def Areas(self):
         return AreasCollection(self)
 
+    def __len__(self):
+        """Return the number of cells in every area like Range.Count."""
+        count = 0
+        for area in self._areas:
+            min_row, min_col, max_row, max_col = get_bounds(self.sheet, area)
+            count += (max_row - min_row + 1) * (max_col - min_col + 1)
+        return count
+
+    def __iter__(self):
+        """Iterate over the cells of every area one row after another like iterating an Excel Range."""
+        return iter(self.Cells)
+
+    def __getitem__(self, index):
+        """Return the cell for the 0-based index counting the cells of every area one row after another."""
+        if index < 0:
+            index += len(self)
+        if index >= 0:
+            for area in self._areas:
+                min_row, min_col, max_row, max_col = get_bounds(self.sheet, area)
+                width = max_col - min_col + 1
+                size = (max_row - min_row + 1) * width
+                if index < size:
+                    row, col = divmod(index, width)
+                    return CellPosition(self.sheet, min_row + row, min_col + col)
+                index -= size
+        raise IndexError('Range index out of range')
+
+    def __setitem__(self, index, value):
+        """Set the value of the cell for the 0-based index (see __getitem__)."""
+        self[index].Value = value
+
+    def iter_grids(self):
+        """Yield the ((rows, columns), rows) of every area streaming the rows without creating cells.
+
+        Open ended rows and columns are clipped to the used range.
+        """
+        for area, open_ended in zip(self._areas, self._open_ended):
+            min_row, min_col, max_row, max_col = bounds = get_bounds(self.sheet, area, open_ended)
+            yield (max_row - min_row + 1, max_col - min_col + 1), iter_values(self.sheet, *bounds)
+
+    def iter_line(self, start=1, cols=True):
+        """Yield the values of the first column (or row) of the first area from the 1-based start position.
+
+        Values are looked up one at a time without creating cells and stop at the used range, so a scan that stops at
+        the first empty cell only reads up to that cell.
+        """
+        min_row, min_col, max_row, max_col = get_bounds(self.sheet, self._areas[0], self._open_ended[0])
+        if cols:
+            for values in iter_values(self.sheet, min_row + start - 1, min_col, max_row, min_col):
+                yield values[0]
+        elif min_col + start - 1 <= max_col:
+            yield from next(iter_values(self.sheet, min_row, min_col + start - 1, min_row, max_col))
+
+    def write_rows(self, rows, row=1, column=1):
+        """Write a 2-D iterable, generator or buffer of rows starting at the 1-based row and column of the range.
+
+        Values are placed by offset without a proxy for every cell. Rows past the end of the range grow the sheet.
+
+        Returns:
+            count (int): Number of rows written.
+        """
+        min_row, min_col, _, _ = get_bounds(self.sheet, self._areas[0])
+        return write_rows(self.sheet, rows, min_row + row - 1, min_col + column - 1)
+
+    def fill_values(self, values):
+        """Fill the cells of the range one row after another with the flattened values (see encode_value).
+
+        Multiple areas are filled in order like the Excel Cells collection.
+
+        Returns:
+            count (int): Number of values written.
+        """
+        flat = (value for obj in values for value in (obj if is_iterable(obj) else (obj,)))
+        count = 0
+        for area in self._areas:
+            bounds = get_bounds(self.sheet, area)
+            size = (bounds[2] - bounds[0] + 1) * (bounds[3] - bounds[1] + 1)
+            written = fill_values(self.sheet, islice(flat, size), *bounds)
+            count += written
+            if written < size:
+                break
+        return count
+
 
 class AreasCollection:
     Borders = mock_borders()
@@ -198,8 +605,13 @@ class AreasCollection:
 
     def __iter__(self):
         """Iterate over areas, returning Range-like objects."""
-        for area in self.parent._areas:
-            yield RangeObject(self.parent.sheet, area)
+        for area, open_ended in zip(self.parent._areas, self.parent._open_ended):
+            yield RangeObject(self.parent.sheet, area, (open_ended,))
+
+    def __call__(self, index):
+        """Return the area for the 1-based index."""
+        parent = self.parent
+        return RangeObject(parent.sheet, parent._areas[index-1], (parent._open_ended[index-1],))
 
 
 class Sheet:
@@ -228,16 +640,166 @@ class Sheet:
         """Mimic Excel's Range property: access a range like 'A1:B2' with value setting."""
         return RangeObject(self.sheet, range_str)
 
+    def plan_range(self, plan):
+        """Return the Range for the ItemPlan of a field. Open ended Column and Row areas are clipped to the used range
+        when they are read.
+        """
+        return RangeObject(self.sheet, plan.range_str, plan.open_ended)
+
+    def write_rows(self, rows, row=1, column=1):
+        """Write a 2-D iterable, generator or buffer of rows starting at the given row and column (1-based).
+
+        Values are placed by offset without a proxy for every cell and the sheet grows with the data.
+
+        Returns:
+            count (int): Number of rows written.
+        """
+        return write_rows(self.sheet, rows, row, column)
+
+
+class BufferedCell:
+    """Cell handle for a RowBuffer. Values are stored in the buffer until the row is streamed."""
+    __slots__ = ('buffer', 'row', 'column')
+
+    def __init__(self, buffer, row, column):
+        self.buffer = buffer
+        self.row = row
+        self.column = column
+
+    @property
+    def value(self):
+        return self.buffer.get_value(self.row, self.column)
+
+    @value.setter
+    def value(self, value):
+        self.buffer.set_value(self.row, self.column, value)
+
+
+class RowBuffer:
+    """Worksheet-like buffer that streams rows in order to an openpyxl write only worksheet.
 
-class Workbook(object):
+    Values are kept in a {row: {column: value}} buffer. Once more than buffer_size rows are pending, the lowest rows
+    are appended to the write only worksheet. Missing rows are written as empty rows. Rows that were already written
+    cannot be changed and read back as None.
+
+    Args:
+        sheet (WriteOnlyWorksheet): openpyxl write only worksheet to stream the rows to.
+        buffer_size (int)[1000]: Maximum number of rows to keep in memory.
+    """
+    def __init__(self, sheet, buffer_size=1000):
+        self.sheet = sheet
+        self.buffer_size = buffer_size
+        self.pending = {}
+        self.next_row = 1  # Next row index to stream
+        self.max_row = 0
+        self.max_column = 0
+
+    @property
+    def parent(self):
+        return self.sheet.parent
+
+    @property
+    def title(self):
+        return self.sheet.title
+
+    @property
+    def rows(self):
+        return self.iter_rows()
+
+    def get_value(self, row, column):
+        """Return the buffered value or None if it was not set or was already written."""
+        return self.pending.get(row, {}).get(column, None)
+
+    def set_value(self, row, column, value):
+        """Buffer a value and stream the lowest rows if the buffer is full."""
+        if row < self.next_row:
+            raise ValueError('Row {} was already written! Write only tables must be written in row order.'.format(row))
+
+        self.pending.setdefault(row, {})[column] = value
+        self.max_row = max(self.max_row, row)
+        self.max_column = max(self.max_column, column)
+        if len(self.pending) > self.buffer_size:
+            self.flush(self.buffer_size // 2)
+
+    def flush(self, keep=0):
+        """Stream the lowest pending rows to the worksheet until only keep rows are left in the buffer."""
+        count = len(self.pending) - keep
+        if count <= 0:
+            return
+
+        for row in sorted(self.pending)[:count]:
+            for _ in range(self.next_row, row):
+                self.sheet.append(())  # Fill missing rows
+
+            values = self.pending.pop(row)
+            line = [None] * max(values)
+            for column, value in values.items():
+                line[column-1] = value
+            self.sheet.append(line)
+            self.next_row = row + 1
+
+    def cell(self, row, column, value=None):
+        cell = BufferedCell(self, row, column)
+        if value is not None:
+            cell.value = value
+        return cell
+
+    def iter_rows(self, min_row=None, max_row=None, min_col=None, max_col=None, values_only=False):
+        min_row = min_row or self.next_row
+        min_col = min_col or 1
+        max_row = max_row or self.max_row
+        max_col = max_col or self.max_column
+        for row in range(min_row, max_row + 1):
+            cells = (BufferedCell(self, row, column) for column in range(min_col, max_col + 1))
+            if values_only:
+                yield tuple(cell.value for cell in cells)
+            else:
+                yield tuple(cells)
+
+    def __getitem__(self, key):
+        min_row, min_col, max_row, max_col = get_bounds(self, key)
+        rows = tuple(self.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col))
+        return shape_rows(key, rows)
+
+
+class Workbook(object, metaclass=FieldsMeta):
     METHOD_SETTER_ERROR = 'Cannot set property '
     SAVE_ON_CLOSE = False
-
-    def __init__(self, filename=None, *args, xl=None, wb=None, **xl_settings):
+    WRITE_ONLY_BUFFER = 1000  # Number of rows a write only workbook keeps in memory for each sheet
+    ACTIVATE_SHEETS = True  # Make the sheet active every time a field gets the sheet
+    CACHE_CONSTANTS = True  # Encode the constants once per class and copy the cell values to every new instance
+    CACHE_VALUES = False  # Cache the decoded value of fields that do not set cache (see Item.get_cached_value)
+    CSV_INFER_TYPES = True  # Convert CSV numbers, booleans and dates to the column types inferred from the first rows
+    CSV_STRICT_TYPES = False  # Raise a ValueError for a CSV value that does not match the inferred column type
+    CSV_DIALECT = 'excel'  # csv dialect used to open and save CSV files. 'sniff' detects the dialect when opening
+    CSV_ENCODING = 'utf-8'  # Encoding used to open and save CSV files
+    CSV_SAMPLE_SIZE = CSV_SAMPLE_SIZE  # Number of CSV rows used to infer the column types
+    CSV_BACKEND = 'openpyxl'  # Open CSV files as an 'openpyxl' workbook, array backed 'grid' sheets or 'mmap' sheets
+    CSV_SKIP_UNUSED_SHEETS = False  # Do not load the CSV sheets no field uses. The workbook cannot be saved.
+    FAST_SAVE = True  # Write .xlsx files of new value only workbooks directly. Opened Excel files use openpyxl.
+    XLSX_FIELDS_ONLY = False  # Only parse the Excel cells the fields use (see xlsx_to_grid). Cannot be saved.
+    __fields__ = FieldRegistry()  # Fields collected across the MRO (see collect_fields)
+
+    def __init_subclass__(cls, **kwargs):
+        """Collect the fields across the MRO when the Table class is defined (see FieldsMeta for later changes)."""
+        super().__init_subclass__(**kwargs)
+        cls.__fields__ = collect_fields(cls)
+
+    def __init__(self, filename=None, *args, xl=None, wb=None, read_only=False, write_only=False, **xl_settings):
         # Variables
         self._xl = xl
         self._wb = wb
         self._filename = None  # Save the filename as a variable
+        self.read_only = read_only  # Stream field reads and never load every cell object
+        self.write_only = write_only  # Stream rows to a new workbook in row order
+        self._sheet_wrappers = {}  # {worksheet: Sheet}
+        self._sheet_cache = {}  # {index or name: (position in wb._sheets, worksheet, Sheet)}
+        self._field_handles = {}  # {field: (ItemPlan, sheet key, item)} see Item.get_item
+        self._batch = None  # Active Batch that buffers field assignments
+        self._value_cache = {}  # {field: (ItemPlan, sheet key, write version, value)} see Item.get_cached_value
+        self._saved = (None, ())  # (filename, sheet names) of the file the workbook was last opened from or saved to
+        self._skipped_sheets = []  # Titles of the sheets that were not completely loaded (see CSV_SKIP_UNUSED_SHEETS)
+        self._loaded_excel = False  # The workbook was loaded from an Excel file, so it is never fast saved
 
         # Initialize Excel
         if self._xl is None:
@@ -246,8 +808,9 @@ class Workbook(object):
         # Set the filename
         self.set_filename(filename)
 
-        # Check to open the filename
-        if isinstance(self.filename, str) and os.path.exists(self.filename) and os.path.isfile(self.filename):
+        # Check to open the filename (write only workbooks always create a new file)
+        if not self.write_only and isinstance(self.filename, str) and os.path.exists(self.filename) and \
+                os.path.isfile(self.filename):
             self.open(filename)
 
         # Initialize constants
@@ -255,9 +818,58 @@ class Workbook(object):
 
     def init_constants(self):
         """Set all of the constant values."""
-        for k, field in self.__class__.__dict__.items():
-            if isinstance(field, ConstantItem):
-                field.init_table(self)
+        if self.wb.read_only:
+            return  # Read only workbooks cannot be written
+
+        constants = self.__fields__.constants
+        if self.CACHE_CONSTANTS:
+            # Constants that only set values are copied from a template that is rendered once per class
+            cached = tuple(field for field in constants if self.can_cache_constant(field))
+            if cached:
+                for field, cells in self.get_constant_template(cached):
+                    sheet = self.get_sheet(field.sheet).sheet
+                    set_value = get_setter(sheet)
+                    record_write(sheet, (None, None, None, None))
+                    for (row, column), value in cells:
+                        set_value(row, column, value)
+                constants = tuple(field for field in constants if field not in cached)
+
+        for field in constants:
+            field.init_table(self)
+
+    @staticmethod
+    def can_cache_constant(field):
+        """Return if the constant only sets values, so the values can be copied from a template."""
+        return field.encode is encode_value and type(field).init_table is ConstantItem.init_table
+
+    def get_constant_template(self, constants):
+        """Return the ((field, ((row, column), value)), ...) cell values each constant sets on its sheet.
+
+        Every constant is rendered into its own new workbook of a copy of this table the first time and again if a
+        constant value, range or sheet changes. The cells are kept per field, so the field sheet is resolved against
+        this workbook. The signature keeps a copy of the values, so values that are changed in place are found as well.
+        """
+        cls = self.__class__
+        signature = tuple((field, field.plan, snapshot_value(field.value)) for field in constants)
+        try:
+            cached_signature, template = CONSTANT_TEMPLATES[cls]
+            if cached_signature == signature:
+                return template
+        except (KeyError, ValueError, TypeError):
+            pass
+
+        # Render the constants into new workbooks of a copy, so the state of this workbook is never changed
+        scratch = copy.copy(self)
+        template = []
+        for field in constants:
+            scratch.wb = openpyxl.Workbook()
+            field.init_table(scratch)
+            cells = scratch.get_sheet(field.sheet).sheet._cells
+            template.append((field, tuple(sorted((pos, cell.value) for pos, cell in cells.items()))))
+        template = tuple(template)
+
+        CONSTANT_TEMPLATES[cls] = (signature, template)
+        return template
 
     @property
     def xl(self):
@@ -275,13 +887,20 @@ class Workbook(object):
     def wb(self):
         """Get (or Add) a Workbook to the Excel Application Workbooks collection."""
         if self._wb is None:
-            self._wb = openpyxl.Workbook()
+            self._wb = openpyxl.Workbook(write_only=self.write_only)
         return self._wb
 
     @wb.setter
     def wb(self, value):
         """Set the Workbook object."""
         self._wb = value
+        self._sheet_wrappers = {}
+        self._sheet_cache = {}
+        self._field_handles = {}
+        self._value_cache = {}
+        self._saved = (None, ())
+        self._skipped_sheets = []
+        self._loaded_excel = False
 
     def get_filename(self):
         """Return the filename."""
@@ -301,49 +920,269 @@ class Workbook(object):
 
     VALID_FMT = [".xlsx", ".xlsm", ".xltx", ".xltm"]
 
-    def open(self, filename=None):
-        """Open a workbook with the given filename and use this workbook."""
+    def open(self, filename=None, read_only=None):
+        """Open a workbook with the given filename and use this workbook.
+
+        Args:
+            filename (str)[None]: Filename to open. If None use the set filename.
+            read_only (bool)[None]: Open an Excel file in streaming read only mode. If None use the read_only attribute.
+        """
         if filename is not None:
             self.set_filename(filename)
+        if read_only is not None:
+            self.read_only = read_only
 
         filename = self.get_filename()
         if isinstance(filename, str) and os.path.exists(filename) and os.path.isfile(filename):
+            self.Close()
+            self._sheet_wrappers = {}
+            self._sheet_cache = {}
+            self._field_handles = {}
+            self._value_cache = {}
+            self._skipped_sheets = []
+            self._loaded_excel = False
             if os.path.splitext(filename.lower())[-1] in self.VALID_FMT:
-                self._wb = openpyxl.load_workbook(filename)
+                if self.XLSX_FIELDS_ONLY:
+                    self._wb = xlsx_to_grid(filename, self.get_used_ranges(), skipped=self._skipped_sheets)
+                else:
+                    self._wb = openpyxl.load_workbook(filename, read_only=self.read_only)
+                    self._loaded_excel = True
             else:
-                self._wb = csv_to_openpyxl(filename)
+                load = CSV_LOADERS[self.CSV_BACKEND]
+                sheets = self.get_used_sheets() if self.CSV_SKIP_UNUSED_SHEETS else None
+                self._wb = load(filename, infer_types=self.CSV_INFER_TYPES, strict=self.CSV_STRICT_TYPES,
+                                dialect=self.CSV_DIALECT, encoding=self.CSV_ENCODING, sample_size=self.CSV_SAMPLE_SIZE,
+                                sheets=sheets, skipped=self._skipped_sheets)
+            self.clear_changes(filename)
         return self
-    
-    def save(self, filename=None):
-        """Save the given filename or set filename."""
+
+    def get_used_sheets(self):
+        """Return the set of sheet names and 1-based indexes the fields use or None if every sheet may be used."""
+        sheets = set()
+        for field in self.__fields__.values():
+            sheet = getattr(field, 'sheet', None)
+            if isinstance(sheet, str) or (isinstance(sheet, int) and sheet > 0):
+                sheets.add(sheet)
+            elif sheet is not None:
+                return None
+        return sheets
+
+    def get_used_ranges(self):
+        """Return the {sheet: [(min_row, min_col, max_row, max_col)] or None} boxes the fields use.
+
+        Open ended bounds are None. Fields without a range (like named ranges) use the whole sheet (None).
+        """
+        ranges = {}
+        for field in self.__fields__.values():
+            sheet = getattr(field, 'sheet', None)
+            if sheet is None or isinstance(field, BuiltinDocumentPropertyItem):
+                continue
+
+            plan = field.plan if isinstance(field, Item) else None
+            if plan is None or len(plan.bounds) == 0 or any(box == (None, None, None, None) for box in plan.bounds):
+                ranges[sheet] = None
+            elif ranges.setdefault(sheet, []) is not None:
+                # Open ended Column and Row areas read every used cell in that direction
+                ranges[sheet].extend((r0, c0, None if rows else r1, None if cols else c1)
+                                     for (r0, c0, r1, c1), (rows, cols) in zip(plan.bounds, plan.open_ended))
+        return ranges
+
+    def save(self, filename=None, skip_unchanged=False):
+        """Save the given filename or set filename.
+
+        Args:
+            filename (str)[None]: Filename to save to. If None use the set filename.
+            skip_unchanged (bool)[False]: Do nothing when saving to the file the workbook was last opened from or saved
+                to and no cells were changed through this library (see is_dirty). Styles and changes made directly to
+                the openpyxl workbook are not tracked, so only use this if every change goes through the fields.
+        """
         if filename is not None:
             self.set_filename(filename)
 
         filename = self.get_filename()
+        if self._skipped_sheets:
+            raise ValueError('Cannot save a workbook that was opened without every cell of the sheets {}!'.format(
+                ', '.join(self._skipped_sheets)))
+        if self._batch is not None:
+            self._batch.apply()
+        if skip_unchanged and not self.wb.write_only and not self.is_dirty() and filename == self._saved[0] and \
+                os.path.exists(filename):
+            return
+
+        if self.wb.write_only:
+            # Stream the remaining buffered rows. Write only workbooks can only be saved once.
+            if os.path.splitext(filename.lower())[-1] not in self.VALID_FMT:
+                raise ValueError('Write only workbooks can only be saved as {}!'.format(', '.join(self.VALID_FMT)))
+            for wrapper in self._sheet_wrappers.values():
+                wrapper.sheet.flush()
 
         # Saving as CSV or non excel type renames the active sheet to the base filename.
         if os.path.splitext(filename.lower())[-1] in self.VALID_FMT:
-            self.wb.save(filename)
+            if self.FAST_SAVE and not self._loaded_excel:
+                save_workbook(self.wb, filename)
+            else:
+                self.wb.save(filename)
+        elif isinstance(self.wb, MmapWorkbook) and self.wb.is_mapped(filename):
+            # The map is closed before the file is replaced and the new file is mapped again
+            openpyxl_to_csv(filename, self.wb, dialect=self.CSV_DIALECT, encoding=self.CSV_ENCODING,
+                            release=self.wb.close)
+            self.open(filename)
         else:
-            openpyxl_to_csv(filename, self.wb)
+            openpyxl_to_csv(filename, self.wb, dialect=self.CSV_DIALECT, encoding=self.CSV_ENCODING)
+        self.clear_changes(filename)
+
+    def changes(self):
+        """Iterate over the (sheet name, row, column, value) of every cell that was changed through this library
+        since the workbook was opened or saved, in sheet and row order.
+        """
+        for ws in self.wb.worksheets:
+            for row, column in sorted(CHANGES.get(ws, ())):
+                yield ws.title, row, column, get_value(ws, row, column)
+
+    def is_dirty(self):
+        """Return if cells were changed or sheets were added, renamed or removed since the last open or save."""
+        if tuple(self.wb.sheetnames) != self._saved[1]:
+            return True
+        return any(CHANGES.get(ws, None) for ws in self.wb.worksheets)
+
+    def clear_changes(self, filename=None):
+        """Forget the changes. The workbook is now the same as the given file."""
+        for ws in self.wb.worksheets:
+            CHANGES.pop(ws, None)
+        self._saved = (filename, tuple(self.wb.sheetnames))
+
+    def Close(self, *args, **kwargs):
+        """Close the file handle that a read only or memory-mapped workbook keeps open."""
+        if self._wb is not None and (self._wb.read_only or isinstance(self._wb, MmapWorkbook)):
+            self._wb.close()
 
     def get_sheet(self, sheet, create=True):
-        """Return the sheet for an index or name."""
+        """Return the sheet for an index or name.
+
+        Sheets are cached by index and name. A cached sheet is checked against its position in the workbook, so sheets
+        that were created, renamed or removed are looked up again.
+        """
+        wb = self.wb
+        try:
+            pos, obj, wrapper = self._sheet_cache[sheet]
+            if wb._sheets[pos] is obj and (not isinstance(sheet, str) or obj.title == sheet):
+                if self.ACTIVATE_SHEETS:
+                    wb.active = pos
+                return wrapper
+        except (KeyError, IndexError):
+            pass
+
         try:
             if isinstance(sheet, int):
-                obj = self.wb.worksheets[sheet-1]  # Get the sheet
+                obj = wb.worksheets[sheet-1]  # Get the sheet
             else:
-                obj = self.wb[sheet]  # Get the sheet
-            self.wb.active = self.wb.worksheets.index(obj)
+                obj = wb[sheet]  # Get the sheet
         except (ValueError, TypeError, Exception):
-            if create:
-                if isinstance(sheet, int):
-                    sheet = f"Sheet{sheet}"
-                obj = self.wb.create_sheet(sheet)  # Create the sheet
-                self.wb.active = obj
+            if not create:
+                self._sheet_cache.pop(sheet, None)
+                return None
+
+            name = sheet
+            if isinstance(sheet, int):
+                name = f"Sheet{sheet}"
+            obj = wb.create_sheet(name)  # Create the sheet
+
+        pos = wb._sheets.index(obj)
+        if self.ACTIVATE_SHEETS or wb.active is None:
+            wb.active = pos
+        wrapper = self.wrap_sheet(obj)
+        self._sheet_cache[sheet] = (pos, obj, wrapper)
+        return wrapper
+
+    def get_sheet_key(self, sheet):
+        """Return a key that stays the same while the sheet index or name refers to the same sheet.
+
+        Field caches are kept by this key (see Item.get_item). The cached Sheet wrapper is the key.
+        """
+        return self.get_sheet(sheet)
+
+    def read_areas(self, sheet, areas, open_ended=None):
+        """Return the value of every A1 area string in the sheet in the shape Range.Value returns, reading the sheet
+        once. Open ended rows and columns (see ItemPlan) are clipped to the used range.
+        """
+        obj = self.get_sheet(sheet).sheet
+        open_ended = open_ended or [None] * len(areas)
+        blocks = read_blocks(obj, [get_bounds(obj, area, flags) for area, flags in zip(areas, open_ended)])
+        return [shape_rows(area, rows) for area, rows in zip(areas, blocks)]
+
+    def read_all(self):
+        """Return a {name: value} dictionary for every field reading each sheet once."""
+        return read_fields(self, self.read_areas)
+
+    def snapshot(self):
+        """Return a frozen namedtuple record with the value of every field reading each sheet once."""
+        values = self.read_all()
+        return self.__fields__.record(*(values.get(name, None) for name in self.__fields__))
+
+    def to_dataframe(self, range_field, header_field=None):
+        """Return a pandas DataFrame for a range field (see fields.to_dataframe). pandas is imported when used."""
+        return to_dataframe(self, range_field, header_field=header_field)
+
+    def from_dataframe(self, df, range_field, header_field=None):
+        """Write a pandas DataFrame to a range field (see fields.from_dataframe)."""
+        from_dataframe(self, df, range_field, header_field=header_field)
+
+    def to_record_batches(self, range_field, header_field=None, batch_size=65536):
+        """Yield pyarrow RecordBatches for a range field (see fields.iter_field_batches). pyarrow is imported when used.
+        """
+        return iter_field_batches(self, range_field, header_field=header_field, batch_size=batch_size)
+
+    def export(self, filename, range_field, header_field=None, batch_size=65536, file_format=None):
+        """Export a range field to a Parquet or Arrow IPC file streaming the rows (see fields.export_tables).
+
+        Returns:
+            count (int): Number of rows written.
+        """
+        return export_tables(filename, self, range_field, header_field=header_field, batch_size=batch_size,
+                             file_format=file_format)
+
+    def batch(self):
+        """Return a context manager that buffers field assignments and writes them as blocks on exit.
+
+        Example:
+            with tbl.batch():
+                tbl.name = 'John'
+                tbl.age = 30
+        """
+        batch = getattr(self, '_batch', None)
+        if batch is None:
+            batch = Batch(self)
+        return batch
+
+    def get_write_version(self, sheet):
+        """Return the position in the write log of the sheet (see record_write)."""
+        return get_write_version(self.get_sheet(sheet).sheet)
+
+    def was_written(self, sheet, bounds, version):
+        """Return if the library wrote to the bounds of the sheet after the write version."""
+        return was_written(self.get_sheet(sheet).sheet, bounds, version)
+
+    def clear_value_cache(self):
+        """Remove every cached field value."""
+        self._value_cache = {}
+
+    def get_active_sheet(self):
+        """Return the Sheet for the active worksheet."""
+        obj = self.wb.active
+        if obj is None:
+            return self.get_sheet(1)
+        return self.get_sheet(obj.title)
+
+    def wrap_sheet(self, obj):
+        """Return the cached Sheet for an openpyxl worksheet. Write only worksheets are wrapped with a RowBuffer."""
+        wrapper = self._sheet_wrappers.get(obj, None)
+        if wrapper is None:
+            if self.wb.write_only:
+                wrapper = Sheet(RowBuffer(obj, self.WRITE_ONLY_BUFFER))
             else:
-                obj = None
-        return Sheet(obj)
+                wrapper = Sheet(obj)
+            self._sheet_wrappers[obj] = wrapper
+        return wrapper
 
     def has_sheet(self, sheet):
         """Return if the given sheet name or index exists"""
@@ -351,19 +1190,19 @@ class Workbook(object):
     
     @property
     def Cells(self):
-        return Sheet(self.wb.active).Cells
+        return self.get_active_sheet().Cells
     
     @property
     def Columns(self):
-        return Sheet(self.wb.active).Columns
+        return self.get_active_sheet().Columns
     
     @property
     def Rows(self):
-        return Sheet(self.wb.active).Rows
+        return self.get_active_sheet().Rows
     
     @property
     def Range(self):
-        return Sheet(self.wb.active).Range
+        return self.get_active_sheet().Range
     
     # ===== Workbook Object Methods =====
     AcceptAllChanges = fake_proxy_method()
@@ -376,7 +1215,6 @@ class Workbook(object):
     ChangeLink = fake_proxy_method()
     CheckIn = fake_proxy_method()
     CheckInWithVersion = fake_proxy_method()
-    Close = fake_proxy_method()
     ConvertComments = fake_proxy_method()
     CreateForecastSheet = fake_proxy_method()
     DeleteNumberFormat = fake_proxy_method()
@@ -0,0 +1,327 @@
+"""Streaming xlsx reader that only parses the cells a Table uses.
+
+The xlsx zip is opened directly. Only the worksheet parts of the requested sheets are parsed with iterparse, rows
+outside of the requested boxes are skipped and a sheet stops being parsed after the last requested row. Shared strings
+and styles are only parsed when a cell needs them.
+"""
+import posixpath
+import zipfile
+from math import inf
+
+from openpyxl.xml.functions import fromstring, iterparse
+from openpyxl.xml.constants import SHEET_MAIN_NS, REL_NS, PKG_REL_NS
+from openpyxl.cell.text import Text
+from openpyxl.formula.translate import Translator
+from openpyxl.styles.stylesheet import Stylesheet
+from openpyxl.utils import coordinate_to_tuple
+from openpyxl.utils.datetime import from_excel, from_ISO8601, WINDOWS_EPOCH, CALENDAR_MAC_1904
+from openpyxl.worksheet.formula import ArrayFormula
+
+from .grid import GridWorkbook
+
+
+__all__ = ['SharedStrings', 'XlsxReader', 'xlsx_to_grid']
+
+
+SHEET_DATA_TAG = '{%s}sheetData' % SHEET_MAIN_NS
+ROW_TAG = '{%s}row' % SHEET_MAIN_NS
+CELL_TAG = '{%s}c' % SHEET_MAIN_NS
+VALUE_TAG = '{%s}v' % SHEET_MAIN_NS
+FORMULA_TAG = '{%s}f' % SHEET_MAIN_NS
+INLINE_STRING_TAG = '{%s}is' % SHEET_MAIN_NS
+SHARED_STRING_TAG = '{%s}si' % SHEET_MAIN_NS
+SHEET_TAG = '{%s}sheets/{%s}sheet' % (SHEET_MAIN_NS, SHEET_MAIN_NS)
+WORKBOOK_PR_TAG = '{%s}workbookPr' % SHEET_MAIN_NS
+RELATIONSHIP_TAG = '{%s}Relationship' % PKG_REL_NS
+OFFICE_DOCUMENT_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+STYLES_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles'
+SHARED_STRINGS_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings'
+
+
+def cast_number(value):
+    """Convert a number string to an int or float like openpyxl."""
+    if '.' in value or 'E' in value or 'e' in value:
+        return float(value)
+    return int(value)
+
+
+def get_row_limit(boxes):
+    """Return the last row the (min_row, min_col, max_row, max_col) boxes use. None bounds are open ended."""
+    if boxes is None:
+        return inf
+    return max((inf if box[2] is None else box[2] for box in boxes), default=0)
+
+
+def contains(box, row, column):
+    """Return if the (min_row, min_col, max_row, max_col) box contains the cell. None bounds are open ended."""
+    min_row, min_col, max_row, max_col = box
+    return (min_row is None or min_row <= row) and (max_row is None or row <= max_row) and \
+        (min_col is None or min_col <= column) and (max_col is None or column <= max_col)
+
+
+class SharedStrings(object):
+    """Shared string table that is only parsed up to the highest index that was used.
+
+    Args:
+        archive (zipfile.ZipFile): Open xlsx file.
+        part (str)[None]: Name of the shared strings part. If None there are no shared strings.
+    """
+    def __init__(self, archive, part=None):
+        self.archive = archive
+        self.part = part
+        self.strings = []
+        self._source = None
+        self._items = None
+
+    def __getitem__(self, index):
+        strings = self.strings
+        if index >= len(strings) and self.part is not None:
+            if self._items is None:
+                self._source = self.archive.open(self.part)
+                self._items = iterparse(self._source, events=('end',))
+            for _, element in self._items:
+                if element.tag == SHARED_STRING_TAG:
+                    strings.append(Text.from_tree(element).content.replace('x005F_', ''))  # Like openpyxl
+                    element.clear()
+                    if len(strings) > index:
+                        break
+            else:
+                self.close()
+        return strings[index]
+
+    def close(self):
+        if self._source is not None:
+            self._source.close()
+        self._source = self._items = None
+        self.part = None
+
+
+class XlsxReader(object):
+    """Read the values of requested cells from an xlsx file without loading the workbook.
+
+    Args:
+        filename (str/file): xlsx file to read.
+    """
+    def __init__(self, filename):
+        self.archive = zipfile.ZipFile(filename, 'r')
+        try:
+            self.workbook_part = self.get_workbook_part()
+            rels = self.read_rels(self.workbook_part)
+
+            root = fromstring(self.archive.read(self.workbook_part))
+            properties = root.find(WORKBOOK_PR_TAG)
+            date1904 = properties is not None and properties.get('date1904', '').lower() in ('1', 'true')
+            self.epoch = CALENDAR_MAC_1904 if date1904 else WINDOWS_EPOCH
+            self.sheets = [(sheet.get('name'), rels[sheet.get('{%s}id' % REL_NS)][1])
+                           for sheet in root.iterfind(SHEET_TAG) if sheet.get('{%s}id' % REL_NS) in rels]
+
+            parts = {rel_type: target for rel_type, target in rels.values()}
+            self.shared_strings = SharedStrings(self.archive, parts.get(SHARED_STRINGS_TYPE, None))
+            self.styles_part = parts.get(STYLES_TYPE, None)
+            self._date_styles = None
+        except BaseException:
+            self.archive.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.shared_strings.close()
+        self.archive.close()
+
+    @property
+    def sheetnames(self):
+        return [name for name, _ in self.sheets]
+
+    def get_workbook_part(self):
+        """Return the name of the workbook part from the package relationships."""
+        for rel_type, target in self.read_rels('').values():
+            if rel_type == OFFICE_DOCUMENT_TYPE:
+                return target
+        return 'xl/workbook.xml'
+
+    def read_rels(self, part):
+        """Return the {id: (type, part name)} relationships of a part."""
+        folder, name = posixpath.split(part)
+        try:
+            root = fromstring(self.archive.read(posixpath.join(folder, '_rels', name + '.rels')))
+        except KeyError:
+            return {}
+
+        rels = {}
+        for rel in root.iter(RELATIONSHIP_TAG):
+            target = rel.get('Target')
+            if rel.get('TargetMode') == 'External':
+                continue
+            elif target.startswith('/'):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(folder, target))
+            rels[rel.get('Id')] = (rel.get('Type'), target)
+        return rels
+
+    def get_date_styles(self):
+        """Return the (date styles, timedelta styles) sets of cell style ids. The styles are parsed once."""
+        if self._date_styles is None:
+            if self.styles_part is None:
+                self._date_styles = (set(), set())
+            else:
+                stylesheet = Stylesheet.from_tree(fromstring(self.archive.read(self.styles_part)))
+                self._date_styles = (stylesheet.date_formats, stylesheet.timedelta_formats)
+        return self._date_styles
+
+    def get_sheet_part(self, sheet):
+        """Return the (title, part name) for a sheet name or 1-based index."""
+        if isinstance(sheet, int):
+            return self.sheets[sheet - 1]
+        for title, part in self.sheets:
+            if title == sheet:
+                return title, part
+        raise KeyError('Worksheet {} does not exist.'.format(sheet))
+
+    def iter_cells(self, sheet, boxes=None):
+        """Yield the (row, column, value) of every cell with a value in the boxes of the sheet.
+
+        Values are converted like openpyxl reads them (formulas are strings that start with '=').
+
+        Args:
+            sheet (int/str): Sheet name or 1-based index.
+            boxes (list)[None]: (min_row, min_col, max_row, max_col) boxes to read. None bounds are open ended. If
+                None read every cell.
+        """
+        part = self.get_sheet_part(sheet)[1]
+        last_row = get_row_limit(boxes)
+        if last_row < 1:
+            return
+
+        shared_strings = self.shared_strings
+        shared_formulas = {}
+        row = 0
+        column = 0
+        wanted = boxes  # Boxes that contain the current row
+        with self.archive.open(part) as source:
+            sheet_data = None  # Parent of the rows that are cleared after they are parsed
+            for event, element in iterparse(source, events=('start', 'end')):
+                tag = element.tag
+                if event == 'start':
+                    if tag == ROW_TAG:
+                        r = element.get('r')
+                        row = int(r) if r else row + 1
+                        column = 0
+                        if row > last_row:
+                            break  # Past the last requested row
+                        if boxes is not None:
+                            wanted = [box for box in boxes if (box[0] is None or box[0] <= row) and
+                                      (box[2] is None or row <= box[2])]
+                    elif sheet_data is None and tag == SHEET_DATA_TAG:
+                        sheet_data = element
+                    continue
+
+                elif tag == ROW_TAG:
+                    if sheet_data is not None:
+                        sheet_data.clear()  # Keep the memory flat
+                    continue
+
+                elif tag != CELL_TAG:
+                    continue
+
+                # Shared formulas are kept for the cells that come after them
+                coordinate = element.get('r')
+                formula = element.find(FORMULA_TAG)
+                if formula is not None and formula.get('t') == 'shared' and formula.text:
+                    shared_formulas.setdefault(formula.get('si'), Translator('=' + formula.text, coordinate))
+
+                if wanted is not None and not wanted:
+                    continue  # The row is not requested
+                elif coordinate:
+                    row, column = coordinate_to_tuple(coordinate)
+                else:
+                    column += 1
+
+                if wanted is None or any(contains(box, row, column) for box in wanted):
+                    value = self.parse_cell(element, formula, shared_strings, shared_formulas)
+                    if value is not None:
+                        yield row, column, value
+
+    def parse_cell(self, element, formula, shared_strings, shared_formulas):
+        """Return the value of a <c> element."""
+        if formula is not None:
+            formula_type = formula.get('t')
+            value = '=' + (formula.text or '')
+            if formula_type == 'array':
+                return ArrayFormula(ref=formula.get('ref'), text=value)
+            elif formula_type == 'shared' and formula.text is None:
+                translator = shared_formulas.get(formula.get('si'), None)
+                if translator is not None:
+                    return translator.translate_formula(element.get('r'))
+            return value
+
+        data_type = element.get('t', 'n')
+        if data_type == 'inlineStr':
+            child = element.find(INLINE_STRING_TAG)
+            return None if child is None else Text.from_tree(child).content
+
+        value = element.findtext(VALUE_TAG, None) or None
+        if value is None:
+            return None
+        elif data_type == 'n':
+            value = cast_number(value)
+            style = element.get('s')
+            if style:
+                date_styles, timedelta_styles = self.get_date_styles()
+                style = int(style)
+                if style in date_styles:
+                    try:
+                        value = from_excel(value, self.epoch, timedelta=style in timedelta_styles)
+                    except (OverflowError, ValueError):
+                        value = '#VALUE!'
+            return value
+        elif data_type == 's':
+            return shared_strings[int(value)]
+        elif data_type == 'b':
+            return bool(int(value))
+        elif data_type == 'd':
+            return from_ISO8601(value)
+        return value  # str and e
+
+
+def xlsx_to_grid(filename, ranges=None, skipped=None):
+    """Load the cells of an xlsx file into a new GridWorkbook only parsing the requested sheets and boxes.
+
+    Every sheet of the file is created, so sheet indexes keep their positions.
+
+    Args:
+        filename (str/file): xlsx file to read.
+        ranges (dict)[None]: {sheet name or 1-based index: [(min_row, min_col, max_row, max_col)] or None} boxes to
+            read. None bounds are open ended and None reads the whole sheet. If None read every sheet.
+        skipped (list)[None]: List that gets the title of every sheet that was not completely read.
+
+    Returns:
+        GridWorkbook
+    """
+    wb = GridWorkbook()
+    with XlsxReader(filename) as reader:
+        for index, title in enumerate(reader.sheetnames, 1):
+            ws = wb.create_sheet(title)
+            if ranges is None:
+                boxes = None
+            elif title in ranges or index in ranges:
+                boxes = [box for key in (title, index) if key in ranges for box in (ranges[key] or [None])]
+                boxes = None if None in boxes else boxes
+            else:
+                boxes = []
+
+            set_value = ws.set_value
+            for row, column, value in reader.iter_cells(index, boxes):
+                set_value(row, column, value)
+            if boxes is not None and skipped is not None:
+                skipped.append(title)
+            ws.compact()
+
+    if len(wb.worksheets) == 0:
+        wb.create_sheet('Sheet1')
+    return wb
@@ -0,0 +1,366 @@
+"""Direct xlsx writer for workbooks that only have values and number formats.
+
+The worksheet parts are written row by row to the zip stream, strings are collected into one shared string table and
+the styles part only has the number formats the cells use. Workbooks with any other feature (merged cells, fonts,
+charts, ...) are saved with the openpyxl serializer.
+"""
+import os
+import math
+import zipfile
+import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape, quoteattr
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE, ERROR_CODES
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.datetime import to_excel, WINDOWS_EPOCH
+from openpyxl.utils.exceptions import IllegalCharacterError
+from openpyxl.styles.numbers import BUILTIN_FORMATS_REVERSE, FORMAT_GENERAL, FORMAT_DATE_DATETIME, \
+    FORMAT_DATE_YYYYMMDD2, FORMAT_DATE_TIME6, FORMAT_DATE_TIMEDELTA
+from openpyxl.workbook.properties import CalcProperties
+from openpyxl.workbook.views import BookView
+from openpyxl.worksheet.dimensions import DEFAULT_COLUMN_WIDTH, SheetFormatProperties
+from openpyxl.worksheet.page import PageMargins
+from openpyxl.worksheet.properties import WorksheetProperties
+from openpyxl.xml.constants import SHEET_MAIN_NS, REL_NS, PKG_REL_NS
+
+
+__all__ = ['UnsupportedFeature', 'can_write_values', 'write_xlsx', 'save_workbook']
+
+
+WRITE_BLOCK_SIZE = 4096  # Number of rows joined before they are written to the zip stream
+DATE_FORMATS = {datetime.datetime: FORMAT_DATE_DATETIME, datetime.date: FORMAT_DATE_YYYYMMDD2,
+                datetime.time: FORMAT_DATE_TIME6, datetime.timedelta: FORMAT_DATE_TIMEDELTA}  # Like openpyxl
+NUMBER_TYPES = (int, float, Decimal)
+ERROR_VALUES = frozenset(ERROR_CODES)  # Strings openpyxl writes as error cells
+DOC_PROPERTIES = ('title', 'subject', 'description', 'keywords', 'category', 'contentStatus', 'identifier', 'language',
+                  'lastModifiedBy', 'lastPrinted', 'version', 'revision')  # Not written, so they must not be set
+SHEET_VIEW_ATTRS = {'workbookViewId', 'tabSelected'}  # Sheet view attributes that may be set
+REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.'
+
+CONTENT_TYPES_XML = (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="' + CONTENT_TYPE + 'spreadsheetml.sheet.main+xml"/>'
+    '{sheets}'
+    '<Override PartName="/xl/styles.xml" ContentType="' + CONTENT_TYPE + 'spreadsheetml.styles+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" ContentType="' + CONTENT_TYPE + 'spreadsheetml.sharedStrings+xml"/>'
+    '</Types>')
+SHEET_CONTENT_TYPE = ('<Override PartName="/xl/worksheets/sheet{}.xml" ContentType="' + CONTENT_TYPE +
+                      'spreadsheetml.worksheet+xml"/>')
+RELATIONSHIP_XML = '<Relationship Id="rId{}" Type="' + REL_TYPE + '{}" Target="{}"/>'
+ROOT_RELS_XML = ('<Relationships xmlns="' + PKG_REL_NS + '">'
+                 '<Relationship Id="rId1" Type="' + REL_TYPE + 'officeDocument" Target="xl/workbook.xml"/>'
+                 '</Relationships>')
+STYLES_XML = (
+    '<styleSheet xmlns="' + SHEET_MAIN_NS + '">{num_fmts}'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/><scheme val="minor"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+    '</fills><borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="{count}">{xfs}</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles></styleSheet>')
+XF_XML = '<xf numFmtId="{}" fontId="0" fillId="0" borderId="0" xfId="0"{}/>'
+
+
+class UnsupportedFeature(ValueError):
+    """The workbook has a feature that only the openpyxl serializer writes."""
+
+
+def has_default_properties(wb):
+    """Return if the document properties, calculation settings and window of the workbook are the defaults."""
+    properties = wb.properties
+    if properties is not None and (properties.creator not in (None, 'openpyxl') or
+                                   any(getattr(properties, name, None) is not None for name in DOC_PROPERTIES)):
+        return False
+    elif wb.calculation is not None and wb.calculation != CalcProperties():
+        return False
+
+    default_view = dict(BookView(), activeTab=None)
+    return all(dict(view, activeTab=None) == default_view for view in wb.views)
+
+
+def has_default_layout(ws):
+    """Return if the sheet view, page setup and header/footer of the worksheet are the defaults."""
+    views = ws.views.sheetView
+    if len(views) > 1 or any(not set(dict(view)) <= SHEET_VIEW_ATTRS or view.workbookViewId or
+                             view.pane is not None for view in views):
+        return False
+    return not dict(ws.page_setup) and not dict(ws.print_options) and ws.page_margins == PageMargins() and \
+        not ws.HeaderFooter and ws.sheet_properties == WorksheetProperties() and \
+        ws.sheet_format == SheetFormatProperties() and not ws.row_breaks.brk and not ws.col_breaks.brk
+
+
+def can_write_values(wb):
+    """Return if the workbook and sheet features can be written by write_xlsx.
+
+    This is a whitelist. GridWorkbooks only have values. openpyxl workbooks must not have any workbook or sheet
+    feature other than values and number formats and their properties, views and page setup must be the defaults.
+    Cell styles and values are checked while writing.
+    """
+    if getattr(wb, 'read_only', False) or getattr(wb, 'write_only', False):
+        return False
+    elif not hasattr(wb, 'defined_names'):
+        return True  # GridWorkbook
+
+    if len(wb.defined_names) or getattr(wb, 'vba_archive', None) is not None or getattr(wb, '_external_links', None) \
+            or len(getattr(wb, 'custom_doc_props', ())) or len(getattr(wb, '_named_styles', ())) > 1 or \
+            wb.chartsheets or list(getattr(wb, 'security', None) or ()) or wb.code_name is not None or \
+            not has_default_properties(wb):
+        return False
+
+    for ws in wb.worksheets:
+        if len(ws.defined_names) or ws.merged_cells.ranges or len(ws.conditional_formatting) or \
+                ws.data_validations.dataValidation or ws._images or ws._charts or ws._tables or ws._hyperlinks or \
+                ws._pivots or ws.legacy_drawing or ws.freeze_panes or ws.auto_filter.ref or ws.print_area or \
+                ws.print_title_rows or ws.print_title_cols or ws.sheet_state != 'visible' or ws.protection.sheet or \
+                not has_default_layout(ws):
+            return False
+
+        for dim in ws.column_dimensions.values():
+            if dim.has_style or dim.hidden or dim.outline_level or dim.bestFit or dim.width != DEFAULT_COLUMN_WIDTH:
+                return False
+        for dim in ws.row_dimensions.values():
+            if dim.has_style or dim.hidden or dim.outline_level or dim.ht is not None:
+                return False
+    return True
+
+
+def iter_sheet_rows(ws):
+    """Yield the (row, [(column, value, number format or None)]) of every row with a value in the sheet.
+
+    openpyxl worksheets raise UnsupportedFeature for cells with a style other than a number format, with a comment or
+    with an error value that is not a known error code.
+    """
+    cells = getattr(ws, '_cells', None)
+    if cells is None:
+        max_row = ws.max_row
+        for start in range(1, max_row + 1, WRITE_BLOCK_SIZE):
+            rows = ws.iter_rows(min_row=start, max_row=min(start + WRITE_BLOCK_SIZE - 1, max_row), values_only=True)
+            for row, values in enumerate(rows, start):
+                values = [(column, value, None) for column, value in enumerate(values, 1) if value is not None]
+                if values:
+                    yield row, values
+        return
+
+    current = None
+    values = []
+    for row, column in sorted(cells):
+        cell = cells[(row, column)]
+        if cell.comment is not None or cell.hyperlink is not None:
+            raise UnsupportedFeature('Cell {} has a comment or hyperlink'.format(cell.coordinate))
+        elif cell.data_type == 'e' and cell._value not in ERROR_VALUES:
+            raise UnsupportedFeature('Cell {} has an unknown error value'.format(cell.coordinate))
+
+        number_format = None
+        if cell.has_style:
+            style = cell._style
+            if style.fontId or style.fillId or style.borderId or style.alignmentId or style.protectionId or \
+                    style.xfId or style.quotePrefix or style.pivotButton:
+                raise UnsupportedFeature('Cell {} has a style'.format(cell.coordinate))
+            number_format = cell.number_format
+
+        if row != current:
+            if values:
+                yield current, values
+            current = row
+            values = []
+        if cell._value is not None or number_format is not None:
+            values.append((column, cell._value, number_format))
+    if values:
+        yield current, values
+
+
+def get_dimension(ws):
+    """Return the A1 range of the used cells that the worksheet part reports in its <dimension> element."""
+    if getattr(ws, '_cells', None) is not None:
+        return ws.calculate_dimension()  # openpyxl Worksheet
+    max_row, max_column = ws.max_row or 1, ws.max_column or 1
+    return 'A1:{}{}'.format(get_column_letter(max_column), max_row)
+
+
+class StyleTable(object):
+    """Cell style ids for the number formats that are used."""
+    def __init__(self):
+        self.ids = {FORMAT_GENERAL: 0}  # {number format: cell style id}
+        self.formats = [FORMAT_GENERAL]
+
+    def get_id(self, number_format):
+        try:
+            return self.ids[number_format]
+        except KeyError:
+            self.ids[number_format] = style_id = len(self.formats)
+            self.formats.append(number_format)
+            return style_id
+
+    def to_xml(self):
+        num_fmts = []
+        xfs = []
+        for number_format in self.formats:
+            fmt_id = BUILTIN_FORMATS_REVERSE.get(number_format, None)
+            if fmt_id is None:
+                fmt_id = 164 + len(num_fmts)
+                num_fmts.append('<numFmt numFmtId="{}" formatCode={}/>'.format(fmt_id, quoteattr(number_format)))
+            xfs.append(XF_XML.format(fmt_id, ' applyNumberFormat="1"' if fmt_id else ''))
+        num_fmts = '<numFmts count="{}">{}</numFmts>'.format(len(num_fmts), ''.join(num_fmts)) if num_fmts else ''
+        return STYLES_XML.format(num_fmts=num_fmts, count=len(xfs), xfs=''.join(xfs))
+
+
+def write_sheet(stream, ws, strings, styles, epoch=WINDOWS_EPOCH):
+    """Write the worksheet part of a sheet to the stream.
+
+    Args:
+        stream (file): Binary stream to write to.
+        ws (object): openpyxl Worksheet or worksheet-like object with iter_rows(values_only=True) and max_row.
+        strings (dict): {string: index} shared strings that gets the strings of the sheet.
+        styles (StyleTable): Cell styles that gets the number formats of the sheet.
+        epoch (datetime)[WINDOWS_EPOCH]: Date system of the workbook.
+    """
+    letters = ['']
+    date_styles = {}  # {type: style id} for dates without a number format
+    write = stream.write
+    write('<worksheet xmlns="{}"><dimension ref="{}"/><sheetData>'.format(SHEET_MAIN_NS, get_dimension(ws))
+          .encode('utf-8'))
+
+    parts = []
+    append = parts.append
+    for count, (row, values) in enumerate(iter_sheet_rows(ws), 1):
+        append(f'<row r="{row}">')
+        for column, value, number_format in values:
+            while column >= len(letters):
+                letters.append(get_column_letter(len(letters)))
+            ref = letters[column]
+            style = '' if number_format is None or number_format == FORMAT_GENERAL else \
+                f' s="{styles.get_id(number_format)}"'
+            t = type(value)
+
+            if t is int or t is float:
+                if t is float and not math.isfinite(value):
+                    append(f'<c r="{ref}{row}"{style} t="n"><v></v></c>')
+                else:
+                    append(f'<c r="{ref}{row}"{style} t="n"><v>{value:.16g}</v></c>')
+            elif t is str:
+                index = strings.get(value, None)
+                if index is None and value in ERROR_VALUES:
+                    append(f'<c r="{ref}{row}"{style} t="e"><v>{value}</v></c>')
+                elif index is not None:
+                    append(f'<c r="{ref}{row}"{style} t="s"><v>{index}</v></c>')
+                elif ILLEGAL_CHARACTERS_RE.search(value):
+                    raise IllegalCharacterError('{} cannot be used in worksheets.'.format(value))
+                elif len(value) > 1 and value[0] == '=':
+                    append(f'<c r="{ref}{row}"{style}><f>{escape(value[1:])}</f><v></v></c>')
+                else:
+                    index = strings[value] = len(strings)
+                    append(f'<c r="{ref}{row}"{style} t="s"><v>{index}</v></c>')
+            elif t is bool:
+                append(f'<c r="{ref}{row}"{style} t="b"><v>{value:d}</v></c>')
+            elif value is None:
+                append(f'<c r="{ref}{row}"{style}/>')
+            elif t in DATE_FORMATS:
+                if getattr(value, 'tzinfo', None) is not None:
+                    raise TypeError('Excel does not support timezones in datetimes. '
+                                    'The tzinfo in the datetime/time object must be set to None.')
+                if not style:
+                    style_id = date_styles.get(t, None)
+                    if style_id is None:
+                        style_id = date_styles[t] = styles.get_id(DATE_FORMATS[t])
+                    style = f' s="{style_id}"'
+                append(f'<c r="{ref}{row}"{style} t="n"><v>{to_excel(value, epoch):.16g}</v></c>')
+            elif isinstance(value, NUMBER_TYPES):
+                append(f'<c r="{ref}{row}"{style} t="n"><v>{value:.16g}</v></c>')
+            else:
+                raise UnsupportedFeature('Cell {}{} has a {} value'.format(ref, row, t.__name__))
+        append('</row>')
+
+        if count % WRITE_BLOCK_SIZE == 0:
+            write(''.join(parts).encode('utf-8'))
+            parts.clear()
+
+    write(''.join(parts).encode('utf-8'))
+    write(b'</sheetData></worksheet>')
+
+
+def write_shared_strings(stream, strings):
+    """Write the shared strings part for the {string: index} strings."""
+    write = stream.write
+    write('<sst xmlns="{}" uniqueCount="{}">'.format(SHEET_MAIN_NS, len(strings)).encode('utf-8'))
+    parts = []
+    for i, value in enumerate(strings, 1):
+        if value != value.strip():
+            parts.append('<si><t xml:space="preserve">{}</t></si>'.format(escape(value)))
+        else:
+            parts.append('<si><t>{}</t></si>'.format(escape(value)))
+        if i % WRITE_BLOCK_SIZE == 0:
+            write(''.join(parts).encode('utf-8'))
+            parts = []
+    write(''.join(parts).encode('utf-8'))
+    write(b'</sst>')
+
+
+def write_xlsx(filename, wb):
+    """Write the values and number formats of every sheet to an xlsx file.
+
+    The file is written to a temporary file that replaces the file at the end. Raise UnsupportedFeature if a cell has
+    a feature that is not written (see can_write_values).
+
+    Args:
+        filename (str): xlsx filename to write.
+        wb (object): openpyxl Workbook or GridWorkbook.
+    """
+    worksheets = wb.worksheets
+    epoch = getattr(wb, 'epoch', WINDOWS_EPOCH)
+    strings = {}
+    styles = StyleTable()
+    tmp = filename + '.tmp'
+    try:
+        with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            for i, ws in enumerate(worksheets, 1):
+                with archive.open('xl/worksheets/sheet{}.xml'.format(i), 'w', force_zip64=True) as stream:
+                    write_sheet(stream, ws, strings, styles, epoch)
+            with archive.open('xl/sharedStrings.xml', 'w', force_zip64=True) as stream:
+                write_shared_strings(stream, strings)
+            archive.writestr('xl/styles.xml', styles.to_xml())
+
+            active = wb.index(wb.active) if wb.active is not None else 0
+            sheets = ''.join('<sheet name={} sheetId="{}" r:id="rId{}"/>'.format(quoteattr(ws.title), i, i)
+                             for i, ws in enumerate(worksheets, 1))
+            archive.writestr('xl/workbook.xml', '<workbook xmlns="{}" xmlns:r="{}"><workbookPr{}/>'
+                             '<bookViews><workbookView activeTab="{}"/></bookViews><sheets>{}</sheets></workbook>'
+                             .format(SHEET_MAIN_NS, REL_NS, ' date1904="1"' if epoch != WINDOWS_EPOCH else '',
+                                     active, sheets))
+            count = len(worksheets)
+            rels = [RELATIONSHIP_XML.format(i, 'worksheet', 'worksheets/sheet{}.xml'.format(i))
+                    for i in range(1, count + 1)]
+            rels.append(RELATIONSHIP_XML.format(count + 1, 'styles', 'styles.xml'))
+            rels.append(RELATIONSHIP_XML.format(count + 2, 'sharedStrings', 'sharedStrings.xml'))
+            archive.writestr('xl/_rels/workbook.xml.rels', '<Relationships xmlns="{}">{}</Relationships>'.format(
+                PKG_REL_NS, ''.join(rels)))
+            archive.writestr('_rels/.rels', ROOT_RELS_XML)
+            archive.writestr('[Content_Types].xml', CONTENT_TYPES_XML.format(
+                sheets=''.join(SHEET_CONTENT_TYPE.format(i) for i in range(1, count + 1))))
+        os.replace(tmp, filename)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def save_workbook(wb, filename):
+    """Save an openpyxl Workbook or GridWorkbook to an Excel file.
+
+    .xlsx files of workbooks that only have values and number formats are written with write_xlsx. Other workbooks
+    use the openpyxl serializer.
+    """
+    if os.path.splitext(str(filename).lower())[-1] == '.xlsx' and can_write_values(wb):
+        try:
+            write_xlsx(filename, wb)
+            return
+        except UnsupportedFeature:
+            pass
+
+    to_openpyxl = getattr(wb, 'to_openpyxl', None)
+    if to_openpyxl is not None:
+        wb = to_openpyxl()  # GridWorkbook
+    wb.save(filename)
@@ -11,7 +11,8 @@ import shutil
 import win32com.client
 from .constants import populate_constants
 from ..prop_utils import ProxyProperty, ProxyMethod, HashDict, ItemStorage
-from ..fields import ConstantItem
+from ..fields import FieldRegistry, collect_fields, FieldsMeta, read_fields, Batch, to_dataframe, from_dataframe, \
+    get_area_bounds, iter_field_batches, export_tables
 
 __all__ = ['Excel', 'Workbook', 'is_excel_installed',
            'should_init_sig', 'set_init_sig', 'init_sig_shutdown', 'shutdown']
@@ -642,15 +643,28 @@ class Excel(object):
     Worksheets = ProxyProperty('xl.Worksheets')
 
 
-class Workbook(object):
+class Workbook(object, metaclass=FieldsMeta):
     METHOD_SETTER_ERROR = 'Cannot set property '
     SAVE_ON_CLOSE = False
+    ACTIVATE_SHEETS = True  # Make the sheet active every time a field gets the sheet
+    CACHE_VALUES = False  # Cache the decoded value of fields that do not set cache (see Item.get_cached_value)
+    __fields__ = FieldRegistry()  # Fields collected across the MRO (see collect_fields)
 
-    def __init__(self, filename=None, *args, xl=None, wb=None, **xl_settings):
+    def __init_subclass__(cls, **kwargs):
+        """Collect the fields across the MRO when the Table class is defined (see FieldsMeta for later changes)."""
+        super().__init_subclass__(**kwargs)
+        cls.__fields__ = collect_fields(cls)
+
+    def __init__(self, filename=None, *args, xl=None, wb=None, read_only=False, **xl_settings):
         # Variables
         self._xl = xl
         self._wb = wb
         self._filename = None  # Save the filename as a variable
+        self.read_only = read_only  # Open the file with Excel's ReadOnly flag
+        self._batch = None  # Active Batch that buffers field assignments
+        self._field_handles = {}  # {field: (ItemPlan, sheet key, item)} see Item.get_item
+        self._value_cache = {}  # {field: (ItemPlan, sheet key, write version, value)} see Item.get_cached_value
+        self._sheet_version = 0  # Changes when sheet indexes and names may refer to other sheets (see get_sheet_key)
 
         # Initialize Excel
         if self._xl is None:
@@ -668,9 +682,8 @@ class Workbook(object):
 
     def init_constants(self):
         """Set all of the constant values."""
-        for k, field in self.__class__.__dict__.items():
-            if isinstance(field, ConstantItem):
-                field.init_table(self)
+        for field in self.__fields__.constants:
+            field.init_table(self)
 
     @property
     def xl(self):
@@ -699,6 +712,9 @@ class Workbook(object):
         except (AttributeError, Exception):
             pass
         self._wb = value
+        self._field_handles = {}
+        self._value_cache = {}
+        self._sheet_version += 1
 
     def get_filename(self):
         """Return the filename."""
@@ -716,14 +732,24 @@ class Workbook(object):
 
     filename = property(get_filename, set_filename)
 
-    def open(self, filename=None):
-        """Open a workbook with the given filename and use this workbook."""
+    def open(self, filename=None, read_only=None):
+        """Open a workbook with the given filename and use this workbook.
+
+        Args:
+            filename (str)[None]: Filename to open. If None use the set filename.
+            read_only (bool)[None]: Open the file as read only. If None use the read_only attribute.
+        """
         if filename is not None:
             self.set_filename(filename)
+        if read_only is not None:
+            self.read_only = read_only
 
         filename = self.get_filename()
         if isinstance(filename, str) and os.path.exists(filename) and os.path.isfile(filename):
-            self._wb = self.xl.Workbooks.Open(filename)
+            self._wb = self.xl.Workbooks.Open(filename, ReadOnly=self.read_only)
+            self._field_handles = {}
+            self._value_cache = {}
+            self._sheet_version += 1
         return self
 
     EXT_TO_FMT = {
@@ -759,12 +785,22 @@ class Workbook(object):
         '.xml': getattr(win32com.client.constants, 'xlXMLSpreadsheet', 46),
         }
 
-    def save(self, filename=None):
-        """Save the given filename or set filename."""
+    def save(self, filename=None, skip_unchanged=False):
+        """Save the given filename or set filename.
+
+        Args:
+            filename (str)[None]: Filename to save to. If None use the set filename.
+            skip_unchanged (bool)[False]: Do nothing when saving to the file the workbook was opened from or saved to
+                and Excel has no unsaved changes.
+        """
         if filename is not None:
             self.set_filename(filename)
 
         filename = self.get_filename()
+        if self._batch is not None:
+            self._batch.apply()
+        if skip_unchanged and self.wb.Saved and os.path.normcase(str(self.wb.FullName)) == os.path.normcase(filename):
+            return
 
         ext = os.path.splitext(filename)[-1].lower()
         file_fmt = self.EXT_TO_FMT.get(ext, None)
@@ -781,19 +817,116 @@ class Workbook(object):
                 obj = self.wb.Sheets[sheet]  # Get the sheet
             else:
                 obj = self.wb.Sheets(sheet)  # Get the sheet
-            obj.Activate()
+            if self.ACTIVATE_SHEETS:
+                obj.Activate()
         except (ValueError, TypeError, Exception):
             if create:
                 obj = self.wb.Sheets.Add()  # Create the sheet
                 obj.Name = sheet
+                self._sheet_version += 1  # Excel adds the sheet before the active sheet
             else:
                 obj = None
         return obj
 
+    def get_sheet_key(self, sheet):
+        """Return a key that stays the same while the sheet index or name refers to the same sheet.
+
+        Excel returns a new object for every sheet lookup, so field caches (see Item.get_item) are kept by the sheet
+        index or name and a version that changes when the workbook is replaced or this library adds a sheet. Sheets
+        that are added, moved or renamed directly in Excel are not tracked.
+        """
+        if self.ACTIVATE_SHEETS:
+            self.get_sheet(sheet)
+        return sheet, self._sheet_version
+
     def has_sheet(self, sheet):
         """Return if the given sheet name or index exists"""
         return self.get_sheet(sheet, create=False) is not None
 
+    def get_write_version(self, sheet):
+        """Return a number that changes when the sheet is written.
+
+        Excel does not report writes, so only field writes (see invalidate_values) remove cached values.
+        """
+        return 0
+
+    def was_written(self, sheet, bounds, version):
+        """Return if the bounds of the sheet were written after the write version."""
+        return False
+
+    def clear_value_cache(self):
+        """Remove every cached field value."""
+        self._value_cache = {}
+
+    def read_areas(self, sheet, areas, open_ended=None):
+        """Return the value of every A1 area string in the sheet with one Value call for the union of the areas.
+
+        Excel is not clipped to the used range, so the open_ended flags are not used.
+        """
+        bounds = [get_area_bounds(area) for area in areas]
+        if any(b is None for box in bounds for b in box):
+            raise ValueError('Whole row and column areas cannot be read in one pass!')
+
+        min_row = min(box[0] for box in bounds)
+        min_col = min(box[1] for box in bounds)
+        max_row = max(box[2] for box in bounds)
+        max_col = max(box[3] for box in bounds)
+
+        obj = self.get_sheet(sheet)
+        grid = obj.Range(obj.Cells(min_row, min_col), obj.Cells(max_row, max_col)).Value
+        if not isinstance(grid, tuple):
+            grid = ((grid,),)  # Single cell
+
+        values = []
+        for r0, c0, r1, c1 in bounds:
+            rows = tuple(row[c0 - min_col:c1 - min_col + 1] for row in grid[r0 - min_row:r1 - min_row + 1])
+            values.append(rows[0][0] if r0 == r1 and c0 == c1 else rows)
+        return values
+
+    def read_all(self):
+        """Return a {name: value} dictionary for every field reading each sheet once."""
+        return read_fields(self, self.read_areas)
+
+    def snapshot(self):
+        """Return a frozen namedtuple record with the value of every field reading each sheet once."""
+        values = self.read_all()
+        return self.__fields__.record(*(values.get(name, None) for name in self.__fields__))
+
+    def to_dataframe(self, range_field, header_field=None):
+        """Return a pandas DataFrame for a range field (see fields.to_dataframe). pandas is imported when used."""
+        return to_dataframe(self, range_field, header_field=header_field)
+
+    def from_dataframe(self, df, range_field, header_field=None):
+        """Write a pandas DataFrame to a range field (see fields.from_dataframe)."""
+        from_dataframe(self, df, range_field, header_field=header_field)
+
+    def to_record_batches(self, range_field, header_field=None, batch_size=65536):
+        """Yield pyarrow RecordBatches for a range field (see fields.iter_field_batches). pyarrow is imported when used.
+        """
+        return iter_field_batches(self, range_field, header_field=header_field, batch_size=batch_size)
+
+    def export(self, filename, range_field, header_field=None, batch_size=65536, file_format=None):
+        """Export a range field to a Parquet or Arrow IPC file streaming the rows (see fields.export_tables).
+
+        Returns:
+            count (int): Number of rows written.
+        """
+        return export_tables(filename, self, range_field, header_field=header_field, batch_size=batch_size,
+                             file_format=file_format)
+
+    def batch(self):
+        """Return a context manager that buffers field assignments and writes them as blocks on exit.
+
+        Example:
+            with tbl.batch():
+                tbl.name = 'John'
+                tbl.age = 30
+        """
+        batch = getattr(self, '_batch', None)
+        if batch is None:
+            batch = Batch(self)
+        return batch
+
     # ===== Workbook Object Methods ===== https://docs.microsoft.com/en-us/office/vba/api/excel.workbook#methods
     AcceptAllChanges = ProxyMethod('wb.AcceptAllChanges', setter_error=METHOD_SETTER_ERROR)
     Activate = ProxyMethod('wb.Activate', setter_error=METHOD_SETTER_ERROR)